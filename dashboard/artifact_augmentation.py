@@ -1,11 +1,22 @@
 import os
+import json
+import functools
 import anthropic
 import logging
+import threading
+import socketserver
 import pandas as pd
 from dotenv import load_dotenv
 from typing import Dict, Any
-from typing import Dict, Any, Generator
+from typing import Dict, Any, Generator, List, Optional
 import sys
+from artifact_store import ArtifactStore, is_store_path
+from artifact_schema import read_artifacts, select_columns
+from artifact_parquet import is_parquet_path, read_parquet_artifacts
+from content_store import ContentStore
+from single_flight import SingleFlight
+from llm_gateway import get_gateway
+from prompt_builder import build_prompt
 
 load_dotenv()
 
@@ -19,72 +30,173 @@ logger = logging.getLogger(__name__)
 # Disable httpx logging
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+# CSV table or artifact store (see artifact_store.py) to serve artifacts from
+ARTIFACTS_FILE = os.environ.get("ARTIFACTS_FILE", "limited_artifacts.csv")
+
+MODEL = "claude-3-sonnet-20240229"
+
+# Finished summaries keyed by prompt, system prompt and model. Set
+# SUMMARY_CACHE_DIR to an empty string to always call the API.
+SUMMARY_CACHE_DIR = os.environ.get("SUMMARY_CACHE_DIR", "summary_cache")
+summary_cache = ContentStore(
+    SUMMARY_CACHE_DIR,
+    max_bytes=int(os.environ.get("SUMMARY_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    suffix=".txt",
+) if SUMMARY_CACHE_DIR else None
+
+# Size of the pieces a cached summary is replayed in
+REPLAY_CHUNK_SIZE = 256
+
+# Concurrent requests for the same summary, from any process, share one LLM stream
+summary_flights = SingleFlight(os.environ.get("SINGLE_FLIGHT_DIR", "locks"))
+
+# Background generation in the summary worker for artifacts likely to be
+# viewed next: the PREFETCH_RADIUS neighbours of each viewed artifact in table
+# order, and any IDs listed in PREFETCH_POPULAR_FILE at startup. Budgets are
+# jobs per PREFETCH_BUDGET_WINDOW seconds; video prefetch is off by default.
+PREFETCH_RADIUS = int(os.environ.get("PREFETCH_RADIUS", 2))
+PREFETCH_POPULAR_FILE = os.environ.get("PREFETCH_POPULAR_FILE")
+VIDEOS_DIR = os.environ.get("VIDEOS_DIR", "videos")
+
+
+def make_scheduler():
+    """Job scheduler for the summary worker, configured from the environment."""
+    from job_scheduler import JobScheduler
+
+    return JobScheduler(
+        max_workers=int(os.environ.get("SCHEDULER_WORKERS", 4)),
+        max_prefetch=int(os.environ.get("PREFETCH_CONCURRENCY", 2)),
+        budgets={
+            "summary": int(os.environ.get("PREFETCH_SUMMARY_BUDGET", 200)),
+            "video": int(os.environ.get("PREFETCH_VIDEO_BUDGET", 0)),
+        },
+        budget_window=float(os.environ.get("PREFETCH_BUDGET_WINDOW", 3600)),
+    )
+
 system = """You are an expert in analyzing artifacts from ancient civilizations. 
 You have been asked to provide a compact summary of the artifact based on your expertise and the information provided to you.
 Start all responses with "This artifact is" and then continue with your analysis.
 """
 
-def construct_artifact_string(artifact: Dict[str, Any]) -> str:
-    """Construct a string representation of the artifact."""
-    artifact_str = "# Artifact\n\n"
-    for key, value in artifact.items():
-        artifact_str += f"## {key}\n\n{value}\n\n"
-    return artifact_str
+def summary_cache_key(prompt: str) -> str:
+    return ContentStore.make_key(prompt, system, MODEL)
+
+def prompt_llm(prompt: str, cache: Optional[ContentStore] = None) -> Generator[str, None, None]:
+    """Stream the LLM's answer to `prompt`.
+
+    With a cache, a previously completed answer is replayed from disk
+    without calling the API, and a newly completed one is stored. Answers cut
+    short by an error are never cached.
+
+    Raises:
+        RuntimeError: If the API fails after part of the answer was yielded
+    """
+    cache_key = None
+    if cache is not None:
+        cache_key = summary_cache_key(prompt)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            text = cached.decode("utf-8")
+            for i in range(0, len(text), REPLAY_CHUNK_SIZE):
+                yield text[i:i + REPLAY_CHUNK_SIZE]
+            return
 
-def prompt_llm(prompt: str) -> Generator[str, None, None]:
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         logger.error("ANTHROPIC_API_KEY environment variable not set")
         return ""
     
+    chunks = []
+    error = None
     try:
-        client = anthropic.Anthropic(
-            api_key=api_key
-        )
-        
-        with client.messages.stream(
-            model="claude-3-sonnet-20240229",
-            max_tokens=2048,
-            system=system,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        ) as stream:
-            for text in stream.text_stream:
-                yield text
-
-    except anthropic.APIConnectionError:
+        for text in get_gateway().stream(prompt, system=system, model=MODEL, max_tokens=2048):
+            chunks.append(text)
+            yield text
+
+        if cache is not None:
+            cache.put(cache_key, "".join(chunks).encode("utf-8"))
+
+    except anthropic.APIConnectionError as e:
         logger.error("Network error when calling Anthropic API")
-    except anthropic.RateLimitError:
+        error = e
+    except anthropic.RateLimitError as e:
         logger.error("Rate limit exceeded for Anthropic API")
+        error = e
     except anthropic.APIStatusError as e:
         logger.error(f"API error from Anthropic: {str(e)}")
+        error = e
     except Exception as e:
         logger.error(f"Unexpected error when calling Anthropic API: {str(e)}")
+        error = e
+    if error is not None and chunks:
+        # A partial answer must not pass for a whole one, here or in single-flight followers
+        raise RuntimeError("Summary stream was cut short") from error
     return ""
 
-def analyze_artifact(artifact: Dict[str, Any]) -> str:
-    """Analyze a single artifact using the LLM."""
-    artifact_str = construct_artifact_string(artifact)
-    prompt = f"{artifact_str}"
-    return prompt_llm(prompt)
+@functools.lru_cache(maxsize=1)
+def default_inscriptions():
+    """The index from `python inscription_parser.py build`, opened once, or None if it has not been built."""
+    # Imported here, keeping start-up short when no index is used
+    from inscription_parser import INSCRIPTION_INDEX, open_inscriptions
+    return open_inscriptions(INSCRIPTION_INDEX)
+
+def with_inscription(artifact: Dict[str, Any], inscriptions=None) -> Dict[str, Any]:
+    """The artifact with its transliteration added from `inscriptions`, or from the default index when it exists."""
+    if "inscription" in artifact:
+        return artifact
+    if inscriptions is None:
+        inscriptions = default_inscriptions()
+    if inscriptions is None:
+        return artifact
+    return {**artifact, "inscription": inscriptions.prompt_text(str(artifact["artifact_id"]))}
+
+def artifact_prompt(artifact: Dict[str, Any], inscriptions=None) -> str:
+    """The summary prompt for an artifact row.
+
+    The worker, the per-request CLI and batch_summaries.py all build their
+    prompts here, so a summary generated by one is a cache hit for the others.
+    """
+    return build_prompt(with_inscription(artifact, inscriptions))
+
+def analyze_artifact(artifact: Dict[str, Any], cache: Optional[ContentStore] = summary_cache,
+                     flights: Optional[SingleFlight] = summary_flights) -> str:
+    """Analyze a single artifact using the LLM, replaying cached summaries when available.
+
+    If another request is already generating the same summary, this one
+    attaches to its stream instead of making a second API call.
+    """
+    prompt = artifact_prompt(artifact)
+    key = summary_cache_key(prompt)
+    if flights is None or (cache is not None and key in cache):
+        return prompt_llm(prompt, cache)
+    return flights.stream(key, lambda: prompt_llm(prompt, cache))
 
-def load_artifact(filepath: str, artifact_id: str) -> pd.DataFrame:
-    """Load artifacts from a CSV file, optionally filtering by artifact ID.
+def load_artifact(filepath: str, artifact_id: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load artifacts from a CSV file or artifact store, filtering by artifact ID.
     
     Args:
-        filepath: Path to the CSV file
+        filepath: Path to the CSV file, a Parquet export or an indexed store built by artifact_store.py
         artifact_id: Artifact ID as a string
+        columns: Only load these columns (artifact_id is always included)
         
     Returns:
         DataFrame containing the matching artifact(s)
     """
     try:
-        # Read CSV with artifact_id as string
-        df = pd.read_csv(filepath, dtype={'artifact_id': str})
-        
-        # Simple string comparison
-        filtered_df = df[df['artifact_id'] == str(artifact_id)]
+        if is_store_path(filepath):
+            # Indexed lookup, no need to parse the rest of the corpus
+            with ArtifactStore(filepath) as store:
+                filtered_df = store.get(artifact_id, columns)
+        elif is_parquet_path(filepath):
+            # Memory-mapped read of only the matching rows and requested columns
+            filtered_df = read_parquet_artifacts(filepath, columns=select_columns(columns, ['artifact_id']),
+                                                 filters=[('artifact_id', '==', str(artifact_id))])
+        else:
+            # Typed read, artifact_id stays a string
+            df = read_artifacts(filepath, columns=select_columns(columns, ['artifact_id']))
+            
+            # Simple string comparison
+            filtered_df = df[df['artifact_id'] == str(artifact_id)]
         
         if filtered_df.empty:
             print("No matching artifact found")
@@ -95,21 +207,281 @@ def load_artifact(filepath: str, artifact_id: str) -> pd.DataFrame:
         logger.error(f"Error loading artifacts: {str(e)}")
         return pd.DataFrame()
 
+def load_artifact_table(filepath: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load the whole artifact table once, indexed by artifact ID.
+
+    Used by the summary worker so each request is a dictionary-style lookup
+    instead of a fresh CSV parse and scan.
+    """
+    columns = select_columns(columns, ['artifact_id'])
+    if is_parquet_path(filepath):
+        df = read_parquet_artifacts(filepath, columns=columns)
+    else:
+        df = read_artifacts(filepath, columns=columns)
+    return df.set_index('artifact_id', drop=False)
+
+class SummaryRequestHandler(socketserver.StreamRequestHandler):
+    """Serve one summary request over a newline-delimited JSON connection.
+
+    The client sends a single line such as ``{"artifact_id": "1.0"}`` and
+    receives one JSON frame per line: ``{"chunk": ...}`` for every piece of
+    text as the LLM streams it, followed by ``{"done": true}`` or
+    ``{"error": ...}``. A ``{"prompt": ...}`` request is answered by
+    prompt_llm.py's prompt_llm over the same pooled connection instead, and
+    a ``{"search": {...}}`` request (ArtifactIndex.search arguments), a
+    ``{"similar": {"artifact_id": ..., "k": ...}}`` request, a
+    ``{"video": {"artifact_id": ..., "prompt": ...}}`` request (answered once
+    the video is on disk) or a ``{"stats": true}`` request by a single
+    ``{"result": ...}`` frame.
+    """
+
+    def _send(self, frame: Dict[str, Any]):
+        self.wfile.write((json.dumps(frame) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+        except json.JSONDecodeError:
+            self._send({"error": "Malformed request"})
+            return
+
+        if "prompt" in request:
+            # Imported here so prompt_llm's logging setup does not override ours
+            from prompt_llm import prompt_llm as describe
+            self._send({"chunk": describe(str(request["prompt"]))})
+            self._send({"done": True})
+            return
+
+        if "search" in request:
+            try:
+                result = self.server.search(**request["search"])
+            except (TypeError, ValueError) as e:
+                self._send({"error": f"Invalid search: {e}"})
+                return
+            self._send({"result": result})
+            self._send({"done": True})
+            return
+
+        if "similar" in request:
+            query = request["similar"]
+            try:
+                result = self.server.similar(str(query.get("artifact_id", "")), int(query.get("k", 10)))
+            except (FileNotFoundError, TypeError, ValueError, AttributeError) as e:
+                self._send({"error": f"Invalid similarity request: {e}"})
+                return
+            if result is None:
+                self._send({"error": f"No artifact found with ID: {query.get('artifact_id')}"})
+                return
+            self._send({"result": result})
+            self._send({"done": True})
+            return
+
+        if "video" in request:
+            query = request["video"]
+            try:
+                job = self.server.generate_video(str(query["artifact_id"]), str(query["prompt"]))
+            except (KeyError, TypeError) as e:
+                self._send({"error": f"Invalid video request: {e}"})
+                return
+            except Exception as e:
+                self._send({"error": f"Video generation failed: {e}"})
+                return
+            self._send({"result": job})
+            self._send({"done": True})
+            return
+
+        if "stats" in request:
+            self._send({"result": self.server.scheduler.stats()})
+            self._send({"done": True})
+            return
+
+        artifact_id = str(request.get("artifact_id", ""))
+        artifact = self.server.lookup(artifact_id)
+        if artifact is None:
+            self._send({"error": f"No artifact found with ID: {artifact_id}"})
+            return
+
+        # Streamed here rather than queued, so it never waits behind prefetch work
+        self.server.scheduler.claim("summary", artifact_id)
+        try:
+            for chunk in analyze_artifact(artifact):
+                self._send({"chunk": chunk})
+            self._send({"done": True})
+        except (BrokenPipeError, ConnectionResetError):
+            logger.warning(f"Client disconnected while streaming artifact {artifact_id}")
+        except RuntimeError as e:
+            self._send({"error": f"Summary failed, try again: {e}"})
+        self.server.prefetch(self.server.neighbour_ids(artifact_id))
+
+class SummaryWorker(socketserver.ThreadingTCPServer):
+    """Long-lived process that keeps the artifact table and LLM client warm."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, filepath: str = ARTIFACTS_FILE, scheduler=None,
+                 prefetch_radius: int = PREFETCH_RADIUS, inscription_index: Optional[str] = None):
+        # Modules only the worker needs are imported here and on first use, keeping
+        # the per-request `python artifact_augmentation.py <id>` start-up short
+        from inscription_parser import open_inscriptions
+
+        self.filepath = filepath
+        self.index = None
+        self.index_lock = threading.Lock()
+        self.similarity = None
+        self.video_jobs = None
+        self.scheduler = scheduler or make_scheduler()
+        self.prefetch_radius = prefetch_radius
+        # Transliterations for the prompts, when `python inscription_parser.py build` has been run
+        self.inscriptions = open_inscriptions(inscription_index) if inscription_index else default_inscriptions()
+        if is_store_path(filepath):
+            self.artifacts = ArtifactStore(filepath)
+        else:
+            self.artifacts = load_artifact_table(filepath)
+            self.positions = pd.Series(range(len(self.artifacts)), index=self.artifacts.index)
+            self.positions = self.positions[~self.positions.index.duplicated()]
+        self._check_inscriptions()
+        super().__init__(address, SummaryRequestHandler)
+
+    def _check_inscriptions(self):
+        """Warn when the inscription index is keyed by IDs the table does not use, as every prompt would lack it."""
+        if self.inscriptions is None or len(self.inscriptions) == 0:
+            return
+        sample = self.inscriptions.artifact_ids[:100].tolist()
+        if isinstance(self.artifacts, ArtifactStore):
+            matched = sum(self.artifacts.get_record(artifact_id) is not None for artifact_id in sample)
+        else:
+            matched = int(self.artifacts.index.isin(sample).sum())
+        if matched == 0:
+            logger.warning(f"None of the first {len(sample)} inscriptions (e.g. {sample[0]!r}) match an artifact ID; "
+                           f"rebuild the index with `python inscription_parser.py build`")
+
+    def server_close(self):
+        super().server_close()
+        self.scheduler.shutdown(wait=False)
+
+    def lookup(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        if isinstance(self.artifacts, ArtifactStore):
+            artifact = self.artifacts.get_record(artifact_id)
+        elif artifact_id not in self.artifacts.index:
+            return None
+        else:
+            artifact = self.artifacts.loc[[artifact_id]].iloc[0].to_dict()
+        if artifact is not None and self.inscriptions is not None:
+            artifact = with_inscription(artifact, self.inscriptions)
+        return artifact
+
+    def search(self, **query) -> Dict[str, Any]:
+        """Answer a search, building the index on first use."""
+        with self.index_lock:
+            if self.index is None:
+                from artifact_search import ArtifactIndex
+                self.index = ArtifactIndex.from_file(self.filepath)
+        return self.index.search(**query)
+
+    def similar(self, artifact_id: str, k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """Most similar artifacts from the prebuilt similarity index, opened on first use."""
+        with self.index_lock:
+            if self.similarity is None:
+                from artifact_similarity import SIMILARITY_INDEX, SimilarityIndex
+                self.similarity = SimilarityIndex(SIMILARITY_INDEX)
+        return self.similarity.similar(artifact_id, k)
+
+    def neighbour_ids(self, artifact_id: str) -> List[str]:
+        """Artifacts next to this one in table order, the order the artifact list shows them in."""
+        if isinstance(self.artifacts, ArtifactStore):
+            return self.artifacts.neighbour_ids(artifact_id, self.prefetch_radius)
+        if artifact_id not in self.positions.index:
+            return []
+        position = int(self.positions[artifact_id])
+        ids = self.artifacts['artifact_id'].iloc[max(0, position - self.prefetch_radius):
+                                                  position + self.prefetch_radius + 1]
+        return [str(neighbour) for neighbour in ids if str(neighbour) != artifact_id]
+
+    def _videos(self):
+        with self.index_lock:
+            if self.video_jobs is None:
+                # Imported here so video_jobs' logging setup does not override ours
+                from video_jobs import VideoJobManager
+                self.video_jobs = VideoJobManager(VIDEOS_DIR)
+        return self.video_jobs
+
+    def _video(self, artifact_id: str, prompt: str) -> Dict[str, Any]:
+        from video_jobs import COMPLETED
+        job = self._videos().generate(artifact_id, prompt)
+        if job["state"] != COMPLETED:
+            raise RuntimeError(job.get("error") or f"Video job ended {job['state']}")
+        return job
+
+    def generate_video(self, artifact_id: str, prompt: str) -> Dict[str, Any]:
+        """Generate an artifact's video ahead of any prefetch work, or return the finished job."""
+        return self.scheduler.submit("video", artifact_id, lambda: self._video(artifact_id, prompt)).result()
+
+    def _summarize(self, artifact_id: str, artifact: Dict[str, Any]):
+        summary = "".join(analyze_artifact(artifact))
+        if not summary:
+            raise RuntimeError("No summary generated")
+        self._prefetch_video(artifact_id, summary)
+
+    def _prefetch_video(self, artifact_id: str, summary: str):
+        if self.scheduler.budget_remaining("video") == 0:
+            return
+        if os.path.exists(os.path.join(VIDEOS_DIR, f"{artifact_id}.mp4")):
+            return
+        self.scheduler.prefetch("video", artifact_id, lambda: self._video(artifact_id, summary))
+
+    def prefetch(self, artifact_ids: List[str]):
+        """Queue background summaries (and, within budget, videos) for artifacts not yet generated."""
+        for artifact_id in artifact_ids:
+            artifact = self.lookup(artifact_id)
+            if artifact is None:
+                continue
+            prompt = artifact_prompt(artifact)
+            if summary_cache is not None and summary_cache_key(prompt) in summary_cache:
+                if self.scheduler.budget_remaining("video") != 0:
+                    self._prefetch_video(artifact_id, "".join(prompt_llm(prompt, summary_cache)))
+                continue
+            self.scheduler.prefetch("summary", artifact_id,
+                                    lambda artifact_id=artifact_id, artifact=artifact: self._summarize(artifact_id, artifact))
+
+def serve(host: str = "127.0.0.1", port: int = None, filepath: str = ARTIFACTS_FILE):
+    """Run the summary worker until interrupted."""
+    if port is None:
+        port = int(os.environ.get("SUMMARY_WORKER_PORT", 8765))
+    with SummaryWorker((host, port), filepath) as worker:
+        print(f"Summary worker listening on {host}:{port} with {len(worker.artifacts)} artifacts", flush=True)
+        if PREFETCH_POPULAR_FILE:
+            with open(PREFETCH_POPULAR_FILE) as f:
+                worker.prefetch([line.strip() for line in f if line.strip()])
+        try:
+            worker.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
 def main():
+    if len(sys.argv) == 2 and sys.argv[1] == "--serve":
+        serve()
+        return
+
     if len(sys.argv) != 2:
-        print("Error: Please provide an artifact ID")
+        print("Error: Please provide an artifact ID or --serve")
         sys.exit(1)
         
     artifact_id = sys.argv[1]
-    artifacts = load_artifact("limited_artifacts.csv", artifact_id)
+    artifacts = load_artifact(ARTIFACTS_FILE, artifact_id)
     
     if artifacts.empty:
         print(f"No artifact found with ID: {artifact_id}")
         sys.exit(1)
 
     artifact = artifacts.iloc[0].to_dict()
-    for chunk in analyze_artifact(artifact):
-        print(chunk, end='', flush=True)
+    try:
+        for chunk in analyze_artifact(artifact):
+            print(chunk, end='', flush=True)
+    except RuntimeError as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,181 @@
+import os
+import logging
+import pandas as pd
+from typing import Iterator, List, Optional, Sequence, Tuple
+from artifact_schema import ARTIFACT_DTYPES, CATEGORY_COLUMNS, apply_schema
+
+logger = logging.getLogger(__name__)
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+# pyarrow types for the schema dtypes. Text columns, categoricals included,
+# are stored as strings, which Parquet dictionary-encodes on its own.
+_ARROW_TYPES = {"boolean": "bool_", "float64": "float64", "Int64": "int64"}
+
+
+def is_parquet_path(path: str) -> bool:
+    """Return True if the path points at a Parquet corpus rather than a CSV."""
+    return str(path).endswith(PARQUET_SUFFIXES)
+
+
+def arrow_schema(columns: Sequence[str]):
+    """Arrow schema for artifact columns. Columns outside the schema are stored as strings."""
+    import pyarrow as pa
+
+    return pa.schema([
+        (column, getattr(pa, _ARROW_TYPES.get(ARTIFACT_DTYPES.get(column), "string"))())
+        for column in columns
+    ])
+
+
+def _to_arrow(df: pd.DataFrame, schema):
+    import pyarrow as pa
+
+    df = apply_schema(df).reindex(columns=schema.names)
+    converted = {}
+    for field in schema:
+        series = df[field.name]
+        if pa.types.is_string(field.type) and series.dtype != object:
+            # Empty or numeric-looking text columns are inferred as numbers on some pages
+            converted[field.name] = series.astype(object).where(series.isna(), series.astype(str))
+    if converted:
+        df = df.assign(**converted)
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False).replace_schema_metadata(None)
+
+
+class ArtifactParquetWriter:
+    """Write artifact pages to one Parquet file, one row group per page.
+
+    The column set and types are fixed by `schema`, or else by the first
+    page. Later pages are conformed to it: missing columns are written as
+    nulls and unexpected ones dropped with a warning.
+    """
+
+    def __init__(self, path: str, schema=None, compression: str = "zstd"):
+        self.path = path
+        self.compression = compression
+        self.schema = schema
+        self.writer = None
+        self.rows = 0
+
+    def _open(self, schema):
+        import pyarrow.parquet as pq
+
+        self.schema = schema
+        self.writer = pq.ParquetWriter(self.path, schema, compression=self.compression)
+
+    def write(self, df: pd.DataFrame):
+        """Append a page of artifacts as one row group."""
+        if self.writer is None:
+            self._open(self.schema or arrow_schema(list(df.columns)))
+        extra = [column for column in df.columns if column not in self.schema.names]
+        if extra:
+            logger.warning(f"Dropping columns not in the first page: {extra}")
+        self.write_table(_to_arrow(df, self.schema))
+
+    def write_table(self, table):
+        """Append an Arrow table already in the artifact schema as one row group."""
+        if self.writer is None:
+            self._open(self.schema or table.schema)
+        self.writer.write_table(table.cast(self.schema), row_group_size=max(len(table), 1))
+        self.rows += len(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_schema(path: str):
+    """Arrow schema of a Parquet file."""
+    import pyarrow.parquet as pq
+
+    return pq.read_schema(path, memory_map=True)
+
+
+def combine_parquet(part_paths: List[str], output_path: str) -> int:
+    """Concatenate page files into one Parquet file, keeping one row group per page.
+
+    The result replaces output_path atomically.
+
+    Returns:
+        Number of rows written
+    """
+    import pyarrow.parquet as pq
+
+    tmp_path = f"{output_path}.tmp"
+    with ArtifactParquetWriter(tmp_path) as writer:
+        for part_path in part_paths:
+            writer.write_table(pq.read_table(part_path, memory_map=True))
+    if writer.writer is None:
+        # No pages at all, still leave a valid (empty) file
+        pd.DataFrame().to_parquet(tmp_path)
+    os.replace(tmp_path, output_path)
+    return writer.rows
+
+
+def _to_pandas(table) -> pd.DataFrame:
+    import pyarrow as pa
+
+    mapping = {pa.bool_(): pd.BooleanDtype(), pa.int64(): pd.Int64Dtype()}
+    # apply_schema also turns Arrow's None for empty text into NaN, as from a CSV
+    return apply_schema(table.to_pandas(types_mapper=mapping.get))
+
+
+def _read_dictionary(path: str, columns: Optional[Sequence[str]]) -> List[str]:
+    names = read_schema(path).names
+    return [column for column in CATEGORY_COLUMNS if column in names and (columns is None or column in columns)]
+
+
+def read_parquet_artifacts(path: str, columns: Optional[Sequence[str]] = None,
+                           filters: Optional[List[Tuple]] = None) -> pd.DataFrame:
+    """Read a Parquet corpus memory-mapped, with the shared artifact dtypes.
+
+    Args:
+        path: Parquet file written by export_all_artifacts
+        columns: Only read these columns
+        filters: pyarrow predicates such as [("period", "==", "Ur III (ca. 2100-2000 BC)")].
+            Row groups whose statistics rule them out are skipped.
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, columns=list(columns) if columns is not None else None, filters=filters,
+                          memory_map=True, read_dictionary=_read_dictionary(path, columns))
+    return _to_pandas(table)
+
+
+def read_parquet_range(path: str, offset: int = 0, limit: int = 100,
+                       columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read `limit` rows starting after the first `offset`, touching only the row groups that hold them."""
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path, memory_map=True, read_dictionary=_read_dictionary(path, columns))
+    row_groups, first_row, start = [], None, 0
+    for index in range(parquet.num_row_groups):
+        rows = parquet.metadata.row_group(index).num_rows
+        if start + rows > offset and start < offset + limit:
+            if first_row is None:
+                first_row = start
+            row_groups.append(index)
+        start += rows
+    if not row_groups:
+        return _to_pandas(parquet.schema_arrow.empty_table().select(columns) if columns else
+                          parquet.schema_arrow.empty_table())
+    table = parquet.read_row_groups(row_groups, columns=list(columns) if columns is not None else None)
+    return _to_pandas(table.slice(offset - first_row, limit))
+
+
+def iter_parquet_artifacts(path: str, chunksize: int = 1000,
+                           columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield the corpus as DataFrames of up to `chunksize` rows."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path, memory_map=True, read_dictionary=_read_dictionary(path, columns))
+    for batch in parquet.iter_batches(batch_size=chunksize, columns=list(columns) if columns is not None else None):
+        yield _to_pandas(pa.Table.from_batches([batch]))
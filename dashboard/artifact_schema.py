@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+# Columns of the CDLI artifact export, in file order
+ARTIFACT_COLUMNS = [
+    "artifact_id", "cdli_comments", "designation", "artifact_type", "period", "provenience",
+    "written_in", "archive", "composite_no", "seal_no", "composites", "seals", "museum_no",
+    "accession_no", "condition_description", "artifact_preservation", "period_comments",
+    "provenience_comments", "artifact_type_comments", "is_provenience_uncertain",
+    "is_period_uncertain", "is_artifact_type_uncertain", "is_school_text", "height", "thickness",
+    "width", "weight", "elevation", "excavation_no", "findspot_square", "findspot_comments",
+    "stratigraphic_level", "surface_preservation", "artifact_comments", "seal_information",
+    "collections", "dates", "alternative_years", "genres", "languages", "materials",
+    "publications_key", "publications_type", "publications_exact_ref", "publications_comment",
+    "external_resources", "external_resources_key", "genres_comment", "genres_uncertain",
+    "languages_uncertain", "materials_aspect", "materials_color", "materials_uncertain", "retired",
+    "has_fragments", "is_artifact_fake", "redirect_artifact_id", "retired_comments",
+]
+
+# Text repeated across many artifacts (or mostly empty), stored once per distinct value
+CATEGORY_COLUMNS = [
+    "artifact_type", "period", "provenience", "written_in", "archive", "composites", "seals",
+    "condition_description", "artifact_preservation", "period_comments", "provenience_comments",
+    "artifact_type_comments", "surface_preservation", "stratigraphic_level", "findspot_square",
+    "findspot_comments", "collections", "dates", "alternative_years", "genres", "languages",
+    "materials", "materials_aspect", "materials_color", "publications_type", "external_resources",
+    "genres_comment", "retired_comments",
+    # One 0/1 flag per genre, language or material, joined with ";" like the values ("0;1")
+    "genres_uncertain", "languages_uncertain", "materials_uncertain",
+]
+
+# 0/1 flags, nullable because older exports leave some of them blank
+BOOLEAN_COLUMNS = [
+    "is_provenience_uncertain", "is_period_uncertain", "is_artifact_type_uncertain",
+    "is_school_text", "retired", "has_fragments", "is_artifact_fake",
+]
+
+# float64 rather than float32, so values leave the table as exported (12.3, not 12.300000190734863)
+FLOAT_COLUMNS = ["height", "thickness", "width", "weight", "elevation"]
+
+INTEGER_COLUMNS = ["redirect_artifact_id"]
+
+# artifact_id keeps its exported spelling ("1.0"), which video files,
+# summary caches and the dashboard all use as the key
+ARTIFACT_DTYPES: Dict[str, str] = {
+    **{column: "object" for column in ARTIFACT_COLUMNS},
+    "artifact_id": "str",
+    **{column: "category" for column in CATEGORY_COLUMNS},
+    **{column: "boolean" for column in BOOLEAN_COLUMNS},
+    **{column: "float64" for column in FLOAT_COLUMNS},
+    **{column: "Int64" for column in INTEGER_COLUMNS},
+}
+
+
+def select_columns(columns: Optional[Iterable[str]], required: Iterable[str] = ()) -> Optional[List[str]]:
+    """Columns to read: `columns` plus any `required` ones, or None for all."""
+    if columns is None:
+        return None
+    selected = list(columns)
+    return selected + [column for column in required if column not in selected]
+
+
+def read_artifacts(filepath_or_buffer, columns: Optional[Iterable[str]] = None, **kwargs) -> pd.DataFrame:
+    """Read an artifact CSV with the shared schema.
+
+    Args:
+        filepath_or_buffer: CSV path or file object
+        columns: Only read these columns, the rest are skipped while parsing
+        **kwargs: Passed on to pandas.read_csv, e.g. nrows or chunksize
+
+    Returns:
+        DataFrame, or an iterator of DataFrames when chunksize is given
+    """
+    return pd.read_csv(filepath_or_buffer, usecols=select_columns(columns), dtype=ARTIFACT_DTYPES, **kwargs)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert a DataFrame read without the schema (e.g. from SQLite) to the schema dtypes."""
+    converted = {}
+    for column in df.columns:
+        dtype = ARTIFACT_DTYPES.get(column)
+        series = df[column]
+        if dtype == "object":
+            # SQLite returns None for empty text, the CSV reader NaN
+            if series.dtype == object and series.isna().any():
+                converted[column] = series.where(series.notna(), np.nan)
+            continue
+        if dtype is None or str(series.dtype) == dtype:
+            continue
+        if dtype in ("boolean", "Int64", "float64"):
+            converted[column] = pd.to_numeric(series, errors="coerce").astype(dtype)
+        elif dtype == "category":
+            # SQLite may hold numeric-looking text (a flag column of "0.0") as numbers
+            converted[column] = series.where(series.isna(), series.astype(str)).astype("category")
+        elif dtype == "str":
+            converted[column] = series.where(series.isna(), series.astype(str))
+    return df.assign(**converted) if converted else df
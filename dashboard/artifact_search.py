@@ -0,0 +1,250 @@
+import re
+import json
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Union
+from artifact_store import ArtifactStore, is_store_path
+from artifact_schema import read_artifacts
+from artifact_parquet import is_parquet_path, read_parquet_artifacts
+
+logger = logging.getLogger(__name__)
+
+FACET_COLUMNS = ["period", "provenience", "artifact_type", "genres", "languages", "materials", "collections"]
+TEXT_COLUMNS = ["designation", "museum_no"]
+INDEX_COLUMNS = ["artifact_id"] + TEXT_COLUMNS + FACET_COLUMNS
+
+# Multi-valued fields in the CDLI export, e.g. "Lexical;Vocabularies"
+VALUE_SEPARATOR = ";"
+TOKEN = re.compile(r"[0-9a-z]+")
+
+
+def _postings(keys, rows: np.ndarray, sort: bool = False):
+    """Group rows by key: (keys, offsets, rows) with rows for keys[i] at rows[offsets[i]:offsets[i + 1]].
+
+    Without `sort`, keys are ordered by how many rows they have, most first.
+    """
+    codes, uniques = pd.factorize(keys, sort=sort)
+    counts = np.bincount(codes, minlength=len(uniques))
+    if not sort:
+        by_count = np.argsort(-counts, kind="stable")
+        codes = np.argsort(by_count)[codes]
+        uniques, counts = uniques[by_count], counts[by_count]
+    offsets = np.zeros(len(uniques) + 1, dtype=np.intp)
+    np.cumsum(counts, out=offsets[1:])
+    order = np.argsort(codes, kind="stable")
+    return np.asarray(uniques, dtype=object), offsets, rows[order].astype(np.intp)
+
+
+class _Facet:
+    """Inverted index for one facet column: value -> rows, grouped by value."""
+
+    def __init__(self, series: pd.Series):
+        # Facet columns have few distinct strings, so split those rather than every row
+        categorical = series.astype("category")
+        split = [[value.strip() for value in str(category).split(VALUE_SEPARATOR) if value.strip()]
+                 for category in categorical.cat.categories]
+        codes = categorical.cat.codes.to_numpy()
+        rows = np.flatnonzero(codes >= 0)
+        lengths = np.array([len(values) for values in split], dtype=np.intp)
+        repeats = lengths[codes[rows]]
+        names = np.array([value for values in split for value in values], dtype=object)
+        starts = (np.cumsum(lengths) - lengths)[codes[rows]]
+        position = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        keys = names[np.repeat(starts, repeats) + position]
+        self.values, self.offsets, self.rows = _postings(keys, np.repeat(rows, repeats))
+        self.lookup = {value: i for i, value in enumerate(self.values)}
+
+    def mask(self, selected: Iterable[str], size: int) -> np.ndarray:
+        """Rows holding any of the selected values."""
+        mask = np.zeros(size, dtype=bool)
+        for value in selected:
+            i = self.lookup.get(value)
+            if i is not None:
+                mask[self.rows[self.offsets[i]:self.offsets[i + 1]]] = True
+        return mask
+
+    def counts(self, mask: Optional[np.ndarray], limit: int) -> List[List[Any]]:
+        """[[value, count], ...] over the rows in mask (None for all rows), most frequent first."""
+        if not len(self.values):
+            return []
+        if mask is None:
+            counts = np.diff(self.offsets)
+        else:
+            # Postings are contiguous per value, so one gather and a segmented sum count them all
+            counts = np.add.reduceat(mask.view(np.uint8)[self.rows], self.offsets[:-1], dtype=np.int64)
+        top = np.flatnonzero(counts)
+        top = top[np.argsort(-counts[top], kind="stable")][:limit]
+        return [[self.values[i], int(counts[i])] for i in top]
+
+
+class _TextIndex:
+    """Token and whole-value prefix lookups over the text columns.
+
+    Both use sorted keys, so a prefix is a contiguous range found with
+    two binary searches rather than a scan over every row.
+    """
+
+    def __init__(self, frame: pd.DataFrame, columns: List[str]):
+        values = pd.concat([frame[column].astype(object).str.lower() for column in columns])
+        values = values[values.notna()]
+
+        tokens = values.str.findall(TOKEN.pattern).explode().dropna()
+        pairs = pd.DataFrame({"token": tokens.to_numpy(), "row": tokens.index.to_numpy()}).drop_duplicates()
+        self.tokens, self.token_offsets, self.token_rows = _postings(pairs["token"], pairs["row"].to_numpy(), sort=True)
+
+        # Object arrays of str sort and binary-search like fixed-width unicode
+        # ones without padding every value to the longest
+        order = np.argsort(values.to_numpy(), kind="stable")
+        self.values = values.to_numpy()[order]
+        self.value_rows = values.index.to_numpy()[order].astype(np.int32)
+
+    @staticmethod
+    def _range(keys: np.ndarray, prefix: str):
+        return np.searchsorted(keys, prefix, "left"), np.searchsorted(keys, prefix + "\uffff", "left")
+
+    def _token_rows(self, token: str, prefix: bool) -> np.ndarray:
+        if prefix:
+            lo, hi = self._range(self.tokens, token)
+        else:
+            lo = np.searchsorted(self.tokens, token, "left")
+            hi = lo + 1 if lo < len(self.tokens) and self.tokens[lo] == token else lo
+        return self.token_rows[self.token_offsets[lo]:self.token_offsets[hi]]
+
+    def match(self, text: str, size: int) -> np.ndarray:
+        """Rows containing every word of `text`. The last word may be incomplete."""
+        mask = np.ones(size, dtype=bool)
+        words = TOKEN.findall(text.lower())
+        for i, word in enumerate(words):
+            word_mask = np.zeros(size, dtype=bool)
+            word_mask[self._token_rows(word, prefix=(i == len(words) - 1))] = True
+            mask &= word_mask
+        return mask
+
+    def prefix(self, prefix: str, size: int) -> np.ndarray:
+        """Rows where a text column starts with `prefix`, ignoring case."""
+        lo, hi = self._range(self.values, prefix.lower())
+        mask = np.zeros(size, dtype=bool)
+        mask[self.value_rows[lo:hi]] = True
+        return mask
+
+
+def _combine(masks: Iterable[np.ndarray]) -> Optional[np.ndarray]:
+    """AND of the masks, or None when there are none, meaning every row."""
+    combined = None
+    for mask in masks:
+        combined = mask.copy() if combined is None else np.logical_and(combined, mask, out=combined)
+    return combined
+
+
+class ArtifactIndex:
+    """In-memory facet and text index over the artifact table.
+
+    Built once, after which every query is a handful of array operations
+    over precomputed postings instead of a DataFrame scan.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.frame = df[[column for column in INDEX_COLUMNS if column in df.columns]].reset_index(drop=True)
+        self.facets = {column: _Facet(self.frame[column]) for column in FACET_COLUMNS if column in self.frame}
+        self.text = _TextIndex(self.frame, [column for column in TEXT_COLUMNS if column in self.frame])
+        # Plain arrays to build result pages from, which is far cheaper than slicing the frame
+        self.columns = {column: self.frame[column].astype(object).to_numpy() for column in self.frame.columns}
+
+    @classmethod
+    def from_file(cls, filepath: str) -> "ArtifactIndex":
+        """Build the index from a CSV, Parquet file or artifact store, reading only the indexed columns."""
+        if is_store_path(filepath):
+            with ArtifactStore(filepath) as store:
+                df = store.get_range(0, len(store), INDEX_COLUMNS)
+        elif is_parquet_path(filepath):
+            df = read_parquet_artifacts(filepath, columns=INDEX_COLUMNS)
+        else:
+            df = read_artifacts(filepath, columns=INDEX_COLUMNS)
+        return cls(df)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _records(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        return [
+            {column: None if pd.isna(values[row]) else values[row] for column, values in self.columns.items()}
+            for row in rows
+        ]
+
+    def search(self, filters: Optional[Dict[str, Union[str, List[str]]]] = None, text: Optional[str] = None,
+               prefix: Optional[str] = None, offset: int = 0, limit: int = 50,
+               facet_limit: int = 20) -> Dict[str, Any]:
+        """Find artifacts by facet values and text, in corpus order.
+
+        Args:
+            filters: Facet column -> value or list of values. Values of one facet
+                are OR-ed, different facets AND-ed.
+            text: Words that must all appear in designation or museum_no
+            prefix: Start of designation or museum_no, e.g. "VAT 15"
+            offset: Number of matches to skip
+            limit: Maximum number of artifacts to return
+            facet_limit: Maximum number of values listed per facet
+
+        Returns:
+            Dict with the total match count, the requested page of artifacts
+            and facet counts. Counts for a filtered facet ignore that facet's
+            own filter so the other values stay selectable.
+        """
+        size = len(self.frame)
+        unknown = [column for column in (filters or {}) if column not in self.facets]
+        if unknown:
+            raise ValueError(f"Unknown facets: {unknown}")
+
+        masks = {}
+        if text:
+            masks["text"] = self.text.match(text, size)
+        if prefix:
+            masks["prefix"] = self.text.prefix(prefix, size)
+        for column, selected in (filters or {}).items():
+            masks[column] = self.facets[column].mask([selected] if isinstance(selected, str) else selected, size)
+        mask = _combine(masks.values())
+
+        facets = {}
+        for column, facet in self.facets.items():
+            if column in masks:
+                facet_mask = _combine([other for name, other in masks.items() if name != column])
+            else:
+                facet_mask = mask
+            facets[column] = facet.counts(facet_mask, facet_limit)
+
+        matches = np.arange(size) if mask is None else np.flatnonzero(mask)
+        return {
+            "total": len(matches),
+            "offset": offset,
+            "limit": limit,
+            "artifacts": self._records(matches[offset:offset + limit]),
+            "facets": facets,
+        }
+
+
+def main():
+    import argparse
+    from artifact_augmentation import ARTIFACTS_FILE
+
+    parser = argparse.ArgumentParser(description="Search the artifact table")
+    parser.add_argument("--input", default=ARTIFACTS_FILE, help="Artifacts CSV, Parquet file or store")
+    parser.add_argument("--filter", action="append", default=[], metavar="FACET=VALUE",
+                        help=f"Repeatable. Facets: {', '.join(FACET_COLUMNS)}")
+    parser.add_argument("--text", help="Words to find in designation or museum_no")
+    parser.add_argument("--prefix", help="Start of designation or museum_no")
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    filters: Dict[str, List[str]] = {}
+    for item in args.filter:
+        column, _, value = item.partition("=")
+        filters.setdefault(column, []).append(value)
+
+    index = ArtifactIndex.from_file(args.input)
+    print(json.dumps(index.search(filters, args.text, args.prefix, args.offset, args.limit), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import os
+import re
+import json
+import zlib
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from artifact_store import ArtifactStore, is_store_path
+from artifact_schema import read_artifacts
+from artifact_parquet import is_parquet_path, read_parquet_artifacts
+
+logger = logging.getLogger(__name__)
+
+# Whole values, split on ";", e.g. "genres=Lexical"
+VALUE_FIELDS = [
+    "artifact_type", "period", "provenience", "written_in", "archive", "genres", "languages",
+    "materials", "materials_aspect", "materials_color", "collections", "composites", "seals",
+    "findspot_square",
+]
+# Free text, split into words
+TEXT_FIELDS = [
+    "designation", "genres_comment", "artifact_comments", "cdli_comments", "condition_description",
+    "artifact_preservation", "surface_preservation", "findspot_comments",
+]
+DIMENSION_FIELDS = ["height", "width", "thickness"]
+SIMILARITY_COLUMNS = ["artifact_id"] + VALUE_FIELDS + TEXT_FIELDS + DIMENSION_FIELDS
+
+HASH_DIMENSIONS = 256
+# Length of the size features relative to the unit-length text features
+DIMENSION_WEIGHT = 0.3
+# Rows scored per matrix product, bounding the scratch memory of batch queries
+BLOCK_ROWS = 65536
+
+SIMILARITY_INDEX = os.environ.get("SIMILARITY_INDEX", "similarity_index")
+WORD = re.compile(r"[0-9a-z]{2,}")
+
+
+def _expand(series: pd.Series, tokenize) -> Tuple[np.ndarray, np.ndarray]:
+    """(rows, tokens) for every token of every value, tokenizing each distinct value once."""
+    codes, uniques = pd.factorize(series.astype(object))
+    per_value = [tokenize(str(value)) for value in uniques]
+    lengths = np.array([len(tokens) for tokens in per_value], dtype=np.intp)
+    flat = np.array([token for tokens in per_value for token in tokens], dtype=object)
+    rows = np.flatnonzero(codes >= 0)
+    repeats = lengths[codes[rows]]
+    starts = np.repeat((np.cumsum(lengths) - lengths)[codes[rows]], repeats)
+    position = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    return np.repeat(rows, repeats), flat[starts + position]
+
+
+def _tokens(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """(rows, tokens) over the descriptive fields, one pair per distinct token of a row."""
+    pairs = []
+    for field in VALUE_FIELDS:
+        if field in df:
+            pairs.append(_expand(df[field], lambda value, field=field: [
+                f"{field}={part.strip()}" for part in value.split(";") if part.strip()]))
+    for field in TEXT_FIELDS:
+        if field in df:
+            pairs.append(_expand(df[field], lambda value: WORD.findall(value.lower())))
+    if not pairs:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=object)
+    pairs = pd.DataFrame({
+        "row": np.concatenate([rows for rows, _ in pairs]),
+        "token": np.concatenate([tokens for _, tokens in pairs]),
+    }).drop_duplicates()
+    return pairs["row"].to_numpy(), pairs["token"].to_numpy()
+
+
+def _hash(tokens: np.ndarray, dimensions: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Bucket and sign of each token. crc32 rather than hash() so vectors are stable across processes."""
+    hashes = np.array([zlib.crc32(token.encode("utf-8")) for token in tokens], dtype=np.uint32)
+    signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+    return (hashes % dimensions).astype(np.intp), signs
+
+
+def _normalize(vectors: np.ndarray):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+
+def artifact_vectors(df: pd.DataFrame, dimensions: int = HASH_DIMENSIONS) -> np.ndarray:
+    """Unit-length float32 feature vectors, one row per artifact.
+
+    Descriptive fields become TF-IDF weighted tokens hashed into `dimensions`
+    buckets. Height, width and thickness are appended as log-scaled z-scores,
+    so the dot product of two rows is their cosine similarity.
+    """
+    rows, tokens = _tokens(df)
+    vectors = np.zeros((len(df), dimensions + len(DIMENSION_FIELDS)), dtype=np.float32)
+
+    codes, uniques = pd.factorize(tokens)
+    if len(uniques):
+        document_frequency = np.bincount(codes, minlength=len(uniques))
+        idf = (np.log((1 + len(df)) / (1 + document_frequency)) + 1).astype(np.float32)
+        buckets, signs = _hash(np.asarray(uniques, dtype=object), dimensions)
+        np.add.at(vectors, (rows, buckets[codes]), (signs * idf)[codes])
+    _normalize(vectors[:, :dimensions])
+
+    for i, field in enumerate(DIMENSION_FIELDS):
+        if field not in df:
+            continue
+        values = np.log1p(pd.to_numeric(df[field], errors="coerce").astype("float64").clip(lower=0).to_numpy())
+        known = ~np.isnan(values)
+        if known.sum() > 1 and values[known].std() > 0:
+            # Unknown sizes sit at the mean and so neither attract nor repel
+            values = np.where(known, (values - values[known].mean()) / values[known].std(), 0.0)
+            vectors[:, dimensions + i] = values * DIMENSION_WEIGHT / np.sqrt(len(DIMENSION_FIELDS))
+    _normalize(vectors)
+    return vectors
+
+
+def _load_columns(filepath: str) -> pd.DataFrame:
+    if is_store_path(filepath):
+        with ArtifactStore(filepath) as store:
+            return store.get_range(0, len(store), SIMILARITY_COLUMNS)
+    if is_parquet_path(filepath):
+        return read_parquet_artifacts(filepath, columns=SIMILARITY_COLUMNS)
+    return read_artifacts(filepath, columns=SIMILARITY_COLUMNS)
+
+
+def build_similarity_index(filepath: str, index_dir: str = SIMILARITY_INDEX,
+                           dimensions: int = HASH_DIMENSIONS) -> int:
+    """Compute vectors for an artifacts CSV, Parquet file or store and save them to index_dir.
+
+    Returns:
+        Number of artifacts indexed
+    """
+    df = _load_columns(filepath)
+    vectors = artifact_vectors(df, dimensions)
+    ids = df["artifact_id"].astype(str).to_numpy().astype(str)
+
+    os.makedirs(index_dir, exist_ok=True)
+    # Each file is written aside and swapped in, so a reader never sees a partial one
+    for name, array in (("vectors.npy", vectors), ("ids.npy", ids)):
+        tmp_path = os.path.join(index_dir, f"{name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, os.path.join(index_dir, name))
+    with open(os.path.join(index_dir, "meta.json.tmp"), "w") as f:
+        json.dump({"source": os.path.abspath(filepath), "artifacts": len(ids), "dimensions": dimensions,
+                   "dimension_weight": DIMENSION_WEIGHT}, f)
+    os.replace(os.path.join(index_dir, "meta.json.tmp"), os.path.join(index_dir, "meta.json"))
+    return len(ids)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k highest scores in each row, best first."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.intp)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+class SimilarityIndex:
+    """Nearest-neighbour queries over vectors saved by build_similarity_index.
+
+    The vector matrix is memory-mapped, so opening the index is cheap and
+    the OS page cache shares it between worker processes.
+    """
+
+    def __init__(self, index_dir: str = SIMILARITY_INDEX):
+        if not os.path.exists(os.path.join(index_dir, "vectors.npy")):
+            raise FileNotFoundError(f"No similarity index in {index_dir}, build it with: "
+                                    f"python artifact_similarity.py build")
+        self.vectors = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r")
+        self.ids = np.load(os.path.join(index_dir, "ids.npy"), mmap_mode="r")
+        self.rows = {artifact_id: row for row, artifact_id in enumerate(self.ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def similar_many(self, artifact_ids: Sequence[str], k: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """Top-k most similar artifacts for each ID, scored with one matrix product per block.
+
+        Unknown IDs map to an empty list. An artifact is never its own neighbour.
+        """
+        known = [str(artifact_id) for artifact_id in artifact_ids if str(artifact_id) in self.rows]
+        results = {str(artifact_id): [] for artifact_id in artifact_ids}
+        if not known or k <= 0:
+            return results
+        query_rows = np.array([self.rows[artifact_id] for artifact_id in known])
+        queries = np.asarray(self.vectors[query_rows])
+
+        # Running best k + 1 per query (one extra for the artifact itself)
+        best_rows = np.zeros((len(known), 0), dtype=np.intp)
+        best_scores = np.zeros((len(known), 0), dtype=np.float32)
+        for start in range(0, len(self.vectors), BLOCK_ROWS):
+            scores = queries @ np.asarray(self.vectors[start:start + BLOCK_ROWS]).T
+            inside = (query_rows >= start) & (query_rows < start + scores.shape[1])
+            scores[np.flatnonzero(inside), query_rows[inside] - start] = -np.inf
+            top = _top_k(scores, k)
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            keep = _top_k(best_scores, k)
+            best_rows = np.take_along_axis(best_rows, keep, axis=1)
+            best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        for artifact_id, rows, scores in zip(known, best_rows, best_scores):
+            results[artifact_id] = [
+                {"artifact_id": str(self.ids[row]), "score": round(float(score), 4)}
+                for row, score in zip(rows, scores) if np.isfinite(score)
+            ]
+        return results
+
+    def similar(self, artifact_id: str, k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """Top-k most similar artifacts, best first, or None if the ID is not indexed."""
+        if str(artifact_id) not in self.rows:
+            return None
+        return self.similar_many([artifact_id], k)[str(artifact_id)]
+
+
+def main():
+    import argparse
+    from artifact_augmentation import ARTIFACTS_FILE
+
+    parser = argparse.ArgumentParser(description="Find artifacts similar to a given one")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Compute and save the vectors")
+    build.add_argument("--input", default=ARTIFACTS_FILE, help="Artifacts CSV, Parquet file or store")
+    build.add_argument("--index", default=SIMILARITY_INDEX, help="Directory to write the index to")
+    build.add_argument("--dimensions", type=int, default=HASH_DIMENSIONS, help="Hashed text features")
+    query = subparsers.add_parser("query", help="Print the artifacts most similar to one")
+    query.add_argument("artifact_id")
+    query.add_argument("-k", type=int, default=10)
+    query.add_argument("--index", default=SIMILARITY_INDEX)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == "build":
+        count = build_similarity_index(args.input, args.index, args.dimensions)
+        print(f"Indexed {count} artifacts in {args.index}")
+        return
+
+    neighbours = SimilarityIndex(args.index).similar(args.artifact_id, args.k)
+    if neighbours is None:
+        print(f"No artifact found with ID: {args.artifact_id}")
+        raise SystemExit(1)
+    print(json.dumps(neighbours, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import os
+import sqlite3
+import logging
+import pandas as pd
+from typing import Dict, Any, List, Optional
+from artifact_schema import apply_schema
+
+logger = logging.getLogger(__name__)
+
+STORE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+TABLE = "artifacts"
+
+
+def is_store_path(path: str) -> bool:
+    """Return True if the path points at an artifact store rather than a CSV."""
+    return str(path).endswith(STORE_SUFFIXES)
+
+
+def build_artifact_store(csv_path: str, db_path: str, chunksize: int = 10000) -> int:
+    """Turn a scraped artifacts CSV into an indexed SQLite store.
+
+    The CSV is read in chunks so the full corpus never has to fit in memory.
+    Rows keep their CSV order as SQLite rowids, which makes range reads cheap,
+    and an index on artifact_id makes single lookups O(log n).
+
+    Args:
+        csv_path: Path to the CSV produced by CDLIAPIScraper
+        db_path: Path of the store to create (replaced if it exists)
+        chunksize: Number of CSV rows to parse and insert at a time
+
+    Returns:
+        Number of rows written
+    """
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    total = 0
+    connection = sqlite3.connect(tmp_path)
+    try:
+        for chunk in pd.read_csv(csv_path, dtype={'artifact_id': str}, chunksize=chunksize):
+            chunk.to_sql(TABLE, connection, if_exists='append', index=False)
+            total += len(chunk)
+            logger.info(f"Stored {total} artifacts")
+        connection.execute(f"CREATE INDEX IF NOT EXISTS idx_artifact_id ON {TABLE}(artifact_id)")
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, db_path)
+    return total
+
+
+class ArtifactStore:
+    """Read access to an artifact store built by build_artifact_store."""
+
+    def __init__(self, db_path: str):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(db_path)
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+
+    def _select(self, columns: Optional[List[str]]) -> str:
+        if columns is None:
+            return "*"
+        available = {row[1] for row in self.connection.execute(f"PRAGMA table_info({TABLE})")}
+        unknown = [column for column in columns if column not in available]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+        return ", ".join(f'"{column}"' for column in columns)
+
+    def get(self, artifact_id: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Fetch the row(s) for one artifact ID without touching the rest of the corpus."""
+        return apply_schema(pd.read_sql_query(
+            f"SELECT {self._select(columns)} FROM {TABLE} WHERE artifact_id = ?",
+            self.connection,
+            params=(str(artifact_id),),
+        ))
+
+    def get_record(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch one artifact as a dict, or None if it is not in the store."""
+        df = self.get(artifact_id)
+        if df.empty:
+            return None
+        return df.iloc[0].to_dict()
+
+    def get_range(self, offset: int = 0, limit: int = 100, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Fetch `limit` rows in corpus order, starting after the first `offset` rows."""
+        return apply_schema(pd.read_sql_query(
+            f"SELECT {self._select(columns)} FROM {TABLE} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            self.connection,
+            params=(int(offset), int(limit)),
+        ))
+
+    def neighbour_ids(self, artifact_id: str, radius: int = 2) -> List[str]:
+        """IDs of the artifacts up to `radius` rows either side of this one in corpus order."""
+        row = self.connection.execute(
+            f"SELECT rowid FROM {TABLE} WHERE artifact_id = ? LIMIT 1", (str(artifact_id),)).fetchone()
+        if row is None:
+            return []
+        return [artifact_id for (artifact_id,) in self.connection.execute(
+            f"SELECT artifact_id FROM {TABLE} WHERE rowid BETWEEN ? AND ? AND rowid != ? ORDER BY rowid",
+            (row[0] - radius, row[0] + radius, row[0]),
+        )]
+
+    def __len__(self) -> int:
+        return self.connection.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) != 3:
+        print("Usage: python artifact_store.py <artifacts.csv> <artifacts.db>")
+        sys.exit(1)
+    count = build_artifact_store(sys.argv[1], sys.argv[2])
+    print(f"Built {sys.argv[2]} with {count} artifacts")
@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+from tts_pipeline import ElevenLabsSynthesizer, DEFAULT_MODEL, DEFAULT_VOICE, speak
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Directory the dashboard serves pre-rendered narration from
+NARRATION_DIR = os.environ.get("NARRATION_DIR", "narration")
+
+
+def narration_path(artifact_id: str, narration_dir: str = NARRATION_DIR) -> str:
+    return os.path.join(narration_dir, f"{artifact_id}.mp3")
+
+
+def iter_summaries(path: str, ids: Optional[Set[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the latest summary record per artifact from a batch_summaries.py JSONL file."""
+    latest = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partially written last line from an interrupted run
+            if "summary" not in record:
+                continue
+            if ids is not None and str(record["artifact_id"]) not in ids:
+                continue
+            latest[str(record["artifact_id"])] = record
+    yield from latest.values()
+
+
+def render_narration(artifact_id: str, summary: str, synthesize: Callable[..., Iterator[bytes]],
+                     narration_dir: str = NARRATION_DIR) -> int:
+    """Synthesize a summary to `<narration_dir>/<artifact_id>.mp3`, moving it into place atomically.
+
+    Returns:
+        Number of bytes written
+    """
+    path = narration_path(artifact_id, narration_dir)
+    os.makedirs(narration_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    written = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in speak(iter([summary]), synthesize):
+                f.write(chunk)
+                written += len(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return written
+
+
+def render_all(summaries: Iterator[Dict[str, Any]], synthesize: Callable[..., Iterator[bytes]],
+               narration_dir: str = NARRATION_DIR, concurrency: int = 2, force: bool = False) -> Dict[str, Any]:
+    """Render narration for every summary that does not have an audio file yet.
+
+    Returns:
+        Counts of rendered, failed and skipped artifacts, bytes written and time taken
+    """
+    stats = {"rendered": 0, "failed": 0, "skipped": 0, "bytes": 0}
+    lock = threading.Lock()
+    start = time.monotonic()
+
+    def render(record):
+        artifact_id = str(record["artifact_id"])
+        try:
+            size = render_narration(artifact_id, record["summary"], synthesize, narration_dir)
+        except Exception as e:
+            logger.error(f"Narration for artifact {artifact_id} failed: {e}")
+            with lock:
+                stats["failed"] += 1
+            return
+        with lock:
+            stats["rendered"] += 1
+            stats["bytes"] += size
+        logger.info(f"Narration for artifact {artifact_id} saved ({size} bytes)")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for record in summaries:
+            if not force and os.path.exists(narration_path(str(record["artifact_id"]), narration_dir)):
+                stats["skipped"] += 1
+                continue
+            executor.submit(render, record)
+
+    stats["seconds"] = round(time.monotonic() - start, 3)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render narration audio for generated artifact summaries")
+    parser.add_argument("--input", default="summaries.jsonl", help="JSONL written by batch_summaries.py")
+    parser.add_argument("--output-dir", default=NARRATION_DIR, help="Directory to write <artifact_id>.mp3 files to")
+    parser.add_argument("--ids", nargs="*", help="Only render these artifact IDs")
+    parser.add_argument("--concurrency", type=int, default=2, help="Artifacts rendered at once")
+    parser.add_argument("--voice", default=DEFAULT_VOICE)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--force", action="store_true", help="Re-render artifacts that already have audio")
+    args = parser.parse_args()
+
+    if not os.environ.get("ELEVENLABS_API_KEY"):
+        logger.error("ELEVENLABS_API_KEY environment variable not set")
+        sys.exit(1)
+
+    synthesizer = ElevenLabsSynthesizer(voice=args.voice, model=args.model)
+    summaries = iter_summaries(args.input, ids=set(args.ids) if args.ids else None)
+    result = render_all(summaries, synthesizer, args.output_dir, args.concurrency, args.force)
+    if synthesizer.cache is not None:
+        result["cache"] = synthesizer.cache.stats
+    logger.info(f"Narration complete: {result}")
+
+
+if __name__ == "__main__":
+    main()
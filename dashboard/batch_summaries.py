@@ -0,0 +1,246 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import anthropic
+from dotenv import load_dotenv
+from typing import Dict, Any, Iterable, Iterator, Optional, Set
+from artifact_augmentation import artifact_prompt, summary_cache, summary_cache_key, system, MODEL
+from artifact_store import ArtifactStore, is_store_path
+from artifact_schema import read_artifacts
+from artifact_parquet import is_parquet_path, iter_parquet_artifacts
+from content_store import ContentStore
+from inscription_parser import InscriptionCorpus
+from llm_gateway import LLMGateway
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Status codes worth retrying: rate limited, overloaded and transient server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def iter_artifacts(filepath: str, ids: Optional[Set[str]] = None, limit: Optional[int] = None,
+                   chunksize: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Yield artifact rows as dicts from a CSV table, Parquet export or artifact store, a chunk at a time."""
+    yielded = 0
+    if is_store_path(filepath):
+        store = ArtifactStore(filepath)
+        chunks = (store.get_range(offset, chunksize) for offset in range(0, len(store), chunksize))
+    elif is_parquet_path(filepath):
+        chunks = iter_parquet_artifacts(filepath, chunksize)
+    else:
+        chunks = read_artifacts(filepath, chunksize=chunksize)
+
+    for chunk in chunks:
+        for artifact in chunk.to_dict("records"):
+            if ids is not None and str(artifact["artifact_id"]) not in ids:
+                continue
+            yield artifact
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """IDs that already have a summary in the output file, so a rerun can skip them."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partially written last line from an interrupted run
+            if "summary" in record:
+                done.add(str(record["artifact_id"]))
+    return done
+
+
+def _trim_partial_line(output_path: str):
+    """Cut a partly written last line from an interrupted run, so the next record starts on a line of its own."""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                f.truncate(start + newline + 1)
+                return
+            end = start
+        f.truncate(0)
+
+
+def _retry_after(error: anthropic.APIStatusError) -> Optional[float]:
+    value = error.response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class BatchSummarizer:
+    """Generate artifact summaries with bounded concurrency over the gateway's async client.
+
+    A rate-limit response pauses every worker until its retry-after has
+    passed, not only the one that received it. Each result is appended to
+    the output JSONL as soon as it finishes.
+    """
+
+    def __init__(self, gateway: LLMGateway, concurrency: int = 4, max_retries: int = 5,
+                 base_delay: float = 1.0, cache: Optional[ContentStore] = None,
+                 inscriptions: Optional[InscriptionCorpus] = None):
+        # The gateway should not retry itself, so that retry-after is shared across workers
+        self.gateway = gateway
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.cache = cache
+        # Defaults to the index the summary worker reads, so both build the same prompts
+        self.inscriptions = inscriptions
+        self.paused_until = 0.0
+        self.stats = {"completed": 0, "failed": 0, "retries": 0}
+
+    async def _wait_if_paused(self):
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def summarize(self, artifact: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = artifact_prompt(artifact, self.inscriptions)
+        record = {"artifact_id": str(artifact["artifact_id"])}
+        start = time.monotonic()
+
+        for attempt in range(self.max_retries + 1):
+            await self._wait_if_paused()
+            try:
+                response = await self.gateway.acomplete(prompt, system=system, model=MODEL, max_tokens=2048)
+                break
+            except (anthropic.APIStatusError, anthropic.APIConnectionError) as e:
+                retryable = isinstance(e, anthropic.APIConnectionError) or e.status_code in RETRYABLE_STATUS
+                if not retryable or attempt == self.max_retries:
+                    record["error"] = str(e)
+                    self.stats["failed"] += 1
+                    return record
+
+                delay = _retry_after(e) if isinstance(e, anthropic.APIStatusError) else None
+                if delay is None:
+                    delay = self.base_delay * 2 ** attempt * random.uniform(0.5, 1.0)
+                if isinstance(e, anthropic.RateLimitError):
+                    self.paused_until = max(self.paused_until, time.monotonic() + delay)
+                self.stats["retries"] += 1
+                logger.warning(f"Retrying artifact {record['artifact_id']} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+        summary = "".join(block.text for block in response.content if block.type == "text")
+        if self.cache is not None:
+            self.cache.put(summary_cache_key(prompt), summary.encode("utf-8"))
+        self.stats["completed"] += 1
+        record.update({
+            "summary": summary,
+            "model": MODEL,
+            "input_tokens": response.usage.input_tokens,
+            "output_tokens": response.usage.output_tokens,
+            "seconds": round(time.monotonic() - start, 3),
+        })
+        return record
+
+    async def run(self, artifacts: Iterable[Dict[str, Any]], output_path: str) -> Dict[str, Any]:
+        """Summarize every artifact not already in `output_path`, appending results to it.
+
+        Returns:
+            Counts of completed, failed, skipped and retried artifacts plus throughput
+        """
+        done = completed_ids(output_path)
+        _trim_partial_line(output_path)
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        start = time.monotonic()
+        skipped = 0
+
+        with open(output_path, "a") as output:
+            async def worker():
+                while True:
+                    artifact = await queue.get()
+                    if artifact is None:
+                        return
+                    try:
+                        record = await self.summarize(artifact)
+                    except Exception as e:
+                        # A bad row fails that artifact only, the worker carries on with the next
+                        logger.exception(f"Failed to summarize artifact {artifact.get('artifact_id')}")
+                        record = {"artifact_id": str(artifact.get("artifact_id")), "error": repr(e)}
+                        self.stats["failed"] += 1
+                    output.write(json.dumps(record) + "\n")
+                    output.flush()
+                    finished = self.stats["completed"] + self.stats["failed"]
+                    if finished % 10 == 0:
+                        rate = self.stats["completed"] / max(time.monotonic() - start, 1e-9) * 60
+                        logger.info(f"{finished} artifacts processed, {rate:.1f} artifacts/min")
+
+            async def produce():
+                nonlocal skipped
+                for artifact in artifacts:
+                    if str(artifact["artifact_id"]) in done:
+                        skipped += 1
+                        continue
+                    await queue.put(artifact)
+                for _ in range(self.concurrency):
+                    await queue.put(None)
+
+            # Gathered together, so a worker that dies (e.g. the output cannot be written)
+            # fails the batch instead of leaving the producer blocked on a full queue
+            tasks = [asyncio.create_task(produce())] + [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        elapsed = time.monotonic() - start
+        return {
+            **self.stats,
+            "skipped": skipped,
+            "seconds": round(elapsed, 3),
+            "artifacts_per_minute": round(self.stats["completed"] / elapsed * 60, 2) if elapsed else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate artifact summaries into a JSONL file")
+    parser.add_argument("--input", default="limited_artifacts.csv", help="Artifact CSV, Parquet export or store")
+    parser.add_argument("--output", default="summaries.jsonl", help="JSONL file to append results to")
+    parser.add_argument("--ids", nargs="*", help="Only summarize these artifact IDs")
+    parser.add_argument("--limit", type=int, help="Stop after this many artifacts")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    parser.add_argument("--no-cache", action="store_true", help="Do not write results to the summary cache")
+    parser.add_argument("--inscriptions", help="Inscription index to add to the prompts instead of the default one")
+    args = parser.parse_args()
+
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        logger.error("ANTHROPIC_API_KEY environment variable not set")
+        sys.exit(1)
+
+    # Retries are handled by BatchSummarizer so that retry-after is shared
+    gateway = LLMGateway(api_key=api_key, max_retries=0)
+    summarizer = BatchSummarizer(gateway, concurrency=args.concurrency,
+                                 cache=None if args.no_cache else summary_cache,
+                                 inscriptions=InscriptionCorpus.load(args.inscriptions) if args.inscriptions else None)
+    artifacts = iter_artifacts(args.input, ids=set(args.ids) if args.ids else None, limit=args.limit)
+    result = asyncio.run(summarizer.run(artifacts, args.output))
+    logger.info(f"Batch complete: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare serving a page of artifacts: parsing the CSV per request vs precompressed page shards.
+
+Usage:
+    python benchmarks/bench_artifact_pages.py [--rows N] [--page-size N] [--json results.json]
+
+A corpus of --rows artifacts is synthesised from limited_artifacts.csv (or
+all_artifacts.csv is used when it exists) and built into pages. For pages at
+the start, middle and end of the table, the per-request path reads that slice
+of the CSV and serializes it to JSON, as /artifacts-data did for its fixed 100
+rows; the shard path reads the stored gzip file that is sent as is.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import tempfile
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DASHBOARD_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from artifact_schema import read_artifacts  # noqa: E402
+from bench_artifact_store import FULL_CSV, make_corpus  # noqa: E402
+from file_artifacts import build_artifact_pages  # noqa: E402
+
+
+def per_request(csv_path: str, offset: int, page_size: int) -> bytes:
+    """Parse one page of the CSV and encode it, the work the server repeated for every request."""
+    df = read_artifacts(csv_path, nrows=page_size, skiprows=range(1, offset + 1))
+    rows = df.astype(object).where(df.notna(), "").astype(str).to_dict("records")
+    return json.dumps(rows).encode("utf-8")
+
+
+def timed(fn, repeats: int) -> float:
+    """Median milliseconds per call."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = FULL_CSV if os.path.exists(FULL_CSV) else os.path.join(tmpdir, "artifacts.csv")
+        if csv_path != FULL_CSV:
+            make_corpus(args.rows, csv_path)
+        pages_dir = os.path.join(tmpdir, "pages")
+
+        start = time.perf_counter()
+        manifest = build_artifact_pages(csv_path, pages_dir, args.page_size)
+        build_seconds = time.perf_counter() - start
+        pages = manifest["pages"]
+
+        results = {"rows": manifest["total"], "pages": len(pages), "page_size": args.page_size,
+                   "build_seconds": round(build_seconds, 2), "encodings": manifest["encodings"],
+                   "csv_mb": round(os.path.getsize(csv_path) / 1e6, 1),
+                   "json_mb": round(sum(page["bytes"] for page in pages) / 1e6, 1),
+                   "gzip_mb": round(sum(page["gzip_bytes"] for page in pages) / 1e6, 1), "requests": {}}
+        for label, number in (("first", 0), ("middle", len(pages) // 2), ("last", len(pages) - 1)):
+            page = pages[number]
+            path = os.path.join(pages_dir, f"{page['file']}.gz")
+
+            def read_shard():
+                with open(path, "rb") as f:
+                    return f.read()
+
+            results["requests"][label] = {
+                "page": number,
+                "per_request_ms": round(timed(lambda: per_request(csv_path, number * args.page_size,
+                                                                  args.page_size), args.repeats), 2),
+                "shard_ms": round(timed(read_shard, args.repeats), 3),
+                "json_bytes": page["bytes"], "gzip_bytes": page["gzip_bytes"],
+            }
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
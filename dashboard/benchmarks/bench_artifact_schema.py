@@ -0,0 +1,73 @@
+"""Compare parse time, memory and filter time: inferred dtypes vs the shared artifact schema.
+
+Usage:
+    python benchmarks/bench_artifact_schema.py [--rows N] [--json results.json]
+
+The corpus is synthesised from limited_artifacts.csv (all_artifacts.csv is
+used instead when it exists).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import pandas as pd
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DASHBOARD_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from artifact_schema import read_artifacts  # noqa: E402
+from bench_artifact_store import FULL_CSV, make_corpus  # noqa: E402
+
+SUBSET = ["artifact_id", "designation", "period", "provenience", "artifact_type"]
+
+
+def measure(label: str, load) -> dict:
+    start = time.perf_counter()
+    df = load()
+    parse_s = time.perf_counter() - start
+    period = df["period"].dropna().iloc[0]
+    start = time.perf_counter()
+    for _ in range(10):
+        matches = int((df["period"] == period).sum())
+    filter_ms = (time.perf_counter() - start) / 10 * 1000
+    return {
+        "method": label,
+        "rows": len(df),
+        "parse_s": round(parse_s, 3),
+        "memory_mb": round(df.memory_usage(deep=True).sum() / 1e6, 1),
+        "filter_ms": round(filter_ms, 3),
+        "matches": matches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000, help="Synthetic corpus size when all_artifacts.csv is absent")
+    parser.add_argument("--json", help="Write results to this file as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = FULL_CSV
+        if not os.path.exists(csv_path):
+            csv_path = os.path.join(tmpdir, "artifacts.csv")
+            make_corpus(args.rows, csv_path)
+
+        results = [
+            measure("inferred", lambda: pd.read_csv(csv_path, dtype={'artifact_id': str})),
+            measure("schema", lambda: read_artifacts(csv_path)),
+            measure("schema_subset", lambda: read_artifacts(csv_path, columns=SUBSET)),
+        ]
+    for result in results:
+        print(f"{result['method']:>14}: parse {result['parse_s']:6.2f} s, memory {result['memory_mb']:8.1f} MB, "
+              f"filter {result['filter_ms']:7.3f} ms", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
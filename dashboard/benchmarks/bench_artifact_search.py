@@ -0,0 +1,93 @@
+"""Compare query latency: DataFrame scans vs the artifact search index.
+
+Usage:
+    python benchmarks/bench_artifact_search.py [--rows N] [--json results.json]
+
+The corpus is synthesised from limited_artifacts.csv (all_artifacts.csv is
+used instead when it exists).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import tempfile
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DASHBOARD_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from artifact_schema import read_artifacts  # noqa: E402
+from artifact_search import INDEX_COLUMNS, ArtifactIndex  # noqa: E402
+from bench_artifact_store import FULL_CSV, make_corpus  # noqa: E402
+
+
+def scan(df, filters, text, prefix, limit=50):
+    """The query answered by rescanning the DataFrame, as the dashboard would without an index."""
+    mask = None
+    for column, value in filters.items():
+        column_mask = df[column].astype(object).str.split(";").apply(lambda values: isinstance(values, list) and value in values)
+        mask = column_mask if mask is None else mask & column_mask
+    for column in ("designation", "museum_no"):
+        if text:
+            text_mask = df[column].str.contains(text, case=False, regex=False, na=False)
+            mask = text_mask if mask is None else mask & text_mask
+            break
+    if prefix:
+        prefix_mask = df["museum_no"].str.lower().str.startswith(prefix.lower(), na=False)
+        mask = prefix_mask if mask is None else mask & prefix_mask
+    return df[mask].head(limit)
+
+
+def timed(run, repeats: int) -> dict:
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": round(statistics.median(latencies), 3), "max_ms": round(max(latencies), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000, help="Synthetic corpus size when all_artifacts.csv is absent")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--json", help="Write results to this file as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = FULL_CSV
+        if not os.path.exists(csv_path):
+            csv_path = os.path.join(tmpdir, "artifacts.csv")
+            make_corpus(args.rows, csv_path)
+        df = read_artifacts(csv_path, columns=INDEX_COLUMNS)
+
+    start = time.perf_counter()
+    index = ArtifactIndex(df)
+    build_s = time.perf_counter() - start
+
+    period = df["period"].dropna().iloc[0]
+    genre = df["genres"].dropna().iloc[0].split(";")[0]
+    queries = {
+        "facet": ({"period": period}, None, None),
+        "two_facets": ({"period": period, "genres": genre}, None, None),
+        "text": ({}, "lexical", None),
+        "prefix": ({}, None, "VAT 15"),
+    }
+    results = []
+    for name, (filters, text, prefix) in queries.items():
+        result = {"query": name, "rows": len(df), "index_build_s": round(build_s, 2)}
+        result["scan"] = timed(lambda: scan(df, filters, text, prefix), max(args.repeats // 5, 1))
+        result["index"] = timed(lambda: index.search(filters, text, prefix), args.repeats)
+        results.append(result)
+        print(f"{name:>10}: scan p50 {result['scan']['p50_ms']:9.2f} ms, "
+              f"index p50 {result['index']['p50_ms']:7.2f} ms (max {result['index']['max_ms']:.2f})", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
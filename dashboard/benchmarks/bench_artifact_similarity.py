@@ -0,0 +1,79 @@
+"""Measure similarity index build time, open time and top-k query latency.
+
+Usage:
+    python benchmarks/bench_artifact_similarity.py [--rows N] [--json results.json]
+
+The corpus is synthesised from limited_artifacts.csv (all_artifacts.csv is
+used instead when it exists).
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+import tempfile
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DASHBOARD_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from artifact_similarity import SimilarityIndex, build_similarity_index  # noqa: E402
+from bench_artifact_store import FULL_CSV, make_corpus  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300000, help="Synthetic corpus size when all_artifacts.csv is absent")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=32, help="IDs per batched query")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--json", help="Write results to this file as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = FULL_CSV
+        if not os.path.exists(csv_path):
+            csv_path = os.path.join(tmpdir, "artifacts.csv")
+            make_corpus(args.rows, csv_path)
+        index_dir = os.path.join(tmpdir, "similarity_index")
+
+        start = time.perf_counter()
+        count = build_similarity_index(csv_path, index_dir)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = SimilarityIndex(index_dir)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        ids = random.Random(0).sample(list(index.rows), args.queries)
+        latencies = []
+        for artifact_id in ids:
+            start = time.perf_counter()
+            index.similar(artifact_id, args.k)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        index.similar_many(ids[:args.batch], args.k)
+        batch_ms = (time.perf_counter() - start) * 1000
+
+    result = {
+        "artifacts": count,
+        "build_s": round(build_s, 2),
+        "open_ms": round(open_ms, 1),
+        "query_p50_ms": round(statistics.median(latencies), 2),
+        "query_p95_ms": round(sorted(latencies)[int(len(latencies) * 0.95) - 1], 2),
+        "batch_ms_per_query": round(batch_ms / min(args.batch, len(ids)), 2),
+    }
+    print(f"{count} artifacts: build {result['build_s']} s, open {result['open_ms']} ms, "
+          f"query p50 {result['query_p50_ms']} ms, p95 {result['query_p95_ms']} ms, "
+          f"batched {result['batch_ms_per_query']} ms/query", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
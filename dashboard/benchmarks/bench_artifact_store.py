@@ -0,0 +1,128 @@
+"""Compare artifact lookup latency and peak RSS: CSV scan vs the indexed store.
+
+Usage:
+    python benchmarks/bench_artifact_store.py [--full-rows N] [--json results.json]
+
+Corpora of 100, 10k and full-corpus size are synthesised from
+limited_artifacts.csv (or all_artifacts.csv is used for the full size when it
+exists). Every (method, size) pair runs in its own subprocess so the peak RSS
+reported belongs to that method alone.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import statistics
+import subprocess
+import tempfile
+import pandas as pd
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DASHBOARD_DIR)
+
+from artifact_augmentation import load_artifact  # noqa: E402
+from artifact_store import build_artifact_store  # noqa: E402
+
+SEED_CSV = os.path.join(DASHBOARD_DIR, "limited_artifacts.csv")
+FULL_CSV = os.path.join(DASHBOARD_DIR, "all_artifacts.csv")
+
+
+def make_corpus(rows: int, path: str):
+    """Write a corpus of `rows` artifacts by cycling the seed rows with fresh IDs."""
+    seed = pd.read_csv(SEED_CSV, dtype={'artifact_id': str})
+    written = 0
+    with open(path, "w", newline="") as f:
+        while written < rows:
+            chunk = seed.head(rows - written).copy()
+            chunk['artifact_id'] = [f"{i}.0" for i in range(written + 1, written + len(chunk) + 1)]
+            chunk.to_csv(f, index=False, header=(written == 0))
+            written += len(chunk)
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process. VmHWM resets on exec, unlike ru_maxrss on Linux."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_lookups(path: str, ids, repeats: int):
+    """Child process body: time lookups and report latency plus peak RSS."""
+    latencies = []
+    for _ in range(repeats):
+        for artifact_id in ids:
+            start = time.perf_counter()
+            df = load_artifact(path, artifact_id)
+            latencies.append(time.perf_counter() - start)
+            assert not df.empty, artifact_id
+    print(json.dumps({
+        "median_ms": statistics.median(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "lookups": len(latencies),
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def measure(path: str, ids, repeats: int):
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", path, "--repeats", str(repeats), "--ids", *ids],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full-rows", type=int, default=350000,
+                        help="Synthetic full-corpus size when all_artifacts.csv is absent")
+    parser.add_argument("--json", help="Write results to this file as JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--ids", nargs="*", help=argparse.SUPPRESS)
+    parser.add_argument("--repeats", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_lookups(args.child, args.ids, args.repeats)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for label, rows in [("100", 100), ("10k", 10000), ("full", args.full_rows)]:
+            if label == "full" and os.path.exists(FULL_CSV):
+                csv_path = FULL_CSV
+            else:
+                csv_path = os.path.join(tmpdir, f"artifacts_{label}.csv")
+                make_corpus(rows, csv_path)
+            db_path = os.path.join(tmpdir, f"artifacts_{label}.db")
+
+            start = time.perf_counter()
+            rows = build_artifact_store(csv_path, db_path)
+            build_s = time.perf_counter() - start
+
+            ids = pd.read_csv(csv_path, usecols=['artifact_id'], dtype=str)['artifact_id']
+            sample = random.Random(0).sample(list(ids), 5)
+
+            for method, path, repeats in [("csv", csv_path, 1), ("store", db_path, 20)]:
+                stats = measure(path, sample, repeats)
+                stats.update({"size": label, "rows": rows, "method": method})
+                if method == "store":
+                    stats["build_s"] = build_s
+                results.append(stats)
+                print(f"{label:>5} {method:>6}: median {stats['median_ms']:9.2f} ms, "
+                      f"peak RSS {stats['peak_rss_mb']:7.1f} MB", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
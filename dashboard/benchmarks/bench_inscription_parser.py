@@ -0,0 +1,131 @@
+"""Measure inscription corpus parsing and token statistics: per-text Python string handling vs interned arrays.
+
+Usage:
+    python benchmarks/bench_inscription_parser.py [--inscriptions N] [--processes P] [--json results.json]
+
+A corpus of synthetic ATF inscriptions is written as enrich_artifacts JSONL
+records. It is parsed in one process and across a pool, and sign counts are
+computed both from the raw texts and from the saved, memory-mapped arrays.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from collections import Counter
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DASHBOARD_DIR)
+
+from inscription_parser import SIGN, MARKERS, InscriptionCorpus, build_inscription_index  # noqa: E402
+
+SIGNS = ("a", "na", "{d}", "en", "lil2", "szu", "nu", "ma", "ni", "lugal", "e2", "gal", "dumu", "sze", "ka",
+         "1(N01)", "2(N14)", "5(disz)", "|GA2xAN|", "x", "sila3", "mu", "ki", "ur", "nig2", "ba", "an", "gin2")
+
+
+def make_vocabulary(rng: random.Random, size: int = 20000):
+    """Words of 1-4 signs with Zipf-like weights, so a few words are common and most are rare."""
+    words = ["-".join(rng.choice(SIGNS) for _ in range(rng.randint(1, 4))) for _ in range(size)]
+    return words, [1 / (rank + 1) for rank in range(size)]
+
+
+def make_inscription(rng: random.Random, artifact_id: int, vocabulary) -> str:
+    lines = [f"&P{artifact_id:06d} = Synthetic {artifact_id}", "#atf: lang sux", "@tablet"]
+    for surface in ("obverse", "reverse"):
+        lines.append(f"@{surface}")
+        for number in range(1, rng.randint(3, 12)):
+            words = rng.choices(*vocabulary, k=rng.randint(2, 7))
+            if rng.random() < 0.2:
+                words[0] = f"[{words[0]}"
+                words[-1] = f"{words[-1]}]"
+            lines.append(f"{number}. {' '.join(words)}")
+            if rng.random() < 0.3:
+                lines.append(f"#lem: {'; '.join('X' for _ in words)}")
+    return "\n".join(lines) + "\n"
+
+
+def naive_sign_counts(path: str) -> Counter:
+    """Re-read and split every text, as ad hoc scripts would without the parsed arrays."""
+    counts = Counter()
+    with open(path) as f:
+        for line in f:
+            for text_line in json.loads(line)["data"].splitlines():
+                if text_line[:1].isdigit():
+                    for word in text_line.split(". ", 1)[1].split():
+                        counts.update(SIGN.findall(MARKERS.sub("", word)))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inscriptions", type=int, default=50000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--json", help="Write results to this file as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, "inscriptions.jsonl")
+        with open(source, "w") as f:
+            for i in range(args.inscriptions):
+                f.write(json.dumps({"artifact_id": f"{i}.0", "resource": "inscription", "format": "atf",
+                                    "data": make_inscription(rng, i, vocabulary)}) + "\n")
+        source_mb = os.path.getsize(source) / 1e6
+
+        start = time.perf_counter()
+        corpus = build_inscription_index(source, os.path.join(tmpdir, "single"), processes=1)
+        single_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_inscription_index(source, os.path.join(tmpdir, "pooled"), processes=args.processes)
+        pooled_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        naive = naive_sign_counts(source)
+        naive_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = InscriptionCorpus.load(os.path.join(tmpdir, "pooled"))
+        counts = loaded.sign_counts()
+        per_artifact = loaded.tokens_per_artifact()
+        arrays_s = time.perf_counter() - start
+        assert dict(naive) == {sign: int(count) for sign, count in zip(loaded.signs, counts) if count}
+
+        start = time.perf_counter()
+        ids = [f"{i}.0" for i in rng.sample(range(args.inscriptions), 1000)]
+        for artifact_id in ids:
+            loaded.prompt_text(artifact_id)
+        prompt_ms = (time.perf_counter() - start) * 1000
+
+        index_mb = sum(os.path.getsize(os.path.join(tmpdir, "pooled", name))
+                       for name in os.listdir(os.path.join(tmpdir, "pooled"))) / 1e6
+
+    result = {
+        "inscriptions": args.inscriptions,
+        "tokens": int(len(corpus.token_ids)),
+        "mean_tokens_per_artifact": round(float(per_artifact.mean()), 1),
+        "source_mb": round(source_mb, 1),
+        "index_mb": round(index_mb, 1),
+        "parse_single_s": round(single_s, 2),
+        "parse_pool_s": round(pooled_s, 2),
+        "processes": args.processes,
+        "sign_counts_naive_s": round(naive_s, 2),
+        "sign_counts_arrays_s": round(arrays_s, 3),
+        "prompt_text_ms": round(prompt_ms, 3),
+    }
+    print(f"{args.inscriptions} inscriptions, {result['tokens']} tokens: parse {result['parse_single_s']} s "
+          f"(1 process) vs {result['parse_pool_s']} s ({args.processes} processes); sign counts "
+          f"{result['sign_counts_naive_s']} s from text vs {result['sign_counts_arrays_s']} s from arrays; "
+          f"{result['source_mb']} MB JSONL -> {result['index_mb']} MB index; "
+          f"1000 prompt texts in {result['prompt_text_ms']} ms", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
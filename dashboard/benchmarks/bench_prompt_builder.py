@@ -0,0 +1,132 @@
+"""Compare summary prompts: one heading per column vs the token-budgeted prompt builder.
+
+Usage:
+    python benchmarks/bench_prompt_builder.py [--input artifacts.csv] [--live] [--json results.json]
+
+Input tokens are estimated for every artifact in the table. Time to first
+token is measured on a sample, by default against the local stand-in for the
+Anthropic API with a prefill cost per input token; with --live the real API
+is used (ANTHROPIC_API_KEY) and input tokens come from its token counter.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DASHBOARD_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import anthropic  # noqa: E402
+from artifact_augmentation import MODEL, system  # noqa: E402
+from batch_summaries import iter_artifacts  # noqa: E402
+from bench_services import SEED_CSV, latency_stats  # noqa: E402
+from bench_artifact_store import FULL_CSV  # noqa: E402
+from fake_services import FakeServices  # noqa: E402
+from llm_gateway import LLMGateway  # noqa: E402
+from prompt_builder import DEFAULT_TOKEN_BUDGET, build_prompt, estimate_tokens  # noqa: E402
+
+
+def legacy_prompt(artifact) -> str:
+    """The prompt as construct_artifact_string built it: a heading for every column."""
+    artifact_str = "# Artifact\n\n"
+    for key, value in artifact.items():
+        artifact_str += f"## {key}\n\n{value}\n\n"
+    return artifact_str
+
+
+def token_stats(counts) -> dict:
+    counts = sorted(counts)
+    return {
+        "total": sum(counts),
+        "mean": round(statistics.mean(counts), 1),
+        "p50": counts[len(counts) // 2],
+        "p95": counts[int(len(counts) * 0.95)],
+        "max": counts[-1],
+    }
+
+
+def measure_ttft(gateway: LLMGateway, prompts, max_tokens: int) -> dict:
+    for prompt in prompts:
+        "".join(gateway.stream(prompt, system=system, model=MODEL, max_tokens=max_tokens))
+    calls = [call for call in list(gateway.calls)[-len(prompts):] if call["error"] is None]
+    return {
+        "time_to_first_token": latency_stats([call["time_to_first_token"] for call in calls]),
+        "input_tokens_mean": round(statistics.mean([call["input_tokens"] for call in calls]), 1) if calls else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default=FULL_CSV if os.path.exists(FULL_CSV) else SEED_CSV,
+                        help="Artifacts CSV, Parquet file or store")
+    parser.add_argument("--budget", type=int, default=DEFAULT_TOKEN_BUDGET)
+    parser.add_argument("--sample", type=int, default=20, help="Artifacts to measure time to first token on")
+    parser.add_argument("--prefill-per-token", type=float, default=0.0002,
+                        help="Stand-in API prefill seconds per input token")
+    parser.add_argument("--live", action="store_true", help="Measure against the real Anthropic API")
+    parser.add_argument("--json", help="Write results to this file as JSON")
+    args = parser.parse_args()
+
+    legacy_counts, built_counts, build_seconds = [], [], 0.0
+    sample, rng = [], random.Random(0)
+    for i, artifact in enumerate(iter_artifacts(args.input)):
+        start = time.perf_counter()
+        prompt = build_prompt(artifact, args.budget)
+        build_seconds += time.perf_counter() - start
+        legacy = legacy_prompt(artifact)
+        legacy_counts.append(estimate_tokens(legacy))
+        built_counts.append(estimate_tokens(prompt))
+        # Reservoir sample for the latency measurement
+        if len(sample) < args.sample:
+            sample.append((legacy, prompt))
+        elif rng.random() < args.sample / (i + 1):
+            sample[rng.randrange(args.sample)] = (legacy, prompt)
+
+    results = {
+        "artifacts": len(legacy_counts),
+        "budget": args.budget,
+        "estimated_input_tokens": {"legacy": token_stats(legacy_counts), "builder": token_stats(built_counts)},
+        "token_reduction": round(1 - sum(built_counts) / sum(legacy_counts), 3),
+        "build_us_per_prompt": round(build_seconds / len(legacy_counts) * 1e6, 1),
+    }
+
+    if args.live:
+        client = anthropic.Anthropic()
+        results["api_input_tokens"] = {
+            name: round(statistics.mean(
+                client.beta.messages.count_tokens(
+                    betas=["token-counting-2024-11-01"], model=MODEL, system=system,
+                    messages=[{"role": "user", "content": prompts[i]}],
+                ).input_tokens for prompts in sample), 1)
+            for i, name in enumerate(("legacy", "builder"))
+        }
+        gateway = LLMGateway(client=client, history=2 * len(sample))
+        results["legacy"] = measure_ttft(gateway, [legacy for legacy, _ in sample], max_tokens=16)
+        results["builder"] = measure_ttft(gateway, [prompt for _, prompt in sample], max_tokens=16)
+    else:
+        with FakeServices(SEED_CSV, anthropic={"prefill_per_token": args.prefill_per_token,
+                                               "output_tokens": 4}) as services:
+            gateway = LLMGateway(client=anthropic.Anthropic(
+                api_key="test", base_url=services.url("anthropic"), max_retries=0), history=2 * len(sample))
+            results["legacy"] = measure_ttft(gateway, [legacy for legacy, _ in sample], max_tokens=16)
+            results["builder"] = measure_ttft(gateway, [prompt for _, prompt in sample], max_tokens=16)
+
+    tokens = results["estimated_input_tokens"]
+    print(f"{results['artifacts']} artifacts, budget {args.budget}: mean input tokens "
+          f"{tokens['legacy']['mean']} -> {tokens['builder']['mean']} "
+          f"({results['token_reduction']:.0%} fewer), {results['build_us_per_prompt']} us per prompt")
+    print(f"time to first token p50: {results['legacy']['time_to_first_token'].get('p50_ms')} ms -> "
+          f"{results['builder']['time_to_first_token'].get('p50_ms')} ms"
+          f"{' (live)' if args.live else ' (stand-in API)'}", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Measure throughput and tail latency of the service paths against local stand-ins.
+
+Usage:
+    python benchmarks/bench_services.py [--scenarios scrape enrich summaries videos tts]
+                                        [--latency 0.05] [--jitter 0.05] [--error-rate 0.02]
+                                        [--workers 8] [--json results.json]
+
+Every scenario runs the real client code (CDLIAPIScraper, LLMGateway,
+VideoJobManager, the TTS pipeline) against fake_services.py, so results
+depend only on this code and the configured latency and error injection.
+The JSON output holds the configuration and one record per scenario, for
+comparing runs.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DASHBOARD_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import anthropic  # noqa: E402
+from fake_services import FakeServices  # noqa: E402
+from instrumentation import latency_summary  # noqa: E402
+from cdli_api_scraper import CDLIAPIScraper  # noqa: E402
+from llm_gateway import LLMGateway  # noqa: E402
+from video_jobs import VideoJobManager, COMPLETED  # noqa: E402
+from tts_pipeline import ElevenLabsSynthesizer, speak  # noqa: E402
+
+SEED_CSV = os.path.join(DASHBOARD_DIR, "limited_artifacts.csv")
+SCENARIOS = ("scrape", "enrich", "summaries", "videos", "tts")
+
+
+def latency_stats(seconds) -> dict:
+    """Count and p50/p95/p99/max of a list of durations, in milliseconds."""
+    return latency_summary(seconds, percentiles=(50, 95, 99), digits=2)
+
+
+def _timed_scraper(services: FakeServices):
+    """Scraper whose session records the time to each response's headers."""
+    scraper = CDLIAPIScraper(base_url=services.url("cdli"))
+    latencies = []
+    scraper.session.hooks["response"].append(lambda response, *args, **kwargs: latencies.append(
+        response.elapsed.total_seconds()))
+    return scraper, latencies
+
+
+def bench_scrape(services: FakeServices, args) -> dict:
+    scraper, latencies = _timed_scraper(services)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        start = time.perf_counter()
+        rows = scraper.export_all_artifacts(os.path.join(tmpdir, "artifacts.csv"), max_workers=args.workers)
+        seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds, 1),
+        "requests": latency_stats(latencies),
+    }
+
+
+def bench_enrich(services: FakeServices, args) -> dict:
+    scraper, latencies = _timed_scraper(services)
+    ids = [artifact_id[:-2] for artifact_id in services.listing['artifact_id'][:args.requests]]
+    start = time.perf_counter()
+    records = list(scraper.enrich_artifacts(ids, max_workers=args.workers))
+    seconds = time.perf_counter() - start
+    return {
+        "resources": len(records),
+        "failed": sum("error" in record for record in records),
+        "seconds": round(seconds, 3),
+        "resources_per_second": round(len(records) / seconds, 1),
+        "requests": latency_stats(latencies),
+    }
+
+
+def bench_summaries(services: FakeServices, args) -> dict:
+    gateway = LLMGateway(client=anthropic.Anthropic(
+        api_key="test", base_url=services.url("anthropic"), max_retries=2), history=args.requests)
+
+    def summarize(i):
+        try:
+            return "".join(gateway.stream(f"Artifact {i}", system="Summarise the artifact.", max_tokens=2048))
+        except anthropic.APIError:
+            return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(summarize, range(args.requests)))
+    seconds = time.perf_counter() - start
+    calls = [call for call in gateway.calls if call["error"] is None]
+    return {
+        "summaries": sum(result is not None for result in results),
+        "failed": sum(result is None for result in results),
+        "seconds": round(seconds, 3),
+        "summaries_per_minute": round(len(calls) / seconds * 60, 1),
+        "time_to_first_token": latency_stats([call["time_to_first_token"] for call in calls]),
+        "total": latency_stats([call["seconds"] for call in calls]),
+        "tokens_per_second_median": round(statistics.median(
+            [call["tokens_per_second"] for call in calls]), 1) if calls else None,
+    }
+
+
+def bench_videos(services: FakeServices, args) -> dict:
+    from lumaai import LumaAI
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = VideoJobManager(
+            tmpdir, max_workers=args.workers,
+            client=LumaAI(auth_token="test", base_url=services.url("luma"), max_retries=2),
+            poll_initial=0.05, poll_max=0.5,
+        )
+        start = time.perf_counter()
+        futures = [manager.submit(f"{i}.0", f"Artifact {i}") for i in range(1, args.requests + 1)]
+        jobs = [future.result() for future in futures]
+        seconds = time.perf_counter() - start
+        manager.shutdown()
+
+    completed = [job for job in jobs if job["state"] == COMPLETED]
+    return {
+        "jobs": len(jobs),
+        "failed": len(jobs) - len(completed),
+        "seconds": round(seconds, 3),
+        "jobs_per_minute": round(len(completed) / seconds * 60, 1),
+        "end_to_end": latency_stats([job["completed_at"] - job["queued_at"] for job in completed]),
+        "queued": latency_stats([job["started_at"] - job["queued_at"] for job in completed]),
+        "generating": latency_stats([job["generated_at"] - job["started_at"] for job in completed]),
+        "downloading": latency_stats([job["completed_at"] - job["generated_at"] for job in completed]),
+    }
+
+
+def bench_tts(services: FakeServices, args) -> dict:
+    from elevenlabs.client import ElevenLabs
+
+    synthesize = ElevenLabsSynthesizer(
+        ElevenLabs(api_key="test", base_url=services.url("elevenlabs")), voice="BenchmarkVoice000001", cache=None)
+    summary = ("This artifact is a clay tablet from Uruk, dated to ca. 3200 BC. It records barley rations "
+               "for temple workers. The signs are early proto-cuneiform. Similar tablets were found nearby.")
+    tokens = [summary[i:i + 8] for i in range(0, len(summary), 8)]
+    token_interval = services.configs["anthropic"]["token_interval"]
+
+    def token_stream():
+        for token in tokens:
+            time.sleep(token_interval)
+            yield token
+
+    first_audio, totals, failed = [], [], 0
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        first = None
+        try:
+            for _chunk in speak(token_stream(), synthesize):
+                if first is None:
+                    first = time.perf_counter() - start
+        except Exception:
+            failed += 1
+            continue
+        first_audio.append(first)
+        totals.append(time.perf_counter() - start)
+    return {
+        "narrations": len(totals),
+        "failed": failed,
+        "time_to_first_audio": latency_stats(first_audio),
+        "total": latency_stats(totals),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="*", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Up to this many more seconds, at random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrency of each scenario")
+    parser.add_argument("--requests", type=int, default=40, help="Artifacts, summaries, videos or narrations per scenario")
+    parser.add_argument("--pages", type=int, default=20, help="Pages in the fake CDLI listing")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write results to this file as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.CRITICAL)
+    shared = {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate}
+    config = {key: value for key, value in vars(args).items() if key != "json"}
+    results = []
+    with FakeServices(SEED_CSV, seed=args.seed,
+                      cdli={**shared, "pages": args.pages, "page_size": args.page_size},
+                      anthropic=shared, luma=shared, elevenlabs=shared) as services:
+        for scenario in args.scenarios:
+            result = globals()[f"bench_{scenario}"](services, args)
+            result["scenario"] = scenario
+            results.append(result)
+            print(json.dumps(result), flush=True)
+        config["server_counts"] = services.counts
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "config": config,
+                "python": platform.python_version(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""Local stand-ins for the external services the dashboard talks to.
+
+One threaded HTTP server answers under a path prefix per service:
+
+    /cdli/artifacts?page=&page_size=       paginated CSV listing, 404 past the end
+    /cdli/artifacts/<id>[/<resource>]      per-artifact metadata and resources
+    /anthropic/v1/messages                 Messages API, streamed (SSE) or not
+    /luma/generations[/<id>]               Luma generations that complete after a delay
+    /luma/assets/<id>.mp4                  generated video bytes
+    /elevenlabs/v1/text-to-speech/<voice>/stream   chunked audio
+
+Point the real clients at `FakeServices.url(<service>)`. Every service has
+a configurable response latency, jitter and injected error rate.
+"""
+import io
+import json
+import time
+import uuid
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+# Error responses each service returns when an error is injected
+ERROR_STATUS = {"cdli": 503, "anthropic": 529, "luma": 500, "elevenlabs": 429}
+
+DEFAULT_CONFIG = {
+    # Seconds before any response starts, plus up to `jitter` more
+    "latency": 0.0,
+    "jitter": 0.0,
+    # Fraction of requests answered with ERROR_STATUS
+    "error_rate": 0.0,
+    # cdli
+    "pages": 10,
+    "page_size": 100,
+    # anthropic
+    "output_tokens": 60,
+    "token_interval": 0.005,
+    # Seconds per input token before the first output token, to model prefill
+    "prefill_per_token": 0.0,
+    # luma
+    "generation_seconds": 0.5,
+    "video_bytes": 1024 * 1024,
+    # elevenlabs: mp3_44100_128 is about 16 kB per second of speech, ~15 characters
+    "audio_bytes_per_char": 1000,
+    "audio_chunk_bytes": 4096,
+    "audio_chunk_interval": 0.002,
+}
+
+WORDS = ("This artifact is a clay tablet from Uruk, inscribed with early proto-cuneiform "
+         "signs recording administrative accounts of barley rations.").split()
+
+
+def _artifact_key(artifact_id: str) -> str:
+    """Match "P000001", "1" and "1.0" to the same artifact."""
+    artifact_id = artifact_id.lstrip("P").lstrip("0")
+    return artifact_id[:-2] if artifact_id.endswith(".0") else artifact_id
+
+
+def make_listing(rows: int, seed_csv: str) -> pd.DataFrame:
+    """Synthesise a listing of `rows` artifacts by cycling the seed rows with fresh IDs."""
+    seed = pd.read_csv(seed_csv, dtype={'artifact_id': str})
+    listing = pd.concat([seed] * (rows // len(seed) + 1), ignore_index=True).head(rows).copy()
+    listing['artifact_id'] = [f"{i}.0" for i in range(1, rows + 1)]
+    return listing
+
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    # Plumbing
+
+    def _route(self):
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip("/").split("/")
+        return parts[0], parts[1:], parse_qs(parsed.query)
+
+    def _delay_or_fail(self, service: str) -> bool:
+        """Apply latency, then answer with an error if one is injected. Returns True if it did."""
+        services = self.server.services
+        config = services.configs[service]
+        delay = config["latency"] + (services.uniform(0, config["jitter"]) if config["jitter"] else 0.0)
+        if delay:
+            time.sleep(delay)
+        services.count(service, "requests")
+        if config["error_rate"] and services.uniform(0, 1) < config["error_rate"]:
+            services.count(service, "errors")
+            status = ERROR_STATUS[service]
+            body = {"type": "error", "error": {"type": "overloaded_error", "message": "injected error"}}
+            self._send(status, json.dumps(body).encode(), "application/json", {"retry-after": "0"})
+            return True
+        return False
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Dict[str, str] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload: Any, status: int = 200):
+        self._send(status, json.dumps(payload).encode(), "application/json")
+
+    def _start_chunked(self, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def do_GET(self):
+        service, parts, query = self._route()
+        if service == "luma" and parts[:1] == ["assets"]:
+            return self._luma_asset(parts)
+        if service not in ("cdli", "luma"):
+            self._send(404, b"", "text/plain")
+            return
+        if self._delay_or_fail(service):
+            return
+        if service == "cdli":
+            return self._cdli(parts, query)
+        return self._luma_get(parts)
+
+    def do_POST(self):
+        service, parts, _ = self._route()
+        body = self._read_json()
+        if service not in ("anthropic", "luma", "elevenlabs"):
+            self._send(404, b"", "text/plain")
+            return
+        if self._delay_or_fail(service):
+            return
+        if service == "anthropic":
+            return self._anthropic(body)
+        if service == "luma":
+            return self._luma_create(body)
+        return self._elevenlabs(body)
+
+    # CDLI
+
+    def _cdli(self, parts, query):
+        listing = self.server.services.listing
+        if parts == ["artifacts"]:
+            page = int(query.get("page", ["1"])[0])
+            page_size = int(query.get("page_size", ["100"])[0])
+            rows = listing.iloc[(page - 1) * page_size:page * page_size]
+            if rows.empty:
+                self._send(404, b"Not Found", "text/plain")
+                return
+            buffer = io.StringIO()
+            rows.to_csv(buffer, index=False)
+            self._send(200, buffer.getvalue().encode(), "text/csv")
+            return
+
+        artifact_id = parts[1] if len(parts) > 1 else ""
+        position = self.server.services.positions.get(_artifact_key(artifact_id))
+        if position is None:
+            self._send(404, b"Not Found", "text/plain")
+            return
+        record = json.loads(listing.iloc[position].to_json())
+        if len(parts) == 2:
+            self._send_json(record)
+        elif parts[2] == "inscription":
+            self._send(200, f"&P{artifact_id} = {record['designation']}\n1. 1(N01) sze\n".encode(), "text/plain")
+        elif parts[2] == "bibliography":
+            self._send(200, f"@article{{p{artifact_id}, title={{{record['designation']}}}}}\n".encode(), "text/plain")
+        else:
+            self._send_json({"@id": f"P{artifact_id}", "designation": record["designation"]})
+
+    # Anthropic Messages API
+
+    def _anthropic(self, body):
+        config = self.server.services.configs["anthropic"]
+        tokens = min(config["output_tokens"], body.get("max_tokens", config["output_tokens"]))
+        words = [WORDS[i % len(WORDS)] + " " for i in range(tokens)]
+        message = {
+            "id": f"msg_{uuid.uuid4().hex[:12]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude"),
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(json.dumps(body)) // 4, "output_tokens": 1},
+        }
+        time.sleep(config["prefill_per_token"] * message["usage"]["input_tokens"])
+        if not body.get("stream"):
+            time.sleep(config["token_interval"] * tokens)
+            message.update({
+                "content": [{"type": "text", "text": "".join(words)}],
+                "stop_reason": "end_turn",
+                "usage": {**message["usage"], "output_tokens": tokens},
+            })
+            self._send_json(message)
+            return
+
+        self._start_chunked("text/event-stream")
+
+        def event(name, data):
+            self._write_chunk(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+
+        event("message_start", {"type": "message_start", "message": {**message, "content": []}})
+        event("content_block_start", {"type": "content_block_start", "index": 0,
+                                      "content_block": {"type": "text", "text": ""}})
+        for word in words:
+            time.sleep(config["token_interval"])
+            event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                          "delta": {"type": "text_delta", "text": word}})
+        event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        event("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                "usage": {"output_tokens": tokens}})
+        event("message_stop", {"type": "message_stop"})
+        self._end_chunked()
+
+    # Luma
+
+    def _generation(self, generation_id: str) -> Dict[str, Any]:
+        services = self.server.services
+        created = services.generations[generation_id]
+        done = time.monotonic() - created["started"] >= services.configs["luma"]["generation_seconds"]
+        return {
+            "id": generation_id,
+            "state": "completed" if done else "dreaming",
+            "created_at": created["created_at"],
+            "failure_reason": None,
+            "request": created["request"],
+            "version": "v1",
+            "assets": {"video": f"{services.url('luma')}/assets/{generation_id}.mp4"} if done else None,
+        }
+
+    def _luma_create(self, body):
+        generation_id = str(uuid.uuid4())
+        with self.server.services.lock:
+            self.server.services.generations[generation_id] = {
+                "started": time.monotonic(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "request": body,
+            }
+        self._send_json(self._generation(generation_id), status=201)
+
+    def _luma_get(self, parts):
+        if len(parts) != 2 or parts[1] not in self.server.services.generations:
+            self._send_json({"detail": "Not found"}, status=404)
+            return
+        self._send_json(self._generation(parts[1]))
+
+    def _luma_asset(self, parts):
+        self._send(200, b"\0" * self.server.services.configs["luma"]["video_bytes"], "video/mp4")
+
+    # ElevenLabs
+
+    def _elevenlabs(self, body):
+        config = self.server.services.configs["elevenlabs"]
+        remaining = len(body.get("text", "")) * config["audio_bytes_per_char"]
+        self._start_chunked("audio/mpeg")
+        while remaining > 0:
+            time.sleep(config["audio_chunk_interval"])
+            size = min(remaining, config["audio_chunk_bytes"])
+            self._write_chunk(b"\xff" * size)
+            remaining -= size
+        self._end_chunked()
+
+
+class FakeServices:
+    """Run the stand-in services on a local port.
+
+    Args:
+        seed_csv: Artifact table the CDLI listing is synthesised from
+        seed: Seed for latency jitter and error injection
+        **overrides: Per-service settings, e.g. anthropic={"error_rate": 0.1}
+    """
+
+    def __init__(self, seed_csv: str, seed: int = 0, **overrides: Dict[str, Any]):
+        self.configs = {service: {**DEFAULT_CONFIG, **overrides.get(service, {})} for service in ERROR_STATUS}
+        cdli = self.configs["cdli"]
+        self.listing = make_listing(cdli["pages"] * cdli["page_size"], seed_csv)
+        self.positions = {_artifact_key(artifact_id): i for i, artifact_id in enumerate(self.listing['artifact_id'])}
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.generations: Dict[str, Dict[str, Any]] = {}
+        self.counts = {service: {"requests": 0, "errors": 0} for service in ERROR_STATUS}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeServiceHandler)
+        self.server.daemon_threads = True
+        self.server.services = self
+
+    def uniform(self, low: float, high: float) -> float:
+        with self.lock:
+            return self.random.uniform(low, high)
+
+    def count(self, service: str, name: str):
+        with self.lock:
+            self.counts[service][name] += 1
+
+    def url(self, service: str) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/{service}"
+
+    def __enter__(self) -> "FakeServices":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,35 +1,103 @@
+import os
 import requests
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Iterator, Tuple
 import pandas as pd
 from pathlib import Path
 import io
 import time
+import shutil
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from http_cache import HTTPCache
+from artifact_parquet import ArtifactParquetWriter, combine_parquet, is_parquet_path, read_schema
+import instrumentation
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+REQUEST_SECONDS = instrumentation.histogram(
+    "cdli_request_seconds", "CDLI API request time including rate limiting and retries, by outcome")
+REQUEST_RETRIES = instrumentation.counter("cdli_request_retries_total", "CDLI API request attempts that were retried")
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then consume them."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait_time = (tokens - self.tokens) / self.rate
+            time.sleep(wait_time)
+
 class CDLIAPIScraper:
     BASE_URL = "https://cdli.mpiwg-berlin.mpg.de"
     
-    def __init__(self):
+    def __init__(self, base_url: str = None, requests_per_second: float = None, cache: HTTPCache = None):
         self.session = requests.Session()
+        if base_url:
+            self.BASE_URL = base_url.rstrip("/")
+        # Shared by every request this scraper makes, including concurrent ones
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+        # Optional persistent response cache, see http_cache.py
+        self.cache = cache
     
     def _make_request(self, endpoint: str, params: Dict[str, Any] = None, headers: Dict[str, str] = None, max_retries: int = 3) -> requests.Response:
+        start = time.monotonic()
         url = f"{self.BASE_URL}{endpoint}"
+        cache_key = cached = None
+        if self.cache:
+            cache_key = self.cache.key(url, params, headers)
+            cached = self.cache.get(cache_key)
+            if cached and cached["fresh"]:
+                REQUEST_SECONDS.observe(time.monotonic() - start, outcome="cache_hit")
+                return self.cache.hit(cache_key, cached)
+            if cached:
+                headers = {**(headers or {}), **self.cache.validators(cached)}
+
         for attempt in range(max_retries):
             try:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
                 response = self.session.get(url, params=params, headers=headers)
+                if cached and response.status_code == 304:
+                    REQUEST_SECONDS.observe(time.monotonic() - start, outcome="revalidated")
+                    return self.cache.revalidated(cache_key, cached)
                 response.raise_for_status()
+                if self.cache:
+                    self.cache.miss()
+                    self.cache.store(cache_key, response)
+                REQUEST_SECONDS.observe(time.monotonic() - start, outcome="ok")
                 return response
             except requests.exceptions.RequestException as e:
                 logging.error(f"Error occurred: {e}")
+                status = getattr(e.response, "status_code", None)
+                if status == 404:
+                    # Missing resources and past-the-end pages will not appear on retry
+                    REQUEST_SECONDS.observe(time.monotonic() - start, outcome="not_found")
+                    raise
                 if attempt < max_retries - 1:
                     wait_time = 2 ** attempt  # Exponential backoff
+                    REQUEST_RETRIES.inc(reason=str(status) if status else type(e).__name__)
                     logging.info(f"Retrying in {wait_time} seconds...")
                     time.sleep(wait_time)
                 else:
                     logging.error("Max retries reached. Giving up.")
+                    REQUEST_SECONDS.observe(time.monotonic() - start, outcome="error")
                     raise
 
     def get_metadata(self, artifact_id: str) -> Dict[str, Any]:
@@ -75,6 +143,87 @@ class CDLIAPIScraper:
         response = self._make_request(endpoint, headers=headers)
         return response.text
 
+    # Per-artifact resources available to enrich_artifacts, with their default formats
+    ENRICHMENT_RESOURCES = {
+        "metadata": "json",
+        "inscription": "atf",
+        "bibliography": "bibtex",
+        "linked_data": "jsonld",
+    }
+
+    def _fetch_resource(self, artifact_id: str, resource: str, format: str) -> Any:
+        if resource == "metadata":
+            return self.get_metadata(artifact_id)
+        elif resource == "inscription":
+            return self.get_inscription(artifact_id, format)
+        elif resource == "bibliography":
+            return self.get_bibliography(artifact_id, format)
+        elif resource == "linked_data":
+            return self.get_linked_data(artifact_id, format)
+        raise ValueError(f"Unknown resource: {resource}")
+
+    def enrich_artifacts(self, artifact_ids: Iterable[str], resources: Iterable[Tuple[str, str]] = None,
+                         max_workers: int = 8, output_path: str = None) -> Iterator[Dict[str, Any]]:
+        """Fetch several per-artifact resources for many artifacts concurrently.
+
+        Results are yielded as soon as each request completes, not in input
+        order. A failed request yields a record with an "error" field instead
+        of aborting the batch. Only a bounded number of requests is queued at
+        a time, so artifact_ids may be a lazy iterable of any length.
+
+        Args:
+            artifact_ids: Artifact IDs to enrich
+            resources: (resource, format) pairs, defaults to every resource in
+                ENRICHMENT_RESOURCES with its default format
+            max_workers: Number of concurrent requests over the pooled session
+            output_path: If given, every result is appended to this file as JSON lines
+
+        Yields:
+            Dicts with artifact_id, resource, format and either data or error
+        """
+        resources = list(resources or self.ENRICHMENT_RESOURCES.items())
+        tasks = ((artifact_id, resource, format) for artifact_id in artifact_ids for resource, format in resources)
+
+        def run(task):
+            artifact_id, resource, format = task
+            record = {"artifact_id": artifact_id, "resource": resource, "format": format}
+            try:
+                record["data"] = self._fetch_resource(artifact_id, resource, format)
+            except Exception as e:
+                logging.error(f"Failed to fetch {resource} for artifact {artifact_id}: {e}")
+                record["error"] = str(e)
+            return record
+
+        self._ensure_pool_size(max_workers)
+        output = None
+        if output_path:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            output = open(output_path, "a")
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            pending = set()
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < max_workers * 2:
+                    task = next(tasks, None)
+                    if task is None:
+                        exhausted = True
+                    else:
+                        pending.add(executor.submit(run, task))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record = future.result()
+                    if output:
+                        output.write(json.dumps(record) + "\n")
+                        output.flush()
+                    yield record
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            if output:
+                output.close()
+
     def get_tabular_export(self, export_type: str = "artifacts", format: str = "csv") -> pd.DataFrame:
         logging.info(f"Attempting to scrape tabular export for {export_type}")
         endpoint = f"/{export_type}"
@@ -86,58 +235,210 @@ class CDLIAPIScraper:
         headers = {"Accept": formats.get(format, formats["csv"])}
         response = self._make_request(endpoint, headers=headers)
         
+        return self._read_page(response, format)
+
+    def _read_page(self, response: requests.Response, format: str) -> pd.DataFrame:
+        # Parse the raw body, decoding to str first would copy every page twice
+        body = io.BytesIO(response.content)
         if format == "xlsx":
-            return pd.read_excel(io.BytesIO(response.content))
+            return pd.read_excel(body)
         elif format == "tsv":
-            return pd.read_csv(io.StringIO(response.text), sep="\t")
+            return pd.read_csv(body, sep="\t")
         else:
-            return pd.read_csv(io.StringIO(response.text))
+            return pd.read_csv(body)
 
-    def get_all_artifacts(self, format: str = "csv") -> pd.DataFrame:
-        logging.info("Attempting to scrape all artifacts with pagination")
+    def _ensure_pool_size(self, size: int):
+        # requests keeps at most 10 connections per host by default
+        if size > 10:
+            adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+
+    def _fetch_artifact_page(self, page: int, page_size: int, headers: Dict[str, str], format: str):
+        """Fetch one page of the artifact listing, or None once past the last page."""
+        try:
+            params = {"page": page, "page_size": page_size}
+            response = self._make_request("/artifacts", params=params, headers=headers)
+        except requests.exceptions.RequestException as e:
+            if "404" in str(e):  # We've reached the end of available pages
+                return None
+            else:  # Some other error occurred
+                raise
+        return self._read_page(response, format)
+
+    def iter_artifact_pages(self, format: str = "csv", start_page: int = 1, page_size: int = 1000, max_workers: int = 1):
+        """Yield (page, DataFrame) for every page of the artifact listing, in order.
 
-        endpoint = "/artifacts"
+        With max_workers > 1 up to that many pages are fetched concurrently over
+        the shared session. Pages may complete out of order but are always
+        yielded in page order, and the listing ends at the first page that
+        returns 404.
+        """
         formats = {
             "csv": "text/csv",
             "tsv": "text/tab-separated-values",
             "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         }
         headers = {"Accept": formats.get(format, formats["csv"])}
-        
-        all_data = []
-        page = 1
+
+        if max_workers > 1:
+            pages = self._iter_pages_concurrently(start_page, page_size, headers, format, max_workers)
+        else:
+            pages = self._iter_pages_sequentially(start_page, page_size, headers, format)
+
+        for page, df in pages:
+            logging.info(f"Retrieved page {page} with {len(df)} records")
+            yield page, df
+        logging.info("Reached the last page of results")
+
+    def _iter_pages_sequentially(self, start_page: int, page_size: int, headers: Dict[str, str], format: str):
+        page = start_page
         while True:
-            try:
-                params = {"page": page, "page_size": 1000}
-                response = self._make_request(endpoint, params=params, headers=headers)
-                
-                if format == "xlsx":
-                    df = pd.read_excel(io.BytesIO(response.content))
-                elif format == "tsv":
-                    df = pd.read_csv(io.StringIO(response.text), sep="\t")
-                else:
-                    df = pd.read_csv(io.StringIO(response.text))
-                
-                all_data.append(df)
-                logging.info(f"Retrieved page {page} with {len(df)} records")
-                page += 1
-                
-            except requests.exceptions.RequestException as e:
-                if "404" in str(e):  # We've reached the end of available pages
-                    logging.info("Reached the last page of results")
-                    break
-                else:  # Some other error occurred
-                    raise
-        
+            df = self._fetch_artifact_page(page, page_size, headers, format)
+            if df is None:
+                return
+            yield page, df
+            page += 1
+
+    def _iter_pages_concurrently(self, start_page: int, page_size: int, headers: Dict[str, str], format: str, max_workers: int):
+        self._ensure_pool_size(max_workers)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        in_flight = {}
+        next_page = start_page
+        # First page known to be past the end, possibly learned out of order
+        end_page = None
+        try:
+            for page in range(start_page, start_page + max_workers):
+                in_flight[page] = executor.submit(self._fetch_artifact_page, page, page_size, headers, format)
+            next_to_submit = start_page + max_workers
+
+            while next_page in in_flight:
+                df = in_flight.pop(next_page).result()
+                if df is None:
+                    return
+                yield next_page, df
+                next_page += 1
+
+                for page, future in in_flight.items():
+                    if future.done() and future.exception() is None and future.result() is None:
+                        end_page = page if end_page is None else min(end_page, page)
+                if end_page is None or next_to_submit < end_page:
+                    in_flight[next_to_submit] = executor.submit(self._fetch_artifact_page, next_to_submit, page_size, headers, format)
+                    next_to_submit += 1
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def get_all_artifacts(self, format: str = "csv", max_workers: int = 1) -> pd.DataFrame:
+        logging.info("Attempting to scrape all artifacts with pagination")
+
+        all_data = [df for _, df in self.iter_artifact_pages(format, max_workers=max_workers)]
+
         final_df = pd.concat(all_data, ignore_index=True)
         logging.info(f"Total records retrieved: {len(final_df)}")
         return final_df
 
+    def export_all_artifacts(self, output_path: str, format: str = "csv", checkpoint_path: str = None, max_workers: int = 1) -> int:
+        """Stream every artifact page to a CSV or Parquet file as it arrives.
+
+        Only one page is held in memory at a time. After each page is appended
+        a checkpoint records the next page and the output size, so a rerun after
+        an interruption truncates any half-written page and resumes from there.
+        An output path ending in .parquet writes Parquet instead, see
+        _export_parquet.
+
+        Args:
+            output_path: CSV or Parquet file to write
+            format: Format to request pages in (csv, tsv or xlsx)
+            checkpoint_path: Checkpoint file, defaults to <output_path>.checkpoint.json
+            max_workers: Number of pages to fetch concurrently
+
+        Returns:
+            Total number of records in the output file
+        """
+        checkpoint_path = checkpoint_path or f"{output_path}.checkpoint.json"
+        if is_parquet_path(output_path):
+            return self._export_parquet(output_path, format, checkpoint_path, max_workers)
+
+        checkpoint = {"next_page": 1, "records": 0, "bytes": 0}
+        if Path(checkpoint_path).exists() and Path(output_path).exists():
+            with open(checkpoint_path) as f:
+                checkpoint = json.load(f)
+            logging.info(f"Resuming export from page {checkpoint['next_page']} "
+                         f"({checkpoint['records']} records already saved)")
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        mode = "r+" if checkpoint["bytes"] else "w"
+        with open(output_path, mode, newline="") as f:
+            # Drop anything written after the last checkpoint
+            f.seek(checkpoint["bytes"])
+            f.truncate()
+
+            pages = self.iter_artifact_pages(format, start_page=checkpoint["next_page"], max_workers=max_workers)
+            for page, df in pages:
+                df.to_csv(f, index=False, header=(checkpoint["bytes"] == 0))
+                f.flush()
+                os.fsync(f.fileno())
+
+                checkpoint = {
+                    "next_page": page + 1,
+                    "records": checkpoint["records"] + len(df),
+                    "bytes": f.tell(),
+                }
+                _write_json_atomic(checkpoint, checkpoint_path)
+
+        Path(checkpoint_path).unlink(missing_ok=True)
+        logging.info(f"Total records exported: {checkpoint['records']}")
+        return checkpoint["records"]
+
+    def _export_parquet(self, output_path: str, format: str, checkpoint_path: str, max_workers: int) -> int:
+        """Export to Parquet with one row group per page.
+
+        A Parquet file cannot be appended to, so each page is first written to
+        its own file under <output_path>.parts and checkpointed. Once the last
+        page is in, the parts are combined into output_path.
+        """
+        parts_dir = Path(f"{output_path}.parts")
+        checkpoint = {"next_page": 1, "records": 0}
+        if Path(checkpoint_path).exists() and parts_dir.exists():
+            with open(checkpoint_path) as f:
+                checkpoint = json.load(f)
+            logging.info(f"Resuming export from page {checkpoint['next_page']} "
+                         f"({checkpoint['records']} records already saved)")
+        parts_dir.mkdir(parents=True, exist_ok=True)
+
+        # Every page is written with the columns and types of the first one
+        schema = read_schema(str(parts_dir / "page-000001.parquet")) if checkpoint["next_page"] > 1 else None
+        pages = self.iter_artifact_pages(format, start_page=checkpoint["next_page"], max_workers=max_workers)
+        for page, df in pages:
+            part_path = parts_dir / f"page-{page:06d}.parquet"
+            with ArtifactParquetWriter(f"{part_path}.tmp", schema=schema) as writer:
+                writer.write(df)
+            schema = writer.schema
+            os.replace(f"{part_path}.tmp", part_path)
+
+            checkpoint = {"next_page": page + 1, "records": checkpoint["records"] + len(df)}
+            _write_json_atomic(checkpoint, checkpoint_path)
+
+        parts = [str(parts_dir / f"page-{page:06d}.parquet") for page in range(1, checkpoint["next_page"])]
+        records = combine_parquet(parts, output_path)
+        shutil.rmtree(parts_dir)
+        Path(checkpoint_path).unlink(missing_ok=True)
+        logging.info(f"Total records exported: {records}")
+        return records
+
+def _write_json_atomic(data: Any, filename: str):
+    tmp_path = f"{filename}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, filename)
+
 def save_to_file(data: Any, filename: str):
     path = Path(filename)
     path.parent.mkdir(parents=True, exist_ok=True)
     
-    if isinstance(data, pd.DataFrame):
+    if isinstance(data, pd.DataFrame) and is_parquet_path(filename):
+        data.to_parquet(filename, index=False)
+    elif isinstance(data, pd.DataFrame):
         data.to_csv(filename, index=False)
     elif isinstance(data, (dict, list)):
         with open(filename, 'w') as f:
@@ -147,15 +448,19 @@ def save_to_file(data: Any, filename: str):
             f.write(str(data))
 
 def main():
-    scraper = CDLIAPIScraper()
+    # Set CDLI_CACHE_PATH to serve repeat scrapes from a local response cache
+    cache_path = os.environ.get("CDLI_CACHE_PATH")
+    scraper = CDLIAPIScraper(cache=HTTPCache(cache_path) if cache_path else None)
     
     try:
-        # Get and save all artifacts
-        all_artifacts = scraper.get_all_artifacts()
-        save_to_file(all_artifacts, "all_artifacts.csv")
+        # Stream all artifacts to disk, resuming from the last checkpoint if interrupted.
+        # Set CDLI_EXPORT_PATH to a .parquet file for a columnar export.
+        scraper.export_all_artifacts(os.environ.get("CDLI_EXPORT_PATH", "all_artifacts.csv"))
         logging.info("Successfully retrieved and saved all artifacts")
         
         logging.info("Scraping completed successfully.")
+        if scraper.cache:
+            logging.info(f"HTTP cache stats: {scraper.cache.stats}")
     except Exception as e:
         logging.error(f"An error occurred during scraping: {e}")
 
@@ -1,10 +1,37 @@
 import os
 import signal
 import sys
+import time
 
 from elevenlabs.client import ElevenLabs
 from elevenlabs.conversational_ai.conversation import Conversation
 from elevenlabs.conversational_ai.default_audio_interface import DefaultAudioInterface
+import instrumentation
+
+TURN_SECONDS = instrumentation.histogram(
+    "conversation_turn_seconds", "Time from a user transcript to the agent's response")
+PING_SECONDS = instrumentation.histogram(
+    "conversation_ping_seconds", "Round trip to the conversation server, as reported by its pings")
+
+
+class TurnTimer:
+    """Measure turn latency from the conversation callbacks."""
+
+    def __init__(self):
+        self.user_spoke_at = None
+
+    def user_transcript(self, transcript):
+        self.user_spoke_at = time.monotonic()
+        print(f"User: {transcript}")
+
+    def agent_response(self, response):
+        if self.user_spoke_at is not None:
+            TURN_SECONDS.observe(time.monotonic() - self.user_spoke_at)
+            self.user_spoke_at = None
+        print(f"Agent: {response}")
+
+    def latency(self, latency_ms):
+        PING_SECONDS.observe(latency_ms / 1000)
 
 def main():
     AGENT_ID=os.environ.get('AGENT_ID')
@@ -18,16 +45,17 @@ def main():
         sys.stderr.write("ELEVENLABS_API_KEY not set, assuming the agent is public\n")
 
     client = ElevenLabs(api_key=API_KEY)
+    turns = TurnTimer()
     conversation = Conversation(
         client,
         AGENT_ID,
         # Assume auth is required when API_KEY is set
         requires_auth=bool(API_KEY),
         audio_interface=DefaultAudioInterface(),
-        callback_agent_response=lambda response: print(f"Agent: {response}"),
+        callback_agent_response=turns.agent_response,
         callback_agent_response_correction=lambda original, corrected: print(f"Agent: {original} -> {corrected}"),
-        callback_user_transcript=lambda transcript: print(f"User: {transcript}"),
-        # callback_latency_measurement=lambda latency: print(f"Latency: {latency}ms"),
+        callback_user_transcript=turns.user_transcript,
+        callback_latency_measurement=turns.latency,
     )
     conversation.start_session()
 
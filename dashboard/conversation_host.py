@@ -0,0 +1,491 @@
+import os
+import sys
+import json
+import time
+import uuid
+import base64
+import asyncio
+import inspect
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed, WebSocketException
+
+import instrumentation
+from conversation import PING_SECONDS, TURN_SECONDS
+
+logger = logging.getLogger(__name__)
+
+FIRST_AUDIO_SECONDS = instrumentation.histogram(
+    "conversation_first_audio_seconds", "Time from a user transcript to the agent's first audio")
+SESSIONS = instrumentation.counter("conversation_sessions_total", "Hosted conversation sessions ended, by reason")
+
+DEFAULT_BASE_URL = os.environ.get("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io")
+MAX_SESSIONS = int(os.environ.get("CONVERSATION_MAX_SESSIONS", 32))
+IDLE_TIMEOUT = float(os.environ.get("CONVERSATION_IDLE_TIMEOUT", 120))
+
+
+class AsyncAudioInterface(ABC):
+    """Audio for one hosted session: 16-bit PCM mono at 16 kHz, as for the SDK's AudioInterface.
+
+    Unlike the SDK's interface it is driven from the event loop, so it can
+    sit on a websocket or in-memory buffers instead of a local device.
+    """
+
+    @abstractmethod
+    async def read(self) -> Optional[bytes]:
+        """Next chunk of user audio, or None once the user has gone."""
+
+    @abstractmethod
+    async def write(self, audio: bytes):
+        """Play a chunk of agent audio. Waiting here slows the session down rather than buffering without bound."""
+
+    async def interrupt(self):
+        """The user interrupted the agent: drop any audio not yet played."""
+
+    async def send_event(self, event: Dict[str, Any]):
+        """Pass a transcript or other session event on to the user's side, if it can show one."""
+
+    async def close(self):
+        """Called once when the session ends."""
+
+
+class BufferAudioInterface(AsyncAudioInterface):
+    """In-memory audio: feed() user audio in, read agent audio from `output`.
+
+    `output` is bounded, so a consumer that stops reading holds the session
+    (and through it the agent connection) back.
+    """
+
+    def __init__(self, max_output_chunks: int = 64):
+        self.input: asyncio.Queue = asyncio.Queue()
+        self.output: asyncio.Queue = asyncio.Queue(max_output_chunks)
+        self.events: List[Dict[str, Any]] = []
+        self.interruptions = 0
+
+    def feed(self, audio: Optional[bytes]):
+        """Queue a chunk of user audio. None ends the session."""
+        self.input.put_nowait(audio)
+
+    async def read(self) -> Optional[bytes]:
+        return await self.input.get()
+
+    async def write(self, audio: bytes):
+        await self.output.put(audio)
+
+    async def interrupt(self):
+        self.interruptions += 1
+        while not self.output.empty():
+            self.output.get_nowait()
+
+    async def send_event(self, event: Dict[str, Any]):
+        self.events.append(event)
+
+
+class WebSocketAudioInterface(AsyncAudioInterface):
+    """Audio over a client websocket, e.g. from a kiosk browser.
+
+    Binary frames carry audio both ways. Session events go to the client as
+    JSON text frames, and a {"type": "end"} text frame from it ends the session.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+
+    async def read(self) -> Optional[bytes]:
+        try:
+            while True:
+                message = await self.websocket.recv()
+                if isinstance(message, bytes):
+                    return message
+                try:
+                    if json.loads(message).get("type") == "end":
+                        return None
+                except (json.JSONDecodeError, AttributeError):
+                    logger.warning("Ignoring malformed message from client")
+        except ConnectionClosed:
+            return None
+
+    async def write(self, audio: bytes):
+        # send() waits for the socket's write buffer to drain, which is the backpressure
+        await self.websocket.send(audio)
+
+    async def interrupt(self):
+        await self.send_event({"type": "interruption"})
+
+    async def send_event(self, event: Dict[str, Any]):
+        try:
+            await self.websocket.send(json.dumps(event))
+        except ConnectionClosed:
+            pass
+
+
+class SessionStats:
+    """Latency and flow-control counters for one session. Only the latest `history` samples are kept."""
+
+    def __init__(self, history: int = 256):
+        self.started = time.monotonic()
+        self.connect_seconds: Optional[float] = None
+        self.turn_seconds = deque(maxlen=history)
+        self.first_audio_seconds = deque(maxlen=history)
+        self.ping_ms = deque(maxlen=history)
+        self.chunks_in = 0
+        self.chunks_out = 0
+        self.dropped_chunks = 0
+        self.backpressure_waits = 0
+        self.max_buffered = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "age_seconds": round(time.monotonic() - self.started, 1),
+            "connect_ms": round(self.connect_seconds * 1000, 1) if self.connect_seconds is not None else None,
+            "turn": instrumentation.latency_summary(self.turn_seconds),
+            "first_audio": instrumentation.latency_summary(self.first_audio_seconds),
+            "ping": instrumentation.latency_summary(self.ping_ms, scale=1),
+            "chunks_in": self.chunks_in,
+            "chunks_out": self.chunks_out,
+            "dropped_chunks": self.dropped_chunks,
+            "backpressure_waits": self.backpressure_waits,
+            "max_buffered": self.max_buffered,
+        }
+
+
+class ConversationSession:
+    """One agent conversation driven on the event loop.
+
+    Speaks the same websocket protocol as elevenlabs' Conversation, which
+    instead runs one thread per session and shares its stop flag between
+    instances. Agent audio passes through a bounded queue: when the audio
+    interface falls behind, the session stops reading from the agent until
+    there is room again, so agent messages (interruptions included) wait
+    behind at most `output_buffer` chunks. Interruptions empty the queue.
+    """
+
+    def __init__(self, session_id: str, url: str, audio: AsyncAudioInterface, output_buffer: int = 32,
+                 callbacks: Optional[Dict[str, Callable]] = None):
+        self.session_id = session_id
+        self.url = url
+        self.audio = audio
+        self.callbacks = callbacks or {}
+        self.queue: asyncio.Queue = asyncio.Queue(output_buffer)
+        self.stats = SessionStats()
+        self.conversation_id: Optional[str] = None
+        self.last_activity = time.monotonic()
+        self.end_reason: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+        self._last_interrupt_id = 0
+        self._user_spoke_at: Optional[float] = None
+        self._first_audio_since: Optional[float] = None
+
+    def touch(self):
+        self.last_activity = time.monotonic()
+
+    def end(self, reason: str = "ended"):
+        """Ask the session to stop. Await `task` to wait until it has."""
+        if self.end_reason is None:
+            self.end_reason = reason
+        self._stop.set()
+
+    async def _callback(self, name: str, *args):
+        callback = self.callbacks.get(name)
+        if callback is None:
+            return
+        try:
+            result = callback(*args)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"Session {self.session_id} {name} callback failed: {e}")
+
+    async def run(self):
+        """Connect to the agent and relay audio until the user, the agent or end() stops the session."""
+        start = time.monotonic()
+        try:
+            async with connect(self.url, max_size=None) as websocket:
+                self.stats.connect_seconds = time.monotonic() - start
+                tasks = [
+                    asyncio.create_task(self._send_input(websocket)),
+                    asyncio.create_task(self._receive(websocket)),
+                    asyncio.create_task(self._play()),
+                    asyncio.create_task(self._stop.wait()),
+                ]
+                try:
+                    done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                for task in done:
+                    if not task.cancelled() and task.exception() is not None:
+                        raise task.exception()
+        except (OSError, WebSocketException, ValueError, KeyError) as e:
+            logger.error(f"Session {self.session_id} failed: {e!r}")
+            self.end("error")
+        finally:
+            self.end("ended")
+            await self.audio.close()
+
+    async def _send_input(self, websocket):
+        while True:
+            audio = await self.audio.read()
+            if audio is None:
+                self.end("user_left")
+                return
+            self.touch()
+            self.stats.chunks_in += 1
+            await websocket.send(json.dumps({"user_audio_chunk": base64.b64encode(audio).decode()}))
+
+    async def _receive(self, websocket):
+        try:
+            async for raw in websocket:
+                await self._handle(json.loads(raw), websocket)
+        except ConnectionClosed:
+            pass
+        self.end("agent_ended")
+
+    async def _handle(self, message: Dict[str, Any], websocket):
+        kind = message.get("type")
+        if kind == "ping":
+            event = message["ping_event"]
+            await websocket.send(json.dumps({"type": "pong", "event_id": event["event_id"]}))
+            if event.get("ping_ms"):
+                self.stats.ping_ms.append(event["ping_ms"])
+                PING_SECONDS.observe(event["ping_ms"] / 1000)
+            return
+
+        self.touch()
+        if kind == "conversation_initiation_metadata":
+            self.conversation_id = message["conversation_initiation_metadata_event"]["conversation_id"]
+        elif kind == "audio":
+            event = message["audio_event"]
+            if int(event["event_id"]) <= self._last_interrupt_id:
+                return
+            if self._first_audio_since is not None:
+                elapsed = time.monotonic() - self._first_audio_since
+                self.stats.first_audio_seconds.append(elapsed)
+                FIRST_AUDIO_SECONDS.observe(elapsed)
+                self._first_audio_since = None
+            if self.queue.full():
+                self.stats.backpressure_waits += 1
+            await self.queue.put((int(event["event_id"]), base64.b64decode(event["audio_base_64"])))
+            self.stats.max_buffered = max(self.stats.max_buffered, self.queue.qsize())
+        elif kind == "user_transcript":
+            text = message["user_transcription_event"]["user_transcript"].strip()
+            self._user_spoke_at = self._first_audio_since = time.monotonic()
+            await self._callback("user_transcript", text)
+            await self.audio.send_event({"type": "user_transcript", "text": text})
+        elif kind == "agent_response":
+            text = message["agent_response_event"]["agent_response"].strip()
+            if self._user_spoke_at is not None:
+                elapsed = time.monotonic() - self._user_spoke_at
+                self.stats.turn_seconds.append(elapsed)
+                TURN_SECONDS.observe(elapsed)
+                self._user_spoke_at = None
+            await self._callback("agent_response", text)
+            await self.audio.send_event({"type": "agent_response", "text": text})
+        elif kind == "agent_response_correction":
+            event = message["agent_response_correction_event"]
+            await self._callback("agent_response_correction", event["original_agent_response"].strip(),
+                                 event["corrected_agent_response"].strip())
+        elif kind == "interruption":
+            self._last_interrupt_id = int(message["interruption_event"]["event_id"])
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.stats.dropped_chunks += 1
+            await self.audio.interrupt()
+
+    async def _play(self):
+        while True:
+            event_id, audio = await self.queue.get()
+            if event_id <= self._last_interrupt_id:
+                self.stats.dropped_chunks += 1
+                continue
+            await self.audio.write(audio)
+            self.stats.chunks_out += 1
+
+
+class ConversationHost:
+    """Run many agent conversations concurrently on one event loop.
+
+    Sessions are capped at `max_sessions`, and any with no user audio or agent
+    message (pings aside) for `idle_timeout` seconds is ended by a reaper task.
+    Use as an async context manager, which starts the reaper and ends every
+    session on exit.
+    """
+
+    def __init__(self, agent_id: str, api_key: Optional[str] = None, base_url: str = DEFAULT_BASE_URL,
+                 max_sessions: int = MAX_SESSIONS, idle_timeout: float = IDLE_TIMEOUT, reap_interval: float = 5.0,
+                 output_buffer: int = 32, client=None):
+        self.agent_id = agent_id
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.output_buffer = output_buffer
+        self._client = client
+        self.sessions: Dict[str, ConversationSession] = {}
+        # Sessions waiting for their URL, counted against max_sessions
+        self.starting = 0
+        self.ended = deque(maxlen=100)
+        self._reaper: Optional[asyncio.Task] = None
+
+    async def _url(self) -> str:
+        if not self.api_key:
+            # Public agent: same URL the SDK builds, http(s) -> ws(s)
+            return f"{self.base_url.replace('http', 'ws', 1)}/v1/convai/conversation?agent_id={self.agent_id}"
+        if self._client is None:
+            from elevenlabs.client import ElevenLabs
+            self._client = ElevenLabs(api_key=self.api_key, base_url=self.base_url)
+        response = await asyncio.to_thread(
+            self._client._client_wrapper.httpx_client.request,
+            f"v1/convai/conversation/get_signed_url?agent_id={self.agent_id}",
+            method="GET",
+        )
+        return response.json()["signed_url"]
+
+    async def start_session(self, audio: AsyncAudioInterface, session_id: Optional[str] = None,
+                            **callbacks: Callable) -> ConversationSession:
+        """Start a session on `audio` and return it once it is running.
+
+        Callbacks (user_transcript, agent_response, agent_response_correction)
+        may be plain functions or coroutines.
+
+        Raises:
+            RuntimeError: if max_sessions are already running or starting
+            ConnectionError: if no conversation URL could be obtained
+        """
+        if len(self.sessions) + self.starting >= self.max_sessions:
+            raise RuntimeError(f"{len(self.sessions) + self.starting} sessions already running")
+        # The slot is held across the await, so concurrent starts cannot all pass the check
+        self.starting += 1
+        try:
+            url = await self._url()
+        except Exception as e:
+            raise ConnectionError(f"Could not get a conversation URL: {e}") from e
+        finally:
+            self.starting -= 1
+        session_id = session_id or uuid.uuid4().hex
+        session = ConversationSession(session_id, url, audio, self.output_buffer, callbacks)
+        self.sessions[session_id] = session
+        session.task = asyncio.create_task(self._run(session))
+        return session
+
+    async def _run(self, session: ConversationSession):
+        try:
+            await session.run()
+        finally:
+            self.sessions.pop(session.session_id, None)
+            summary = {"session_id": session.session_id, "conversation_id": session.conversation_id,
+                       "reason": session.end_reason, **session.stats.summary()}
+            self.ended.append(summary)
+            SESSIONS.inc(reason=session.end_reason)
+            logger.info(f"Session ended: {summary}")
+
+    async def end_session(self, session_id: str, reason: str = "ended"):
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session.end(reason)
+            await session.task
+
+    def reap_idle(self) -> List[str]:
+        """End sessions idle for longer than idle_timeout. Returns their IDs."""
+        now = time.monotonic()
+        idle = [session for session in self.sessions.values() if now - session.last_activity > self.idle_timeout]
+        for session in idle:
+            logger.info(f"Reaping idle session {session.session_id}")
+            session.end("idle")
+        return [session.session_id for session in idle]
+
+    async def _reap_forever(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            self.reap_idle()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-session stats for running sessions, and the last ones to end."""
+        return {
+            "active": len(self.sessions),
+            "sessions": {session_id: session.stats.summary() for session_id, session in self.sessions.items()},
+            "ended": list(self.ended),
+        }
+
+    async def close(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+        sessions = list(self.sessions.values())
+        for session in sessions:
+            session.end("shutdown")
+        await asyncio.gather(*(session.task for session in sessions), return_exceptions=True)
+
+    async def __aenter__(self) -> "ConversationHost":
+        self._reaper = asyncio.create_task(self._reap_forever())
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def kiosk_handler(conversation_host: ConversationHost):
+    """Websocket server handler running one session per client connection.
+
+    Clients are turned away with close code 1013 (try again later) when the host is full,
+    and 1011 (internal error) when the conversation could not be started.
+    """
+    async def handler(websocket):
+        try:
+            session = await conversation_host.start_session(WebSocketAudioInterface(websocket))
+        except RuntimeError as e:
+            await websocket.close(1013, str(e))
+            return
+        except ConnectionError as e:
+            logger.error(str(e))
+            await websocket.close(1011, "Conversation unavailable")
+            return
+        await session.task
+
+    return handler
+
+
+async def serve(host: str, port: int, conversation_host: ConversationHost):
+    """Accept kiosk websockets on host:port until cancelled."""
+    from websockets.asyncio.server import serve as serve_websockets
+
+    async with serve_websockets(kiosk_handler(conversation_host), host, port, max_size=None):
+        print(f"Conversation host listening on ws://{host}:{port}", flush=True)
+        await asyncio.Future()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Host many agent conversations for websocket clients")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("CONVERSATION_HOST_PORT", 8770)))
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    agent_id = os.environ.get('AGENT_ID')
+    if not agent_id:
+        sys.stderr.write("AGENT_ID environment variable must be set\n")
+        sys.exit(1)
+
+    async def run():
+        async with ConversationHost(agent_id, api_key=os.environ.get('ELEVENLABS_API_KEY'),
+                                    max_sessions=args.max_sessions, idle_timeout=args.idle_timeout) as host:
+            await serve(args.host, args.port, host)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+import math
+import hashlib
+import logging
+import sqlite3
+import pandas as pd
+from typing import Dict, Any, List
+from artifact_store import TABLE
+from cdli_api_scraper import CDLIAPIScraper
+from http_cache import HTTPCache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _normalize(value: Any) -> str:
+    """Render a cell the same way whether it came from a fresh page or the store.
+
+    Pages and stored rows go through different type inference, so 31, 31.0
+    and "31.0" must all compare equal, as must NaN, None and "".
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    text = str(value).strip()
+    if text.lower() == "nan":
+        return ""
+    try:
+        number = float(text)
+        if number.is_integer() and not math.isinf(number):
+            return str(int(number))
+    except ValueError:
+        pass
+    return text
+
+
+def _row_hash(values) -> str:
+    return hashlib.sha256("\x1f".join(_normalize(v) for v in values).encode("utf-8")).hexdigest()
+
+
+def _is_retired(row: Dict[str, Any]) -> bool:
+    return _normalize(row.get("retired")) not in ("", "0", "false", "False") or \
+        _normalize(row.get("redirect_artifact_id")) != ""
+
+
+class CorpusSync:
+    """Incrementally refresh an artifact store (see artifact_store.py) from CDLI.
+
+    Each fresh page is first compared by content hash with the same page from
+    the previous sync and skipped when identical. Otherwise each artifact is
+    compared by row hash and only added, changed or retired artifacts are
+    written. Pairing the scraper with an HTTPCache (ttl=0) means unchanged
+    pages are revalidated with a 304 instead of being downloaded again.
+    """
+
+    def __init__(self, db_path: str, scraper: CDLIAPIScraper = None):
+        self.scraper = scraper or CDLIAPIScraper()
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS sync_pages (
+                page INTEGER PRIMARY KEY,
+                hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sync_rows (
+                key TEXT PRIMARY KEY,
+                artifact_id TEXT NOT NULL,
+                page INTEGER,
+                hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_sync_rows_page ON sync_rows(page);
+        """)
+        self.columns = self._table_columns()
+        if self.columns:
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS idx_artifact_id ON {TABLE}(artifact_id)")
+        self._seed_row_hashes()
+
+    def _table_columns(self) -> List[str]:
+        return [row[1] for row in self.connection.execute(f"PRAGMA table_info({TABLE})")]
+
+    def _seed_row_hashes(self):
+        """Hash every stored artifact once, the first time a store is synced."""
+        has_hashes = self.connection.execute("SELECT 1 FROM sync_rows LIMIT 1").fetchone()
+        if has_hashes or not self.columns:
+            return
+        logging.info("Hashing stored artifacts for the first sync")
+        for chunk in pd.read_sql_query(f"SELECT * FROM {TABLE}", self.connection, chunksize=10000):
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO sync_rows (key, artifact_id, page, hash) VALUES (?, ?, NULL, ?)",
+                [(_normalize(artifact_id), str(artifact_id), _row_hash(row))
+                 for artifact_id, row in zip(chunk["artifact_id"], chunk.itertuples(index=False))],
+            )
+        self.connection.commit()
+
+    def _store_id(self, key: str) -> str:
+        """Spell a new artifact's ID like the stored ones, which every lookup uses.
+
+        Exports spell IDs as floats ("5.0") while the API sends "5". An empty
+        store takes the export spelling, as the dashboard's files do.
+        """
+        if not key.isdigit():
+            return key
+        sample = self.connection.execute("SELECT artifact_id, key FROM sync_rows LIMIT 1").fetchone()
+        if sample is not None and sample[0] == sample[1]:
+            return key
+        return f"{key}.0"
+
+    def _ensure_columns(self, columns: List[str]):
+        if not self.columns:
+            column_defs = ", ".join(f'"{column}"' for column in columns)
+            self.connection.execute(f"CREATE TABLE {TABLE} ({column_defs})")
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS idx_artifact_id ON {TABLE}(artifact_id)")
+        else:
+            for column in columns:
+                if column not in self.columns:
+                    logging.info(f"Adding new column {column} to the store")
+                    self.connection.execute(f'ALTER TABLE {TABLE} ADD COLUMN "{column}"')
+        self.columns = self._table_columns()
+
+    def _apply_page(self, page: int, df: pd.DataFrame, summary: Dict[str, Any]):
+        self._ensure_columns(list(df.columns))
+        columns = list(df.columns)
+        placeholders = ", ".join("?" for _ in columns)
+        assignments = ", ".join(f'"{column}" = ?' for column in columns)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+
+        records = df.astype(object).where(pd.notna(df), None)
+        for values in records.itertuples(index=False):
+            values = tuple(values)
+            row = dict(zip(columns, values))
+            key = _normalize(row["artifact_id"])
+            row_hash = _row_hash(values)
+            previous = self.connection.execute(
+                "SELECT artifact_id, hash FROM sync_rows WHERE key = ?", (key,)).fetchone()
+
+            if previous is None:
+                stored_id = self._store_id(key)
+                values = tuple(stored_id if column == "artifact_id" else value for column, value in zip(columns, values))
+                self.connection.execute(f"INSERT INTO {TABLE} ({column_list}) VALUES ({placeholders})", values)
+                summary["retired" if _is_retired(row) else "added"].append(stored_id)
+            elif previous[1] != row_hash:
+                stored_id = previous[0]
+                # Keep the stored ID spelling so existing lookups keep working
+                values = tuple(stored_id if column == "artifact_id" else value for column, value in zip(columns, values))
+                self.connection.execute(
+                    f"UPDATE {TABLE} SET {assignments} WHERE artifact_id = ?", values + (stored_id,))
+                summary["retired" if _is_retired(row) else "changed"].append(stored_id)
+            else:
+                stored_id = previous[0]
+                summary["unchanged"] += 1
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_rows (key, artifact_id, page, hash) VALUES (?, ?, ?, ?)",
+                (key, stored_id, page, row_hash),
+            )
+
+    def sync(self, max_workers: int = 1) -> Dict[str, Any]:
+        """Fetch every page and apply the differences to the store.
+
+        Returns:
+            Change summary with the IDs that were added, changed or retired,
+            counts of unchanged artifacts and pages, and the number of stored
+            artifacts that no longer appear in the listing.
+        """
+        summary = {"pages": 0, "pages_unchanged": 0, "added": [], "changed": [], "retired": [],
+                   "unchanged": 0, "missing": 0}
+        seen_pages = []
+
+        for page, df in self.scraper.iter_artifact_pages(max_workers=max_workers):
+            summary["pages"] += 1
+            seen_pages.append(page)
+            page_hash = hashlib.sha256(
+                "\n".join(_row_hash(values) for values in df.itertuples(index=False)).encode("utf-8")
+            ).hexdigest()
+            previous = self.connection.execute("SELECT hash FROM sync_pages WHERE page = ?", (page,)).fetchone()
+            if previous and previous[0] == page_hash:
+                summary["pages_unchanged"] += 1
+                summary["unchanged"] += len(df)
+                continue
+
+            self._apply_page(page, df, summary)
+            self.connection.execute("INSERT OR REPLACE INTO sync_pages (page, hash) VALUES (?, ?)", (page, page_hash))
+            self.connection.commit()
+
+        if seen_pages:
+            placeholders = ", ".join("?" for _ in seen_pages)
+            summary["missing"] = self.connection.execute(
+                f"SELECT COUNT(*) FROM sync_rows WHERE page IS NULL OR page NOT IN ({placeholders})", seen_pages
+            ).fetchone()[0]
+        self.connection.execute("DELETE FROM sync_pages WHERE page > ?", (max(seen_pages, default=0),))
+        self.connection.commit()
+        return summary
+
+    def close(self):
+        self.connection.close()
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    return (f"{summary['pages']} pages ({summary['pages_unchanged']} unchanged): "
+            f"{len(summary['added'])} added, {len(summary['changed'])} changed, "
+            f"{len(summary['retired'])} retired, {summary['unchanged']} unchanged, "
+            f"{summary['missing']} no longer listed")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Incrementally sync an artifact store with CDLI")
+    parser.add_argument("store", help="Artifact store to update, e.g. all_artifacts.db")
+    parser.add_argument("--workers", type=int, default=1, help="Pages to fetch concurrently")
+    parser.add_argument("--cache", default="http_cache.db", help="HTTP cache used to revalidate unchanged pages")
+    args = parser.parse_args()
+
+    # ttl=0 revalidates every page, so unchanged pages cost a 304
+    scraper = CDLIAPIScraper(cache=HTTPCache(args.cache, ttl=0))
+    corpus = CorpusSync(args.store, scraper)
+    try:
+        summary = corpus.sync(max_workers=args.workers)
+    finally:
+        corpus.close()
+    logging.info(f"Sync complete: {format_summary(summary)}")
+    logging.info(f"HTTP cache stats: {scraper.cache.stats}")
+
+
+if __name__ == "__main__":
+    main()
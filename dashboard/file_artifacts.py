@@ -1,9 +1,35 @@
+import os
+import gzip
+import json
+import hashlib
+import logging
 import pandas as pd
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from artifact_store import ArtifactStore, is_store_path
+from artifact_schema import read_artifacts, select_columns
+from artifact_parquet import is_parquet_path, iter_parquet_artifacts, read_parquet_range
 
-def load_limited_artifacts(file_path='all_artifacts.csv', limit=100):
+logger = logging.getLogger(__name__)
+
+# Pre-serialized pages of the artifact table served by /artifacts-data
+ARTIFACT_PAGES = os.environ.get("ARTIFACT_PAGES", "artifact_pages")
+PAGE_SIZE = int(os.environ.get("ARTIFACT_PAGE_SIZE", "100"))
+PAGE_FORMATS = {"json": "application/json", "ndjson": "application/x-ndjson"}
+MANIFEST = "manifest.json"
+READ_CHUNK_ROWS = 10000
+
+def load_limited_artifacts(file_path='all_artifacts.csv', limit=100, offset=0, columns=None):
     try:
-        # Read the CSV file and limit to first 100 rows
-        df = pd.read_csv(file_path, nrows=limit)
+        if is_store_path(file_path):
+            # Range read from the indexed store, the rest of the corpus is never parsed
+            with ArtifactStore(file_path) as store:
+                df = store.get_range(offset, limit, columns)
+        elif is_parquet_path(file_path):
+            # Only the row groups holding the requested rows are read
+            df = read_parquet_range(file_path, offset, limit, columns)
+        else:
+            # Read `limit` rows after skipping `offset` rows, with the shared dtypes
+            df = read_artifacts(file_path, columns=columns, nrows=limit, skiprows=range(1, offset + 1))
         
         # Save the limited dataset to a new CSV file
         output_file = 'limited_artifacts.csv'
@@ -18,7 +44,163 @@ def load_limited_artifacts(file_path='all_artifacts.csv', limit=100):
         print(f"Error loading file: {str(e)}")
         return None
 
-if __name__ == "__main__":
+def _iter_chunks(file_path: str, chunksize: int, columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    if is_store_path(file_path):
+        with ArtifactStore(file_path) as store:
+            for offset in range(0, len(store), chunksize):
+                yield store.get_range(offset, chunksize, columns)
+    elif is_parquet_path(file_path):
+        yield from iter_parquet_artifacts(file_path, chunksize, columns)
+    else:
+        # The exported text as is, without the schema's type conversions
+        yield from pd.read_csv(file_path, usecols=select_columns(columns), dtype=str, keep_default_na=False,
+                               chunksize=chunksize)
+
+
+def _strings(series: pd.Series) -> pd.Series:
+    """Render a typed column the way the CDLI export spells it: flags as "1.0"/"0.0", missing as ""."""
+    if str(series.dtype) == "boolean":
+        text = series.astype(object).map({True: "1.0", False: "0.0"})
+    else:
+        text = series.astype(str).str.strip()
+    return text.where(series.notna(), "")
+
+
+def _page_rows(file_path: str, page_size: int, columns: Optional[Sequence[str]] = None) -> Iterator[List[Dict[str, str]]]:
+    """Yield the table as lists of exactly `page_size` rows (the last may be shorter).
+
+    Values are strings, blank when missing, as /artifacts-data served them from
+    limited_artifacts.csv: a CSV source keeps its text, typed sources (store,
+    Parquet) are rendered in the export's spelling.
+    """
+    rows = []
+    # Read in larger chunks than a page, most of the cost is per chunk rather than per row
+    for chunk in _iter_chunks(file_path, max(page_size, READ_CHUNK_ROWS), columns):
+        names = list(chunk.columns)
+        for values in zip(*(_strings(chunk[name]).tolist() for name in names)):
+            rows.append(dict(zip(names, values)))
+            if len(rows) == page_size:
+                yield rows
+                rows = []
+    if rows:
+        yield rows
+
+
+def serialize_page(rows: List[Dict[str, str]], format: str = "json") -> bytes:
+    """Encode one page as a JSON array or as one JSON object per line."""
+    if format == "ndjson":
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+    if format == "json":
+        return json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    raise ValueError(f"Unsupported page format: {format} (expected one of {', '.join(PAGE_FORMATS)})")
+
+
+def _brotli():
+    """The brotli module when installed; pages are then also written brotli-compressed."""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def _write_atomic(path: str, data: bytes):
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(data)
+    os.replace(f"{path}.tmp", path)
+
+
+def build_artifact_pages(file_path: str, pages_dir: str = ARTIFACT_PAGES, page_size: int = PAGE_SIZE,
+                         format: str = "json", columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Write the artifact table as compressed page shards plus a manifest describing them.
+
+    Each page is stored gzip-compressed (and brotli-compressed when the brotli
+    package is installed) under a name containing the SHA-256 of its
+    uncompressed bytes, which is also its ETag. Pages whose content did not
+    change are not rewritten, and the manifest is swapped in last so the server
+    never sees a page list pointing at missing files.
+
+    Args:
+        file_path: Artifacts CSV, Parquet file or store
+        pages_dir: Directory to write the pages and manifest.json to
+        page_size: Rows per page
+        format: "json" (one array per page) or "ndjson"
+        columns: Columns to include, all of them by default
+
+    Returns:
+        The manifest
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    serialize_page([], format)
+    brotli = _brotli()
+    encodings = (["br"] if brotli else []) + ["gzip"]
+    os.makedirs(pages_dir, exist_ok=True)
+    manifest_path = os.path.join(pages_dir, MANIFEST)
+    try:
+        with open(manifest_path) as f:
+            previous = json.load(f)["pages"]
+    except (FileNotFoundError, ValueError, KeyError):
+        previous = []
+
+    pages = []
+    header = list(columns) if columns is not None else []
+    total = 0
+    for number, rows in enumerate(_page_rows(file_path, page_size, columns)):
+        if number == 0:
+            header = list(rows[0])
+        body = serialize_page(rows, format)
+        digest = hashlib.sha256(body).hexdigest()
+        name = f"page-{number:06d}-{digest[:16]}.{format}"
+        page = {"file": name, "etag": digest, "rows": len(rows), "first_id": rows[0].get("artifact_id"),
+                "bytes": len(body)}
+        gzip_path = os.path.join(pages_dir, f"{name}.gz")
+        if not os.path.exists(gzip_path):
+            # mtime=0 keeps the output identical across builds
+            _write_atomic(gzip_path, gzip.compress(body, compresslevel=9, mtime=0))
+        page["gzip_bytes"] = os.path.getsize(gzip_path)
+        if brotli:
+            br_path = os.path.join(pages_dir, f"{name}.br")
+            if not os.path.exists(br_path):
+                _write_atomic(br_path, brotli.compress(body, quality=11))
+            page["br_bytes"] = os.path.getsize(br_path)
+        pages.append(page)
+        total += len(rows)
+
+    manifest = {"source": os.path.abspath(file_path), "format": format, "content_type": PAGE_FORMATS[format],
+                "page_size": page_size, "total": total, "encodings": encodings,
+                "columns": header, "pages": pages}
+    _write_atomic(manifest_path, json.dumps(manifest, indent=2).encode("utf-8"))
+
+    # The previous build's pages are kept until the next one, for requests that
+    # loaded its manifest just before the swap; anything older is removed
+    kept = {f"{page['file']}.{suffix}" for page in pages + previous for suffix in ("gz", "br")}
+    for name in os.listdir(pages_dir):
+        if name.startswith("page-") and name not in kept and not name.endswith(".tmp"):
+            os.remove(os.path.join(pages_dir, name))
+    logger.info(f"Wrote {len(pages)} pages of {total} artifacts to {pages_dir}")
+    return manifest
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Prepare artifact data for the dashboard")
+    subparsers = parser.add_subparsers(dest="command")
+    build = subparsers.add_parser("build", help="Write compressed page shards of the whole table")
+    build.add_argument("--input", default=os.environ.get("ARTIFACTS_FILE", "limited_artifacts.csv"),
+                       help="Artifacts CSV, Parquet file or store")
+    build.add_argument("--pages", default=ARTIFACT_PAGES, help="Directory to write the pages to")
+    build.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    build.add_argument("--format", choices=sorted(PAGE_FORMATS), default="json")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        manifest = build_artifact_pages(args.input, args.pages, args.page_size, args.format)
+        print(f"Wrote {len(manifest['pages'])} pages of {manifest['total']} artifacts to {args.pages}")
+        return
+
     # Load and limit the artifacts
     artifacts_df = load_limited_artifacts()
     
@@ -29,4 +211,8 @@ if __name__ == "__main__":
             print(f"Column {i}: {col}")
         print("\nDataset Info:")
         print(f"Number of rows: {len(artifacts_df)}")
-        print(f"Columns: {list(artifacts_df.columns)}")
\ No newline at end of file
+        print(f"Columns: {list(artifacts_df.columns)}")
+
+
+if __name__ == "__main__":
+    main()
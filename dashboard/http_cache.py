@@ -0,0 +1,163 @@
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import requests
+from typing import Dict, Any, Optional
+from requests.structures import CaseInsensitiveDict
+
+# Response headers worth keeping with a cached body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class HTTPCache:
+    """Persistent response cache for CDLIAPIScraper, stored in SQLite.
+
+    Entries are keyed on URL, query params and Accept header. An entry younger
+    than `ttl` seconds is served without touching the network. An older one is
+    revalidated with If-None-Match / If-Modified-Since when the server sent an
+    ETag or Last-Modified, so unchanged resources cost a 304 instead of a full
+    download. Once the stored bodies exceed `max_bytes` the least recently used
+    entries are evicted.
+
+    Hit, miss, revalidation, store and eviction counts are kept in `stats`.
+    """
+
+    def __init__(self, path: str = "http_cache.db", ttl: float = 24 * 3600, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidations": 0, "stores": 0, "evictions": 0}
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self.connection.commit()
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any] = None, headers: Dict[str, str] = None) -> str:
+        accept = (headers or {}).get("Accept", "")
+        params = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        return hashlib.sha256(json.dumps([url, params, accept]).encode("utf-8")).hexdigest()
+
+    def _count(self, name: str):
+        with self.lock:
+            self.stats[name] += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for `key` with a `fresh` flag, or None."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT url, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, headers, body, stored_at = row
+        return {
+            "url": url,
+            "headers": json.loads(headers),
+            "body": body,
+            "fresh": time.time() - stored_at < self.ttl,
+        }
+
+    @staticmethod
+    def validators(entry: Dict[str, Any]) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    def hit(self, key: str, entry: Dict[str, Any]) -> requests.Response:
+        """Record a fresh hit and return the cached response."""
+        self._count("hits")
+        self._touch(key, refresh=False)
+        return self.build_response(entry)
+
+    def revalidated(self, key: str, entry: Dict[str, Any]) -> requests.Response:
+        """Record a 304 for a stale entry, restart its TTL and return the cached response."""
+        self._count("revalidations")
+        self._touch(key, refresh=True)
+        return self.build_response(entry)
+
+    def miss(self):
+        self._count("misses")
+
+    def _touch(self, key: str, refresh: bool):
+        now = time.time()
+        with self.lock:
+            if refresh:
+                self.connection.execute(
+                    "UPDATE responses SET last_access = ?, stored_at = ? WHERE key = ?", (now, now, key))
+            else:
+                self.connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+
+    def store(self, key: str, response: requests.Response):
+        """Cache a successful response, evicting old entries if over budget."""
+        if response.status_code != 200 or "no-store" in response.headers.get("Cache-Control", ""):
+            return
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        now = time.time()
+        with self.lock:
+            previous = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if previous:
+                self.total_bytes -= previous[0]
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, url, headers, body, size, stored_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, json.dumps(headers), body, len(body), now, now),
+            )
+            self.total_bytes += len(body)
+            self.stats["stores"] += 1
+            self._evict()
+            self.connection.commit()
+
+    def _evict(self):
+        # Called with the lock held
+        while self.total_bytes > self.max_bytes:
+            row = self.connection.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 1").fetchone()
+            if row is None:
+                break
+            self.connection.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self.total_bytes -= row[1]
+            self.stats["evictions"] += 1
+            logging.debug(f"Evicted cached response {row[0]}")
+
+    @staticmethod
+    def build_response(entry: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response._content = entry["body"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.url = entry["url"]
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+            self.total_bytes = 0
+
+    def close(self):
+        self.connection.close()
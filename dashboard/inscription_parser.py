@@ -0,0 +1,559 @@
+import io
+import os
+import re
+import json
+import logging
+import numpy as np
+from array import array
+from multiprocessing import Pool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+INSCRIPTION_INDEX = os.environ.get("INSCRIPTION_INDEX", "inscription_index")
+FORMATS = ("atf", "cdli-conll", "conll-u")
+# File suffixes read in corpus mode, and their formats
+SUFFIX_FORMATS = {".atf": "atf", ".conll": "cdli-conll", ".conllu": "conll-u"}
+
+# Token flags, from the transliteration's damage markers
+BROKEN = 1      # inside or touching [ ]
+DAMAGED = 2     # # or ⸢ ⸣
+UNCERTAIN = 4   # ?
+
+ATF_SURFACES = {"obverse", "reverse", "left", "right", "top", "bottom", "edge", "face", "surface", "seal", "side"}
+# CDLI-CoNLL IDs start with a surface code, e.g. "o.3.1" is obverse line 3 word 1
+CONLL_SURFACES = {"o": "obverse", "r": "reverse", "t": "top", "b": "bottom", "l": "left", "le": "left",
+                  "re": "right", "e": "edge", "s": "seal"}
+
+ATF_LINE = re.compile(r"(\S+?)\.\s+(.*)")
+ATF_INLINE_COMMENT = re.compile(r"\(\$.*?\$\)")
+MARKERS = re.compile(r"[\[\]⸢⸣#?!*<>]")
+# Determinatives, |compound| signs, and signs joined by - . + : with any (qualifier)
+SIGN = re.compile(r"\{[^}]*\}|\|[^|]*\||[^-.{}|+:\s()]+(?:\([^)]*\))?")
+
+# A CDLI P-number ("P000001"), or the number alone ("1", "1.0")
+ARTIFACT_NUMBER = re.compile(r"P?0*(\d+)(?:\.0+)?", re.IGNORECASE)
+
+ARRAYS = ("artifact_offsets", "surface_offsets", "surface_kinds", "line_offsets", "token_ids", "token_flags",
+          "vocab_sign_offsets", "vocab_sign_ids")
+
+
+def table_id(artifact_id: str) -> str:
+    """The artifact table's spelling ("1.0") of an ID from an inscription source ("P000001", "1").
+
+    Bulk dumps and directories key texts by P-number, the table and the
+    summary worker by the exported float spelling, so IDs are stored as the latter.
+    """
+    artifact_id = str(artifact_id).strip()
+    match = ARTIFACT_NUMBER.fullmatch(artifact_id)
+    return f"{int(match.group(1))}.0" if match else artifact_id
+
+
+class InscriptionCorpus:
+    """Parsed inscriptions as interned ids in flat arrays.
+
+    Artifact i owns surfaces artifact_offsets[i]:artifact_offsets[i + 1],
+    surface j owns lines surface_offsets[j]:surface_offsets[j + 1] and line k
+    owns tokens line_offsets[k]:line_offsets[k + 1]. Tokens are ids into
+    `tokens` with BROKEN/DAMAGED/UNCERTAIN bits in token_flags; the signs of
+    vocabulary entry t are sign ids vocab_sign_ids[vocab_sign_offsets[t]:vocab_sign_offsets[t + 1]].
+    """
+
+    def __init__(self, artifact_ids: Sequence[str], tokens: List[str], signs: List[str], surfaces: List[str],
+                 **arrays: np.ndarray):
+        self.artifact_ids = np.asarray(artifact_ids, dtype=str)
+        self.tokens = tokens
+        self.signs = signs
+        self.surfaces = surfaces
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self._rows = None
+
+    def __len__(self) -> int:
+        return len(self.artifact_ids)
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        if self._rows is None:
+            self._rows = {artifact_id: row for row, artifact_id in enumerate(self.artifact_ids.tolist())}
+        return self._rows
+
+    def token_counts(self) -> np.ndarray:
+        """Occurrences of every vocabulary token."""
+        return np.bincount(self.token_ids, minlength=len(self.tokens))
+
+    def sign_counts(self) -> np.ndarray:
+        """Occurrences of every sign, counting each token's signs once per token occurrence."""
+        signs_per_token = np.diff(self.vocab_sign_offsets)
+        weights = np.repeat(self.token_counts(), signs_per_token)
+        return np.bincount(self.vocab_sign_ids, weights=weights, minlength=len(self.signs)).astype(np.int64)
+
+    def tokens_per_artifact(self) -> np.ndarray:
+        token_offsets = self.line_offsets[self.surface_offsets[self.artifact_offsets]]
+        return np.diff(token_offsets)
+
+    def stats(self, top: int = 20) -> Dict[str, Any]:
+        """Corpus totals and the most frequent tokens and signs."""
+        token_counts, sign_counts = self.token_counts(), self.sign_counts()
+        top_tokens = np.argsort(-token_counts, kind="stable")[:top]
+        top_signs = np.argsort(-sign_counts, kind="stable")[:top]
+        return {
+            "artifacts": len(self),
+            "surfaces": len(self.surface_kinds),
+            "lines": len(self.line_offsets) - 1,
+            "tokens": len(self.token_ids),
+            "distinct_tokens": int(np.count_nonzero(token_counts)),
+            "signs": int(sign_counts.sum()),
+            "distinct_signs": int(np.count_nonzero(sign_counts)),
+            "broken_fraction": round(float(np.mean(self.token_flags & BROKEN > 0)), 4) if len(self.token_ids) else 0.0,
+            "top_tokens": [(self.tokens[i], int(token_counts[i])) for i in top_tokens if token_counts[i]],
+            "top_signs": [(self.signs[i], int(sign_counts[i])) for i in top_signs if sign_counts[i]],
+        }
+
+    def _render(self, token_id: int, flags: int) -> str:
+        token = self.tokens[token_id]
+        if flags & BROKEN:
+            token = f"[{token}]"
+        if flags & DAMAGED:
+            token += "#"
+        if flags & UNCERTAIN:
+            token += "?"
+        return token
+
+    def lines(self, artifact_id: str) -> Optional[List[Tuple[str, List[str]]]]:
+        """(surface, lines) for each surface of an artifact, or None if it has no inscription."""
+        row = self.rows.get(table_id(artifact_id))
+        if row is None:
+            return None
+        result = []
+        for surface in range(self.artifact_offsets[row], self.artifact_offsets[row + 1]):
+            lines = []
+            for line in range(self.surface_offsets[surface], self.surface_offsets[surface + 1]):
+                start, end = self.line_offsets[line], self.line_offsets[line + 1]
+                lines.append(" ".join(self._render(token_id, flags) for token_id, flags in
+                                      zip(self.token_ids[start:end].tolist(), self.token_flags[start:end].tolist())))
+            result.append((self.surfaces[self.surface_kinds[surface]], lines))
+        return result
+
+    def prompt_text(self, artifact_id: str, max_lines: int = 40) -> str:
+        """The inscription on one line per surface, lines separated by " / ", for a summary prompt."""
+        surfaces = self.lines(artifact_id) or []
+        parts, remaining = [], max_lines
+        for surface, lines in surfaces:
+            if remaining <= 0:
+                parts.append("…")
+                break
+            text = " / ".join(lines[:remaining]) + (" / …" if len(lines) > remaining else "")
+            remaining -= len(lines)
+            parts.append(f"{surface}: {text}" if surface else text)
+        return "; ".join(parts)
+
+    def save(self, index_dir: str = INSCRIPTION_INDEX):
+        """Write the arrays as .npy files and the vocabularies as JSON, each swapped in whole."""
+        os.makedirs(index_dir, exist_ok=True)
+        for name, value in [("artifact_ids", self.artifact_ids)] + [(name, getattr(self, name)) for name in ARRAYS]:
+            tmp_path = os.path.join(index_dir, f"{name}.npy.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, value)
+            os.replace(tmp_path, os.path.join(index_dir, f"{name}.npy"))
+        with open(os.path.join(index_dir, "vocab.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump({"tokens": self.tokens, "signs": self.signs, "surfaces": self.surfaces}, f, ensure_ascii=False)
+        os.replace(os.path.join(index_dir, "vocab.json.tmp"), os.path.join(index_dir, "vocab.json"))
+
+    @classmethod
+    def load(cls, index_dir: str = INSCRIPTION_INDEX) -> "InscriptionCorpus":
+        """Open a saved corpus with every array memory-mapped."""
+        if not os.path.exists(os.path.join(index_dir, "vocab.json")):
+            raise FileNotFoundError(f"No inscription index in {index_dir}, build it with: "
+                                    f"python inscription_parser.py build <inscriptions>")
+        with open(os.path.join(index_dir, "vocab.json"), encoding="utf-8") as f:
+            vocab = json.load(f)
+        arrays = {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+        return cls(np.load(os.path.join(index_dir, "artifact_ids.npy"), mmap_mode="r"),
+                   vocab["tokens"], vocab["signs"], vocab["surfaces"], **arrays)
+
+
+def open_inscriptions(index_dir: str = INSCRIPTION_INDEX) -> Optional[InscriptionCorpus]:
+    """The saved corpus, or None if it has not been built."""
+    try:
+        return InscriptionCorpus.load(index_dir)
+    except FileNotFoundError:
+        return None
+
+
+class InscriptionBuilder:
+    """Accumulate parsed inscriptions into growable arrays, interning tokens, signs and surfaces.
+
+    Each distinct raw word is cleaned, flagged and split into signs once.
+    """
+
+    def __init__(self):
+        self.token_vocab: Dict[str, int] = {}
+        self.sign_vocab: Dict[str, int] = {}
+        self.surface_vocab: Dict[str, int] = {}
+        # raw word -> (token id or -1 if nothing is left once cleaned, flags, bracket open after the word)
+        self.words: Dict[str, Tuple[int, int, Optional[bool]]] = {}
+        self.artifact_ids: List[str] = []
+        self.artifact_offsets = array("q", [0])
+        self.surface_offsets = array("q", [0])
+        self.surface_kinds = array("i")
+        self.line_offsets = array("q", [0])
+        self.token_ids = array("i")
+        self.token_flags = array("B")
+        self.vocab_sign_offsets = array("q", [0])
+        self.vocab_sign_ids = array("i")
+        self.artifact_open = False
+        self.surface_open = False
+
+    def _intern(self, vocab: Dict[str, int], value: str) -> int:
+        index = vocab.get(value)
+        if index is None:
+            index = vocab[value] = len(vocab)
+        return index
+
+    def intern_token(self, token: str, sign_ids: Optional[Iterable[int]] = None) -> int:
+        """Vocabulary id of a cleaned token, recording its signs the first time it is seen."""
+        index = self.token_vocab.get(token)
+        if index is None:
+            index = self.token_vocab[token] = len(self.token_vocab)
+            if sign_ids is None:
+                sign_ids = [self._intern(self.sign_vocab, sign) for sign in SIGN.findall(token)]
+            self.vocab_sign_ids.extend(sign_ids)
+            self.vocab_sign_offsets.append(len(self.vocab_sign_ids))
+        return index
+
+    def _word(self, raw: str) -> Tuple[int, int, Optional[bool]]:
+        word = self.words.get(raw)
+        if word is None:
+            token = MARKERS.sub("", raw)
+            flags = (BROKEN if "[" in raw or "]" in raw else 0) | \
+                    (DAMAGED if "#" in raw or "⸢" in raw or "⸣" in raw else 0) | \
+                    (UNCERTAIN if "?" in raw else 0)
+            bracket = max(raw.rfind("["), raw.rfind("]"))
+            after = None if bracket < 0 else raw[bracket] == "["
+            word = self.words[raw] = (self.intern_token(token) if token else -1, flags, after)
+        return word
+
+    def start_artifact(self, artifact_id: str):
+        self.end_artifact()
+        self.artifact_ids.append(table_id(artifact_id))
+        self.artifact_open = True
+
+    def start_surface(self, name: str):
+        if not self.artifact_open:
+            raise ValueError(f"Surface {name!r} outside any artifact")
+        self.end_surface()
+        self.surface_kinds.append(self._intern(self.surface_vocab, name))
+        self.surface_open = True
+
+    def add_line(self, words: Iterable[str]):
+        """Add one line of raw transliterated words to the current surface."""
+        if not self.surface_open:
+            self.start_surface("")
+        in_break = False
+        count = len(self.token_ids)
+        for raw in words:
+            token_id, flags, after = self._word(raw)
+            if token_id >= 0:
+                self.token_ids.append(token_id)
+                self.token_flags.append(flags | (BROKEN if in_break else 0))
+            if after is not None:
+                in_break = after
+        if len(self.token_ids) > count:
+            self.line_offsets.append(len(self.token_ids))
+
+    def end_surface(self):
+        if self.surface_open:
+            self.surface_offsets.append(len(self.line_offsets) - 1)
+            self.surface_open = False
+
+    def end_artifact(self):
+        self.end_surface()
+        if self.artifact_open:
+            self.artifact_offsets.append(len(self.surface_kinds))
+            self.artifact_open = False
+
+    def finish(self) -> InscriptionCorpus:
+        self.end_artifact()
+        dtypes = {"artifact_offsets": np.int64, "surface_offsets": np.int64, "surface_kinds": np.int32,
+                  "line_offsets": np.int64, "token_ids": np.int32, "token_flags": np.uint8,
+                  "vocab_sign_offsets": np.int64, "vocab_sign_ids": np.int32}
+        arrays = {name: np.frombuffer(getattr(self, name), dtype=dtype).copy() for name, dtype in dtypes.items()}
+        return InscriptionCorpus(self.artifact_ids, list(self.token_vocab), list(self.sign_vocab),
+                                 list(self.surface_vocab), **arrays)
+
+
+def parse_atf(lines: Iterable[str], builder: InscriptionBuilder, artifact_id: Optional[str] = None):
+    """Stream C-ATF into the builder.
+
+    With artifact_id every line belongs to that artifact; otherwise each
+    "&P000001 = ..." header starts a new one, as in a bulk ATF dump.
+    """
+    if artifact_id is not None:
+        builder.start_artifact(artifact_id)
+    pending: List[str] = []
+    for line in lines:
+        if line[:1] in (" ", "\t") and pending:
+            # Continuation of the previous text line
+            pending.extend(ATF_INLINE_COMMENT.sub(" ", line).split())
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        if pending:
+            builder.add_line(pending)
+            pending = []
+        first = line[0]
+        if first == "&":
+            if artifact_id is None:
+                builder.start_artifact(line[1:].split("=", 1)[0].strip())
+        elif first == "@":
+            tag, _, rest = line[1:].partition(" ")
+            if tag in ATF_SURFACES and builder.artifact_open:
+                builder.start_surface(f"{tag} {rest.strip()}".strip())
+        elif first in "#$=/>":
+            # Comments, protocols (#lem:, #tr.en:), state lines and parallels carry no transliteration
+            continue
+        elif builder.artifact_open:
+            match = ATF_LINE.match(line)
+            if match:
+                pending = [word for word in ATF_INLINE_COMMENT.sub(" ", match.group(2)).split()
+                           if word[0] not in "%$"]
+    if pending:
+        builder.add_line(pending)
+
+
+def parse_cdli_conll(lines: Iterable[str], builder: InscriptionBuilder, artifact_id: Optional[str] = None):
+    """Stream CDLI-CoNLL (one word per row, IDs like "o.3.1") into the builder."""
+    if artifact_id is not None:
+        builder.start_artifact(artifact_id)
+    pending: List[str] = []
+    line_key, surface = None, None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.startswith("#"):
+            if line.startswith("#new_text=") and artifact_id is None:
+                if pending:
+                    builder.add_line(pending)
+                    pending = []
+                builder.start_artifact(line[len("#new_text="):].strip())
+                line_key, surface = None, None
+            continue
+        fields = line.split("\t")
+        if len(fields) < 2 or not builder.artifact_open:
+            continue
+        parts = fields[0].split(".")
+        key = ".".join(parts[:-1])
+        if key != line_key:
+            if pending:
+                builder.add_line(pending)
+                pending = []
+            line_key = key
+            code = parts[0] if len(parts) > 2 else ""
+            name = CONLL_SURFACES.get(code, code)
+            if name != surface:
+                builder.start_surface(name)
+                surface = name
+        pending.append(fields[1])
+    if pending:
+        builder.add_line(pending)
+
+
+def parse_conll_u(lines: Iterable[str], builder: InscriptionBuilder, artifact_id: Optional[str] = None):
+    """Stream CoNLL-U into the builder, one sentence per line."""
+    if artifact_id is not None:
+        builder.start_artifact(artifact_id)
+    pending: List[str] = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            if pending:
+                builder.add_line(pending)
+                pending = []
+            continue
+        if line.startswith("#"):
+            if artifact_id is None and line.startswith("# newdoc id"):
+                if pending:
+                    builder.add_line(pending)
+                    pending = []
+                builder.start_artifact(line.split("=", 1)[-1].strip())
+            continue
+        fields = line.split("\t")
+        # Skip multiword token ranges ("1-2") and empty nodes ("1.1")
+        if len(fields) < 2 or not fields[0].isdigit() or not builder.artifact_open:
+            continue
+        pending.append(fields[1])
+    if pending:
+        builder.add_line(pending)
+
+
+PARSERS = {"atf": parse_atf, "cdli-conll": parse_cdli_conll, "conll-u": parse_conll_u}
+
+
+def parse_inscription(text: Union[str, Iterable[str]], format: str = "atf", artifact_id: Optional[str] = None,
+                      builder: Optional[InscriptionBuilder] = None) -> InscriptionBuilder:
+    """Parse one inscription as returned by CDLIAPIScraper.get_inscription, or any iterable of its lines.
+
+    Returns:
+        The builder, so several inscriptions can be parsed into one before calling finish()
+    """
+    if format not in PARSERS:
+        raise ValueError(f"Unknown inscription format: {format}")
+    builder = builder or InscriptionBuilder()
+    PARSERS[format](io.StringIO(text) if isinstance(text, str) else text, builder, artifact_id)
+    return builder
+
+
+def merge_corpora(corpora: Iterable[InscriptionCorpus]) -> InscriptionCorpus:
+    """Concatenate corpora parsed separately, re-interning their vocabularies into one."""
+    merged = InscriptionBuilder()
+    parts = {name: [] for name in ARRAYS if not name.startswith("vocab_")}
+    artifact_ids, surfaces, lines, tokens = [], 0, 0, 0
+    for corpus in corpora:
+        sign_map = np.array([merged._intern(merged.sign_vocab, sign) for sign in corpus.signs] or [0], dtype=np.int32)
+        token_map = np.empty(len(corpus.tokens), dtype=np.int32)
+        offsets = np.asarray(corpus.vocab_sign_offsets).tolist()
+        sign_ids = sign_map[corpus.vocab_sign_ids].tolist()
+        for index, token in enumerate(corpus.tokens):
+            token_map[index] = merged.intern_token(token, sign_ids[offsets[index]:offsets[index + 1]])
+        surface_map = np.array([merged._intern(merged.surface_vocab, name) for name in corpus.surfaces] or [0],
+                               dtype=np.int32)
+
+        artifact_ids.extend(corpus.artifact_ids.tolist())
+        parts["artifact_offsets"].append(np.asarray(corpus.artifact_offsets[1:]) + surfaces)
+        parts["surface_offsets"].append(np.asarray(corpus.surface_offsets[1:]) + lines)
+        parts["surface_kinds"].append(surface_map[corpus.surface_kinds])
+        parts["line_offsets"].append(np.asarray(corpus.line_offsets[1:]) + tokens)
+        parts["token_ids"].append(token_map[corpus.token_ids])
+        parts["token_flags"].append(np.asarray(corpus.token_flags))
+        surfaces += len(corpus.surface_kinds)
+        lines += len(corpus.line_offsets) - 1
+        tokens += len(corpus.token_ids)
+
+    starts = {"artifact_offsets": [0], "surface_offsets": [0], "line_offsets": [0]}
+    dtypes = {"surface_kinds": np.int32, "token_ids": np.int32, "token_flags": np.uint8}
+    arrays = {name: np.concatenate([np.asarray(starts.get(name, []), dtype=dtypes.get(name, np.int64))] + values)
+              .astype(dtypes.get(name, np.int64)) for name, values in parts.items()}
+    arrays["vocab_sign_offsets"] = np.frombuffer(merged.vocab_sign_offsets, dtype=np.int64).copy()
+    arrays["vocab_sign_ids"] = np.frombuffer(merged.vocab_sign_ids, dtype=np.int32).copy()
+    return InscriptionCorpus(artifact_ids, list(merged.token_vocab), list(merged.sign_vocab),
+                             list(merged.surface_vocab), **arrays)
+
+
+def _parse_batch(batch: Tuple[str, List[Any]]) -> InscriptionCorpus:
+    """Pool task: parse a batch of JSONL records, (artifact_id, format, text) triples or ATF dump lines."""
+    kind, items = batch
+    builder = InscriptionBuilder()
+    if kind == "jsonl":
+        for line in items:
+            record = json.loads(line)
+            if record.get("resource", "inscription") != "inscription" or not record.get("data"):
+                continue
+            parse_inscription(record["data"], record.get("format", "atf"), str(record["artifact_id"]), builder)
+    elif kind == "files":
+        for artifact_id, format, path in items:
+            with open(path, encoding="utf-8") as f:
+                parse_inscription(f, format, artifact_id, builder)
+    else:
+        parse_inscription(items, kind, None, builder)
+    return builder.finish()
+
+
+def _batches(source: str, batch_size: int) -> Iterator[Tuple[str, List[Any]]]:
+    """Split the input into pool tasks without parsing it here."""
+    if os.path.isdir(source):
+        files = []
+        for name in sorted(os.listdir(source)):
+            stem, suffix = os.path.splitext(name)
+            if suffix in SUFFIX_FORMATS:
+                files.append((stem, SUFFIX_FORMATS[suffix], os.path.join(source, name)))
+        for start in range(0, len(files), batch_size):
+            yield "files", files[start:start + batch_size]
+        return
+
+    suffix = os.path.splitext(source)[1]
+    with open(source, encoding="utf-8") as f:
+        if suffix in (".jsonl", ".json"):
+            batch = []
+            for line in f:
+                if line.strip():
+                    batch.append(line)
+                if len(batch) >= batch_size:
+                    yield "jsonl", batch
+                    batch = []
+            if batch:
+                yield "jsonl", batch
+            return
+
+        # A bulk dump: split between texts, at ATF "&" headers or CoNLL document markers
+        format = SUFFIX_FORMATS.get(suffix, "atf")
+        marker = {"atf": "&", "cdli-conll": "#new_text=", "conll-u": "# newdoc id"}[format]
+        batch, texts = [], 0
+        for line in f:
+            if line.startswith(marker):
+                if texts >= batch_size:
+                    yield format, batch
+                    batch, texts = [], 0
+                texts += 1
+            batch.append(line)
+        if batch:
+            yield format, batch
+
+
+def build_inscription_index(source: str, index_dir: str = INSCRIPTION_INDEX, processes: Optional[int] = None,
+                            batch_size: int = 500) -> InscriptionCorpus:
+    """Parse a corpus of downloaded inscriptions across a process pool and save it to index_dir.
+
+    Args:
+        source: JSONL written by CDLIAPIScraper.enrich_artifacts(output_path=...), a directory of
+            <artifact_id>.atf / .conll / .conllu files, or a bulk .atf / .conll / .conllu dump
+        processes: Pool size, defaults to the CPU count; 1 parses in this process
+        batch_size: Inscriptions per pool task
+
+    Returns:
+        The merged corpus
+    """
+    batches = _batches(source, batch_size)
+    if processes == 1:
+        corpus = merge_corpora(_parse_batch(batch) for batch in batches)
+    else:
+        with Pool(processes) as pool:
+            corpus = merge_corpora(pool.imap(_parse_batch, batches))
+    corpus.save(index_dir)
+    return corpus
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parse ATF and CoNLL inscriptions into interned arrays")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Parse a corpus of downloaded inscriptions")
+    build.add_argument("source", help="enrich_artifacts JSONL, a directory of inscription files or a bulk dump")
+    build.add_argument("--index", default=INSCRIPTION_INDEX, help="Directory to write the arrays to")
+    build.add_argument("--processes", type=int, help="Worker processes (default: CPU count)")
+    build.add_argument("--batch-size", type=int, default=500)
+    stats = subparsers.add_parser("stats", help="Print token and sign statistics")
+    stats.add_argument("--index", default=INSCRIPTION_INDEX)
+    stats.add_argument("--top", type=int, default=20)
+    show = subparsers.add_parser("show", help="Print one artifact's inscription as used in prompts")
+    show.add_argument("artifact_id")
+    show.add_argument("--index", default=INSCRIPTION_INDEX)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == "build":
+        corpus = build_inscription_index(args.source, args.index, args.processes, args.batch_size)
+        print(f"Parsed {len(corpus)} inscriptions, {len(corpus.token_ids)} tokens, into {args.index}")
+    elif args.command == "stats":
+        print(json.dumps(InscriptionCorpus.load(args.index).stats(args.top), indent=2, ensure_ascii=False))
+    else:
+        text = InscriptionCorpus.load(args.index).prompt_text(args.artifact_id)
+        if not text:
+            print(f"No inscription found for artifact ID: {args.artifact_id}")
+            raise SystemExit(1)
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
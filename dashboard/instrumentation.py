@@ -0,0 +1,249 @@
+import os
+import time
+import bisect
+import atexit
+import logging
+import threading
+import statistics
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from cache hits up to video generation
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+RATE_BUCKETS = (1, 5, 10, 25, 50, 75, 100, 150, 200, 400)
+
+# Metrics are off unless METRICS_ENABLED is set or an export target is configured.
+# When off, every record call returns after a single flag check.
+METRICS_FILE = os.environ.get("METRICS_FILE")
+METRICS_PORT = os.environ.get("METRICS_PORT")
+enabled = bool(METRICS_FILE or METRICS_PORT) or os.environ.get("METRICS_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if not enabled:
+            return
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.lock = threading.Lock()
+        # label key -> [per-bucket counts (last is +Inf), sum]
+        self.values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        if not enabled or value is None:
+            return
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block, in seconds."""
+        if not enabled:
+            yield
+            return
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def snapshot(self, **labels) -> Optional[Dict[str, float]]:
+        """Count and sum for one label set, or None if nothing was observed."""
+        with self.lock:
+            series = self.values.get(_label_key(labels))
+            if series is None:
+                return None
+            return {"count": sum(series[0]), "sum": series[1]}
+
+    def samples(self):
+        with self.lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self.values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(key, (('le', _format_value(bound)),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(key)} {cumulative}"
+
+
+class Registry:
+    """Named metrics of one process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, object] = {}
+
+    def _register(self, cls, name: str, documentation: str, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, documentation, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter, name, documentation)
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, buckets=buckets)
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = sorted(self.metrics.items())
+        lines = []
+        for name, metric in metrics:
+            samples = list(metric.samples())
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def clear(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            with metric.lock:
+                metric.values.clear()
+
+
+registry = Registry()
+
+
+def counter(name: str, documentation: str) -> Counter:
+    return registry.counter(name, documentation)
+
+
+def histogram(name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return registry.histogram(name, documentation, buckets)
+
+
+def latency_summary(values: Iterable[float], scale: float = 1000, percentiles: Sequence[int] = (50, 95),
+                    digits: int = 1) -> Dict[str, Any]:
+    """Count, percentiles and max of raw latency samples, e.g. {"count": 3, "p50_ms": 12.0, ...}.
+
+    Samples are in seconds and reported in milliseconds; pass scale=1 for
+    samples already in milliseconds. Percentiles interpolate between samples.
+    """
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    cuts = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else values * 99
+    summary = {"count": len(values)}
+    for percentile in percentiles:
+        summary[f"p{percentile}_ms"] = round(cuts[percentile - 1] * scale, digits)
+    summary["max_ms"] = round(values[-1] * scale, digits)
+    return summary
+
+
+def write_metrics(path: str):
+    """Write the current metrics to `path` atomically, e.g. for node_exporter's textfile collector.
+
+    `{pid}` in the path is replaced by the process ID, so short-lived
+    processes do not overwrite each other's files.
+    """
+    path = path.format(pid=os.getpid())
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def enable(value: bool = True):
+    global enabled
+    enabled = value
+
+
+if METRICS_FILE:
+    atexit.register(write_metrics, METRICS_FILE)
+if METRICS_PORT:
+    try:
+        serve_metrics(int(METRICS_PORT))
+    except OSError as e:
+        # Another process of the dashboard already serves this port
+        logger.warning(f"Could not serve metrics on port {METRICS_PORT}: {e}")
@@ -0,0 +1,279 @@
+import time
+import heapq
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+WAIT_SECONDS = instrumentation.histogram(
+    "scheduler_wait_seconds", "Time jobs wait in the scheduler queue, by kind and priority")
+REQUESTS = instrumentation.counter(
+    "scheduler_requests_total", "Interactive requests, by kind and whether a prefetch had finished (hit), "
+    "was running (inflight) or had not started (miss)")
+PREFETCHES = instrumentation.counter("scheduler_prefetches_total", "Prefetch jobs, by kind and outcome")
+
+# Priority classes, most urgent first
+INTERACTIVE = 0
+PREFETCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", PREFETCH: "prefetch"}
+
+# Interactive request outcomes
+HIT = "hit"
+INFLIGHT = "inflight"
+MISS = "miss"
+
+
+class _Job:
+    def __init__(self, kind: str, key: str, fn: Callable[[], Any], priority: int, seq: int):
+        self.kind = kind
+        self.key = key
+        self.fn = fn
+        self.priority = priority
+        self.seq = seq
+        self.future = Future()
+        self.queued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.cancelled = False
+
+
+class JobScheduler:
+    """Run summary and video jobs on a thread pool in two priority classes.
+
+    Interactive jobs run first-in first-out ahead of anything queued for
+    prefetch, and at most `max_prefetch` of the `max_workers` threads ever run
+    prefetch work, so the rest stay free for interactive jobs. Prefetch jobs
+    run newest first, since they follow what the user is looking at now; past
+    `max_queued_prefetch` the oldest are dropped. `budgets` caps the prefetch
+    jobs accepted per kind in each `budget_window` seconds (0 disables
+    prefetch for that kind, a missing kind is unlimited).
+
+    Jobs are keyed by (kind, key). Submitting a key that is already queued or
+    running returns the existing job's future, and an interactive request
+    for a queued prefetch promotes it to the front.
+    """
+
+    def __init__(self, max_workers: int = 4, max_prefetch: int = 2, max_queued_prefetch: int = 64,
+                 budgets: Optional[Dict[str, int]] = None, budget_window: float = 3600.0, history: int = 4096):
+        self.max_workers = max_workers
+        self.max_prefetch = max_prefetch
+        self.max_queued_prefetch = max_queued_prefetch
+        self.budgets = dict(budgets or {})
+        self.budget_window = budget_window
+        self.history = history
+        self.condition = threading.Condition()
+        self.heap = []
+        self.seq = 0
+        self.jobs: Dict[Tuple[str, str], _Job] = {}
+        self.queued = {INTERACTIVE: 0, PREFETCH: 0}
+        self.running = {INTERACTIVE: 0, PREFETCH: 0}
+        # Prefetched results not yet asked for, oldest first
+        self.prefetched: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self.spent: Dict[str, deque] = {}
+        self.waits = {priority: deque(maxlen=history) for priority in PRIORITY_NAMES}
+        self.requests: Dict[str, Dict[str, int]] = {}
+        self.prefetches: Dict[str, Dict[str, int]] = {}
+        self.closed = False
+        self.threads = [threading.Thread(target=self._work, daemon=True, name=f"scheduler-{i}")
+                        for i in range(max_workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def _count(self, table: Dict[str, Dict[str, int]], kind: str, outcome: str):
+        counts = table.setdefault(kind, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+        (REQUESTS if table is self.requests else PREFETCHES).inc(kind=kind, outcome=outcome)
+
+    def _push(self, job: _Job):
+        # Interactive jobs first in first out, prefetch newest first
+        order = job.seq if job.priority == INTERACTIVE else -job.seq
+        heapq.heappush(self.heap, (job.priority, order, job))
+        self.queued[job.priority] += 1
+        self.condition.notify()
+
+    def _cancel(self, job: _Job, outcome: str):
+        job.cancelled = True
+        self.queued[job.priority] -= 1
+        del self.jobs[(job.kind, job.key)]
+        job.future.cancel()
+        self._count(self.prefetches, job.kind, outcome)
+
+    def budget_remaining(self, kind: str) -> Optional[int]:
+        """Prefetch jobs of this kind still accepted in the current window, or None if unlimited."""
+        with self.condition:
+            return self._budget_remaining(kind)
+
+    def _budget_remaining(self, kind: str) -> Optional[int]:
+        if kind not in self.budgets:
+            return None
+        spent = self.spent.setdefault(kind, deque())
+        while spent and spent[0] <= time.monotonic() - self.budget_window:
+            spent.popleft()
+        return max(0, self.budgets[kind] - len(spent))
+
+    def _record_request(self, kind: str, key: str, job: Optional[_Job]) -> str:
+        if job is None:
+            try:
+                del self.prefetched[(kind, key)]
+                outcome = HIT
+            except KeyError:
+                outcome = MISS
+        elif job.priority == PREFETCH and job.started_at is not None:
+            outcome = INFLIGHT
+        else:
+            outcome = MISS
+        self._count(self.requests, kind, outcome)
+        return outcome
+
+    def submit(self, kind: str, key: str, fn: Callable[[], Any], priority: int = INTERACTIVE) -> Optional[Future]:
+        """Queue fn() as the job for (kind, key).
+
+        Returns:
+            Future of fn's result, shared with any job already queued or
+            running for the key; None if a prefetch is over budget
+
+        Raises:
+            RuntimeError: after shutdown()
+        """
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Scheduler is shut down")
+            job = self.jobs.get((kind, key))
+            if priority == INTERACTIVE:
+                self._record_request(kind, key, job)
+            if job is not None:
+                if priority < job.priority and job.started_at is None:
+                    # Promote: the old heap entry is skipped because its priority no longer matches
+                    self.queued[job.priority] -= 1
+                    self.seq += 1
+                    job.priority, job.seq = priority, self.seq
+                    job.queued_at = time.monotonic()
+                    self._push(job)
+                return job.future
+
+            if priority == PREFETCH:
+                remaining = self._budget_remaining(kind)
+                if remaining == 0:
+                    self._count(self.prefetches, kind, "over_budget")
+                    return None
+                if remaining is not None:
+                    self.spent[kind].append(time.monotonic())
+                if self.queued[PREFETCH] >= self.max_queued_prefetch:
+                    oldest = min((queued for queued in self.jobs.values()
+                                  if queued.priority == PREFETCH and queued.started_at is None),
+                                 key=lambda queued: queued.seq)
+                    self._cancel(oldest, "dropped")
+                self._count(self.prefetches, kind, "submitted")
+
+            self.seq += 1
+            job = _Job(kind, key, fn, priority, self.seq)
+            self.jobs[(kind, key)] = job
+            self._push(job)
+            return job.future
+
+    def prefetch(self, kind: str, key: str, fn: Callable[[], Any]) -> Optional[Future]:
+        """Queue fn() as background work, within the prefetch budget for `kind`."""
+        return self.submit(kind, key, fn, PREFETCH)
+
+    def claim(self, kind: str, key: str) -> str:
+        """Record an interactive request that the caller serves itself, e.g. a streamed summary.
+
+        A prefetch of the same key that has not started yet is cancelled.
+
+        Returns:
+            HIT, INFLIGHT or MISS
+        """
+        with self.condition:
+            job = self.jobs.get((kind, key))
+            outcome = self._record_request(kind, key, job)
+            if job is not None and job.priority == PREFETCH and job.started_at is None:
+                self._cancel(job, "superseded")
+            return outcome
+
+    def _next(self) -> Optional[_Job]:
+        while self.heap:
+            priority, _, job = self.heap[0]
+            if job.cancelled or job.started_at is not None or priority != job.priority:
+                heapq.heappop(self.heap)
+                continue
+            # Interactive jobs sort first, so a prefetch job at the head means none are waiting
+            if priority == PREFETCH and self.running[PREFETCH] >= self.max_prefetch:
+                return None
+            heapq.heappop(self.heap)
+            return job
+        return None
+
+    def _work(self):
+        while True:
+            with self.condition:
+                job = self._next()
+                while job is None:
+                    if self.closed and not self.queued[INTERACTIVE]:
+                        return
+                    self.condition.wait()
+                    job = self._next()
+                job.started_at = time.monotonic()
+                self.queued[job.priority] -= 1
+                self.running[job.priority] += 1
+                priority = job.priority
+                wait = job.started_at - job.queued_at
+                self.waits[priority].append(wait)
+            WAIT_SECONDS.observe(wait, kind=job.kind, priority=PRIORITY_NAMES[priority])
+            job.future.set_running_or_notify_cancel()
+
+            result, error = None, None
+            try:
+                result = job.fn()
+            except Exception as e:
+                logger.error(f"{PRIORITY_NAMES[priority].capitalize()} {job.kind} job for {job.key} failed: {e}")
+                error = e
+
+            with self.condition:
+                self.running[priority] -= 1
+                del self.jobs[(job.kind, job.key)]
+                if priority == PREFETCH:
+                    self._count(self.prefetches, job.kind, "failed" if error else "completed")
+                    if error is None:
+                        self.prefetched[(job.kind, job.key)] = None
+                        while len(self.prefetched) > self.history:
+                            self.prefetched.popitem(last=False)
+                self.condition.notify_all()
+            # Outside the lock: done callbacks may submit more work
+            if error is None:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times, prefetch outcomes and hit rate by kind."""
+        with self.condition:
+            requests = {}
+            for kind, counts in self.requests.items():
+                total = sum(counts.values())
+                requests[kind] = {**counts, "hit_rate": round(counts.get(HIT, 0) / total, 3) if total else None}
+            prefetches = {kind: {**counts, "budget_remaining": self._budget_remaining(kind)}
+                          for kind, counts in self.prefetches.items()}
+            return {
+                "workers": self.max_workers,
+                "queued": {name: self.queued[priority] for priority, name in PRIORITY_NAMES.items()},
+                "running": {name: self.running[priority] for priority, name in PRIORITY_NAMES.items()},
+                "wait": {name: instrumentation.latency_summary(self.waits[priority])
+                         for priority, name in PRIORITY_NAMES.items()},
+                "requests": requests,
+                "prefetch": prefetches,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Drop queued prefetch work and stop once interactive jobs have run."""
+        with self.condition:
+            self.closed = True
+            for job in [job for job in self.jobs.values() if job.priority == PREFETCH and job.started_at is None]:
+                self._cancel(job, "dropped")
+            self.condition.notify_all()
+        if wait:
+            for thread in self.threads:
+                thread.join()
@@ -0,0 +1,174 @@
+import os
+import time
+import logging
+import threading
+import anthropic
+from collections import deque
+from typing import Dict, Any, Generator, AsyncGenerator, Optional
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SECONDS = instrumentation.histogram("llm_request_seconds", "Total time of LLM calls, by model and outcome")
+TIME_TO_FIRST_TOKEN = instrumentation.histogram("llm_time_to_first_token_seconds", "Time to the first streamed token")
+TOKENS_PER_SECOND = instrumentation.histogram(
+    "llm_output_tokens_per_second", "Output tokens per second of successful calls", buckets=instrumentation.RATE_BUCKETS)
+TOKENS = instrumentation.counter("llm_tokens_total", "Tokens used, by model and direction")
+
+DEFAULT_MODEL = "claude-3-5-sonnet-20241022"
+DEFAULT_TIMEOUT = float(os.environ.get("ANTHROPIC_TIMEOUT", 60))
+DEFAULT_MAX_RETRIES = int(os.environ.get("ANTHROPIC_MAX_RETRIES", 3))
+
+
+class LLMGateway:
+    """Process-wide access to the Anthropic API over pooled clients.
+
+    The sync and async clients are created once, on first use, and reused by
+    every call so connections and TLS sessions stay warm. Retries with
+    backoff (honouring retry-after) and timeouts are handled by the SDK using
+    the configured policy. Every call is recorded with its latency,
+    time-to-first-token when streaming, and token usage.
+    """
+
+    def __init__(self, api_key: str = None, timeout: float = DEFAULT_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, client: anthropic.Anthropic = None,
+                 async_client: anthropic.AsyncAnthropic = None, history: int = 1000):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = client
+        self._async_client = async_client
+        self.lock = threading.Lock()
+        self.totals = {"calls": 0, "errors": 0, "input_tokens": 0, "output_tokens": 0, "seconds": 0.0}
+        self.calls = deque(maxlen=history)
+
+    @property
+    def client(self) -> anthropic.Anthropic:
+        with self.lock:
+            if self._client is None:
+                self._client = anthropic.Anthropic(
+                    api_key=self.api_key or os.environ.get("ANTHROPIC_API_KEY"),
+                    timeout=self.timeout,
+                    max_retries=self.max_retries,
+                )
+            return self._client
+
+    @property
+    def async_client(self) -> anthropic.AsyncAnthropic:
+        with self.lock:
+            if self._async_client is None:
+                self._async_client = anthropic.AsyncAnthropic(
+                    api_key=self.api_key or os.environ.get("ANTHROPIC_API_KEY"),
+                    timeout=self.timeout,
+                    max_retries=self.max_retries,
+                )
+            return self._async_client
+
+    def _record(self, model: str, start: float, first_token: Optional[float] = None,
+                usage: Any = None, error: Exception = None) -> Dict[str, Any]:
+        seconds = time.monotonic() - start
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        call = {
+            "model": model,
+            "seconds": seconds,
+            "time_to_first_token": first_token - start if first_token else None,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "tokens_per_second": output_tokens / seconds if seconds > 0 else 0.0,
+            "error": type(error).__name__ if error else None,
+        }
+        with self.lock:
+            self.calls.append(call)
+            self.totals["calls"] += 1
+            self.totals["errors"] += error is not None
+            self.totals["input_tokens"] += input_tokens
+            self.totals["output_tokens"] += output_tokens
+            self.totals["seconds"] += seconds
+        REQUEST_SECONDS.observe(seconds, model=model, outcome=call["error"] or "ok")
+        TIME_TO_FIRST_TOKEN.observe(call["time_to_first_token"], model=model)
+        if error is None:
+            TOKENS_PER_SECOND.observe(call["tokens_per_second"], model=model)
+            TOKENS.inc(input_tokens, model=model, direction="input")
+            TOKENS.inc(output_tokens, model=model, direction="output")
+        logger.debug(f"LLM call: {call}")
+        return call
+
+    @staticmethod
+    def _request(prompt: str, system: str, model: str, max_tokens: int) -> Dict[str, Any]:
+        return {
+            "model": model,
+            "max_tokens": max_tokens,
+            "system": system,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+    def complete(self, prompt: str, system: str, model: str = DEFAULT_MODEL, max_tokens: int = 2048) -> str:
+        """Return the whole completion for `prompt`. API errors are raised."""
+        start = time.monotonic()
+        try:
+            response = self.client.messages.create(**self._request(prompt, system, model, max_tokens))
+        except Exception as e:
+            self._record(model, start, error=e)
+            raise
+        self._record(model, start, usage=response.usage)
+        return "".join(block.text for block in response.content if block.type == "text")
+
+    def stream(self, prompt: str, system: str, model: str = DEFAULT_MODEL,
+               max_tokens: int = 2048) -> Generator[str, None, None]:
+        """Yield completion text as it streams. API errors are raised."""
+        start = time.monotonic()
+        first_token = None
+        try:
+            with self.client.messages.stream(**self._request(prompt, system, model, max_tokens)) as stream:
+                for text in stream.text_stream:
+                    if first_token is None:
+                        first_token = time.monotonic()
+                    yield text
+                usage = stream.get_final_message().usage
+        except Exception as e:
+            self._record(model, start, first_token, error=e)
+            raise
+        self._record(model, start, first_token, usage=usage)
+
+    async def acomplete(self, prompt: str, system: str, model: str = DEFAULT_MODEL,
+                        max_tokens: int = 2048) -> anthropic.types.Message:
+        """Return the full response message for `prompt`. API errors are raised."""
+        start = time.monotonic()
+        try:
+            response = await self.async_client.messages.create(**self._request(prompt, system, model, max_tokens))
+        except Exception as e:
+            self._record(model, start, error=e)
+            raise
+        self._record(model, start, usage=response.usage)
+        return response
+
+    async def astream(self, prompt: str, system: str, model: str = DEFAULT_MODEL,
+                      max_tokens: int = 2048) -> AsyncGenerator[str, None]:
+        """Async version of stream."""
+        start = time.monotonic()
+        first_token = None
+        try:
+            async with self.async_client.messages.stream(**self._request(prompt, system, model, max_tokens)) as stream:
+                async for text in stream.text_stream:
+                    if first_token is None:
+                        first_token = time.monotonic()
+                    yield text
+                usage = (await stream.get_final_message()).usage
+        except Exception as e:
+            self._record(model, start, first_token, error=e)
+            raise
+        self._record(model, start, first_token, usage=usage)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """Return the process-wide gateway, creating it on first use."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
@@ -5,6 +5,7 @@ import os
 import sys
 import urllib3
 import ssl
+from video_jobs import VideoJobManager, COMPLETED
 
 # Disable SSL warnings
 from urllib3.exceptions import InsecureRequestWarning
@@ -13,35 +14,16 @@ urllib3.disable_warnings(InsecureRequestWarning)
 def generate_video(artifact_id, prompt):
     print(f"Starting video generation for artifact {artifact_id}")
     print(f"Prompt: {prompt}")
-    client = LumaAI()
-    
-    print("Initiating generation request...")
-    generation = client.generations.create(
-        aspect_ratio="16:9",
-        loop=True,
-        prompt=prompt,
-    )
-    print(f"Generation started with ID: {generation.id}")
-    
-    completed = False
-    while not completed:
-        generation = client.generations.get(id=generation.id)
-        print(f"Generation status: {generation.state}")
-        if generation.state == "completed":
-            completed = True
-        elif generation.state == "failed":
-            raise RuntimeError(f"Generation failed: {generation.failure_reason}")
-        time.sleep(3)
 
-    print("Generation completed! Downloading video...")
-    video_url = generation.assets.video
+    # Job state is persisted under videos/jobs, so a rerun for the same
+    # artifact resumes its existing generation instead of starting a new one
+    manager = VideoJobManager(client=LumaAI())
+    job = manager.generate(artifact_id, prompt)
+    manager.shutdown()
 
-    # download the video
-    response = requests.get(video_url, stream=True)
-    output_path = f'videos/{artifact_id}.mp4'
-    with open(output_path, 'wb') as file:
-        file.write(response.content)
-    print(f"Video downloaded successfully to: {output_path}")
+    if job["state"] != COMPLETED:
+        raise RuntimeError(f"Generation failed: {job.get('error')}")
+    print(f"Video downloaded successfully to: {manager.video_path(artifact_id)}")
 
 if __name__ == "__main__":
     if len(sys.argv) != 3:
@@ -50,4 +32,4 @@ if __name__ == "__main__":
         
     artifact_id = sys.argv[1]
     prompt = sys.argv[2]
-    generate_video(artifact_id, prompt)
\ No newline at end of file
+    generate_video(artifact_id, prompt)
@@ -0,0 +1,234 @@
+import os
+import re
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+# Rough token budget for the artifact part of a summary prompt
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", 400))
+
+# Values the CDLI export uses for "nothing here"
+PLACEHOLDERS = {"", "nan", "none", "null", "n/a", "?", "-", "0", "0.0", "00.00.00.00", "no date"}
+
+DIMENSION_FIELDS = ["height", "width", "thickness"]
+
+
+class FieldRule:
+    """How one artifact column is rendered in the prompt.
+
+    Args:
+        label: Name shown to the model
+        priority: Fields are ranked by this, highest first, and dropped lowest first
+            when the prompt is over budget
+        kind: "text", "list" (";"-separated values, deduplicated), "flag" (shown
+            only when true) or "number"
+        unit: Appended to numbers
+        uncertain: Flag column that marks this value as uncertain
+        max_tokens: Longer values are truncated
+    """
+
+    def __init__(self, label: str, priority: int, kind: str = "text", unit: str = "",
+                 uncertain: Optional[str] = None, max_tokens: int = 60):
+        self.label = label
+        self.priority = priority
+        self.kind = kind
+        self.unit = unit
+        self.uncertain = uncertain
+        self.max_tokens = max_tokens
+
+
+FIELD_RULES: Dict[str, FieldRule] = {
+    "designation": FieldRule("Designation", 100),
+    "artifact_type": FieldRule("Type", 95, uncertain="is_artifact_type_uncertain"),
+    "period": FieldRule("Period", 95, uncertain="is_period_uncertain"),
+    "provenience": FieldRule("Provenience", 90, uncertain="is_provenience_uncertain"),
+    "genres": FieldRule("Genre", 90, "list", uncertain="genres_uncertain"),
+    "genres_comment": FieldRule("Genre notes", 85, "list"),
+    "languages": FieldRule("Language", 85, "list", uncertain="languages_uncertain"),
+    "materials": FieldRule("Material", 85, "list", uncertain="materials_uncertain"),
+    "dimensions": FieldRule("Size (h x w x t)", 80, "number", unit="mm"),
+    # Added from the parsed inscription corpus, see inscription_parser.py
+    "inscription": FieldRule("Inscription", 78, max_tokens=150),
+    "written_in": FieldRule("Written in", 75),
+    "archive": FieldRule("Archive", 75),
+    "artifact_comments": FieldRule("Comments", 70, max_tokens=120),
+    "cdli_comments": FieldRule("CDLI comments", 70, max_tokens=120),
+    "is_school_text": FieldRule("School text", 70, "flag"),
+    "is_artifact_fake": FieldRule("Forgery", 70, "flag"),
+    "dates": FieldRule("Dates", 65, "list"),
+    "alternative_years": FieldRule("Alternative years", 60, "list"),
+    "condition_description": FieldRule("Condition", 60),
+    "artifact_preservation": FieldRule("Preservation", 60),
+    "surface_preservation": FieldRule("Surface preservation", 55),
+    "has_fragments": FieldRule("Has fragments", 55, "flag"),
+    "materials_aspect": FieldRule("Material aspect", 55, "list"),
+    "materials_color": FieldRule("Material color", 55, "list"),
+    "seal_information": FieldRule("Seal", 50),
+    "weight": FieldRule("Weight", 50, "number", unit="g"),
+    "period_comments": FieldRule("Period notes", 50),
+    "provenience_comments": FieldRule("Provenience notes", 50),
+    "artifact_type_comments": FieldRule("Type notes", 50),
+    "collections": FieldRule("Collection", 45, "list"),
+    "museum_no": FieldRule("Museum no.", 40),
+    "excavation_no": FieldRule("Excavation no.", 35),
+    "findspot_square": FieldRule("Findspot", 35),
+    "findspot_comments": FieldRule("Findspot notes", 30, max_tokens=80),
+    "stratigraphic_level": FieldRule("Stratigraphic level", 30),
+    "elevation": FieldRule("Elevation", 25, "number", unit="m"),
+    "publications_comment": FieldRule("Publication notes", 20, "list", max_tokens=80),
+    "publications_exact_ref": FieldRule("Published in", 15, "list"),
+    "external_resources": FieldRule("External resources", 10, "list"),
+}
+
+# Identifiers and bookkeeping the summary cannot use. Columns that are
+# neither ruled nor excluded are rendered as text with the lowest priority.
+EXCLUDED_FIELDS = {
+    "artifact_id", "composite_no", "seal_no", "composites", "seals", "accession_no",
+    "publications_key", "publications_type", "external_resources_key", "retired", "retired_comments",
+    "redirect_artifact_id",
+    # Folded into the field they qualify
+    "is_provenience_uncertain", "is_period_uncertain", "is_artifact_type_uncertain",
+    "genres_uncertain", "languages_uncertain", "materials_uncertain",
+    # Rendered together as "dimensions"
+    *DIMENSION_FIELDS,
+}
+DEFAULT_RULE = FieldRule("", 5)
+
+TOKEN_PIECE = re.compile(r"[^\W\d_]+|\d+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count: about 4 letters or 3 digits per token, one per punctuation mark.
+
+    Close enough to the real tokenizer to budget prompts without a network call.
+    """
+    total = 0
+    for piece in TOKEN_PIECE.findall(text):
+        if piece.isdigit():
+            total += math.ceil(len(piece) / 3)
+        elif piece[0].isalpha():
+            total += math.ceil(len(piece) / 4)
+        else:
+            total += 1
+    return total
+
+
+def _is_missing(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    try:
+        # pandas.NA and NaT
+        return bool(value != value)
+    except TypeError:
+        return True
+
+
+def _text(value: Any) -> str:
+    text = " ".join(str(value).split()).strip(" ;,")
+    return "" if text.lower() in PLACEHOLDERS else text
+
+
+def _number(value: Any) -> Optional[float]:
+    if _is_missing(value):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number and not math.isnan(number) else None
+
+
+def _flag(value: Any) -> bool:
+    if _is_missing(value):
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "1.0", "true", "yes")
+    return bool(value)
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    while words and estimate_tokens(" ".join(words)) + 1 > max_tokens:
+        words.pop()
+    return " ".join(words) + "…" if words else ""
+
+
+def render_value(rule: FieldRule, value: Any) -> str:
+    """The value as shown in the prompt, or "" when it carries no information."""
+    if rule.kind == "flag":
+        return "yes" if _flag(value) else ""
+    if rule.kind == "number":
+        number = _number(value)
+        return f"{number:g} {rule.unit}".strip() if number is not None else ""
+    if _is_missing(value):
+        return ""
+    if rule.kind == "list":
+        values, seen = [], set()
+        for part in str(value).split(";"):
+            part = _text(part)
+            if part and part.lower() not in seen:
+                seen.add(part.lower())
+                values.append(part)
+        return "; ".join(values)
+    return _text(value)
+
+
+def _dimensions(artifact: Dict[str, Any]) -> str:
+    numbers = [_number(artifact.get(field)) for field in DIMENSION_FIELDS]
+    if not any(numbers):
+        return ""
+    return " x ".join(f"{number:g}" if number else "?" for number in numbers) + " " + FIELD_RULES["dimensions"].unit
+
+
+def prompt_fields(artifact: Dict[str, Any]) -> List[Tuple[int, str, str]]:
+    """(priority, label, value) for every field worth showing, most important first."""
+    fields = []
+    dimensions = _dimensions(artifact)
+    if dimensions:
+        rule = FIELD_RULES["dimensions"]
+        fields.append((rule.priority, rule.label, dimensions))
+    for column, value in artifact.items():
+        if column in EXCLUDED_FIELDS:
+            continue
+        rule = FIELD_RULES.get(column)
+        if rule is None:
+            rule = DEFAULT_RULE
+            label = column.replace("_", " ").capitalize()
+        else:
+            label = rule.label
+        text = render_value(rule, value)
+        if not text:
+            continue
+        if rule.uncertain and _flag(artifact.get(rule.uncertain)):
+            text += " (uncertain)"
+        fields.append((rule.priority, label, _truncate(text, rule.max_tokens)))
+    fields.sort(key=lambda field: -field[0])
+    return fields
+
+
+def build_prompt(artifact: Dict[str, Any], token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """Compact prompt describing an artifact, within roughly `token_budget` tokens.
+
+    Empty and placeholder values are left out, ";"-lists are deduplicated and
+    fields are listed by importance. Fields that do not fit the budget are
+    dropped from the least important up; a field that only partly fits is
+    truncated if enough of it would remain to be useful.
+    """
+    header = "# Artifact\n"
+    used = estimate_tokens(header)
+    lines = []
+    for _, label, value in prompt_fields(artifact):
+        line = f"{label}: {value}"
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            remaining = token_budget - used - estimate_tokens(label) - 2
+            if remaining < 8:
+                continue
+            line = f"{label}: {_truncate(value, remaining)}"
+            cost = estimate_tokens(line) + 1
+        lines.append(line)
+        used += cost
+    return header + "\n".join(lines) + "\n"
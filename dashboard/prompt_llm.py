@@ -3,6 +3,7 @@ import os
 import anthropic
 import logging
 from dotenv import load_dotenv
+from llm_gateway import get_gateway
 
 load_dotenv()
 
@@ -21,18 +22,12 @@ def prompt_llm(prompt: str) -> str:
         return ""
     
     try:
-        client = anthropic.Anthropic(
-            api_key=api_key
-        )
-        
-        response = client.messages.create(   model="claude-3-5-sonnet-20241022",
-            max_tokens=2048,
+        return get_gateway().complete(
+            prompt,
             system="Generate rich descriptions for videos of this tablet record",
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
+            model="claude-3-5-sonnet-20241022",
+            max_tokens=2048,
         )
-        return response.content[0].text
     except anthropic.APIConnectionError:
         logger.info("Network error when calling Anthropic API")
         return ""
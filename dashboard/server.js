@@ -1,9 +1,11 @@
 // server.js
 
 const express = require('express');
-const { spawn, exec } = require('child_process');
+const { spawn, exec, execFile } = require('child_process');
 const fs = require('fs');
+const net = require('net');
 const path = require('path');
+const zlib = require('zlib');
 const app = express();
 const videoCache = new Set(); // Track generated videos
 
@@ -84,7 +86,87 @@ conversationEmitter.on('error', (error) => {
 });
 
 
+// Page shards written by `python file_artifacts.py build`, reloaded when the manifest changes
+const artifactPagesDir = path.resolve(__dirname, process.env.ARTIFACT_PAGES || 'artifact_pages');
+let artifactPages = { mtimeMs: 0, manifest: null };
+
+function loadPageManifest() {
+  const manifestPath = path.join(artifactPagesDir, 'manifest.json');
+  try {
+      const { mtimeMs } = fs.statSync(manifestPath);
+      if (mtimeMs !== artifactPages.mtimeMs) {
+          artifactPages = { mtimeMs, manifest: JSON.parse(fs.readFileSync(manifestPath, 'utf8')) };
+      }
+  } catch (err) {
+      artifactPages = { mtimeMs: 0, manifest: null };
+  }
+  return artifactPages.manifest;
+}
+
+// Summary of the pages, e.g. to know how many there are before fetching /artifacts-data?page=N
+app.get('/artifacts-manifest', (req, res) => {
+  const manifest = loadPageManifest();
+  if (!manifest) {
+      res.status(404).json({ error: 'Artifact pages not built' });
+      return;
+  }
+  const { format, page_size, total, columns } = manifest;
+  res.json({ format, page_size, total, pages: manifest.pages.length, columns });
+});
+
+function sendArtifactPage(req, res, manifest) {
+  const number = Math.max(parseInt(req.query.page, 10) || 0, 0);
+  const page = manifest.pages[number];
+  if (!page) {
+      res.status(404).json({ error: `No page ${number}, there are ${manifest.pages.length}` });
+      return;
+  }
+
+  // Pages are stored compressed; clients that accept neither encoding get gzip decoded here
+  const encoding = req.acceptsEncodings(...manifest.encodings) || 'identity';
+  const stored = encoding === 'br' ? 'br' : 'gz';
+  const etag = `"${page.etag}-${encoding}"`;
+  res.set({
+      'Content-Type': `${manifest.content_type}; charset=utf-8`,
+      'Cache-Control': 'public, no-cache',
+      'Vary': 'Accept-Encoding',
+      'ETag': etag,
+      'X-Total-Count': String(manifest.total),
+      'X-Page-Count': String(manifest.pages.length),
+  });
+  if (req.get('If-None-Match') === etag) {
+      res.status(304).end();
+      return;
+  }
+
+  const filePath = path.join(artifactPagesDir, `${page.file}.${stored}`);
+  const stream = fs.createReadStream(filePath);
+  stream.on('error', (err) => {
+      console.error('Error reading artifact page:', err);
+      if (!res.headersSent) {
+          ['ETag', 'Content-Encoding', 'Content-Length'].forEach(header => res.removeHeader(header));
+          res.status(500).json({ error: 'Failed to read artifacts data' });
+      } else {
+          res.destroy(err);
+      }
+  });
+  if (encoding === 'identity') {
+      res.set('Content-Length', String(page.bytes));
+      stream.pipe(zlib.createGunzip()).pipe(res);
+      return;
+  }
+  res.set({ 'Content-Encoding': encoding, 'Content-Length': String(page[`${encoding}_bytes`]) });
+  stream.pipe(res);
+}
+
 app.get('/artifacts-data', (req, res) => {
+  const manifest = loadPageManifest();
+  if (manifest) {
+      sendArtifactPage(req, res, manifest);
+      return;
+  }
+
+  // Without built pages, the 100 rows in limited_artifacts.csv are parsed for every request
   const csvFilePath = path.join(__dirname, 'limited_artifacts.csv');
   console.log('Attempting to read:', csvFilePath);
   
@@ -141,6 +223,17 @@ app.get('/artifacts-data', (req, res) => {
 
 app.post('/prompt', (req, res) => {
     const prompt = req.body.prompt;
+    if (process.env.SUMMARY_WORKER_PORT) {
+        let response = '';
+        requestWorker({ prompt: String(prompt) }, (text) => { response += text; }, (code) => {
+            if (code !== 0) {
+                res.status(500).json({ error: 'An error occurred while processing the prompt' });
+                return;
+            }
+            res.json({ response: response.trim() });
+        });
+        return;
+    }
     exec(`python prompt_llm.py "${prompt}"`, (error, stdout, stderr) => {
         if (error) {
             console.error(`exec error: ${error}`);
@@ -151,6 +244,95 @@ app.post('/prompt', (req, res) => {
     });
 });
 
+// Faceted search over the artifact table, e.g.
+// /artifacts-search?period=Uruk%20III%20(ca.%203200-3000%20BC)&q=lexical&offset=0&limit=50
+const SEARCH_FACETS = ['period', 'provenience', 'artifact_type', 'genres', 'languages', 'materials', 'collections'];
+
+app.get('/artifacts-search', (req, res) => {
+    const filters = {};
+    SEARCH_FACETS.filter(facet => req.query[facet] !== undefined).forEach(facet => {
+        filters[facet] = [].concat(req.query[facet]).map(String);
+    });
+    const search = {
+        filters,
+        text: req.query.q ? String(req.query.q) : null,
+        prefix: req.query.prefix ? String(req.query.prefix) : null,
+        offset: Math.max(parseInt(req.query.offset, 10) || 0, 0),
+        limit: Math.min(Math.max(parseInt(req.query.limit, 10) || 50, 0), 500),
+    };
+
+    if (process.env.SUMMARY_WORKER_PORT) {
+        let result = null;
+        requestWorker({ search }, (frame) => { result = frame; }, (code) => {
+            if (code !== 0 || result === null) {
+                res.status(500).json({ error: 'Search failed' });
+                return;
+            }
+            res.json(result);
+        });
+        return;
+    }
+
+    // Without a worker the index is rebuilt for every request
+    const args = ['artifact_search.py', '--offset', String(search.offset), '--limit', String(search.limit)];
+    Object.entries(filters).forEach(([facet, values]) => {
+        values.forEach(value => args.push('--filter', `${facet}=${value}`));
+    });
+    if (search.text) args.push('--text', search.text);
+    if (search.prefix) args.push('--prefix', search.prefix);
+    execFile('python', args, { maxBuffer: 16 * 1024 * 1024 }, (error, stdout) => {
+        if (error) {
+            console.error(`Search error: ${error.message}`);
+            res.status(500).json({ error: 'Search failed' });
+            return;
+        }
+        res.json(JSON.parse(stdout));
+    });
+});
+
+// Artifacts most like the given one, from the index built by `python artifact_similarity.py build`
+app.get('/similar/:artifactId', (req, res) => {
+    const artifactId = String(req.params.artifactId);
+    const k = Math.min(Math.max(parseInt(req.query.k, 10) || 10, 1), 100);
+
+    if (process.env.SUMMARY_WORKER_PORT) {
+        let result = null;
+        requestWorker({ similar: { artifact_id: artifactId, k } }, (frame) => { result = frame; }, (code) => {
+            if (code !== 0 || result === null) {
+                res.status(404).json({ error: 'No similar artifacts found' });
+                return;
+            }
+            res.json(result);
+        });
+        return;
+    }
+
+    execFile('python', ['artifact_similarity.py', 'query', artifactId, '-k', String(k)], (error, stdout) => {
+        if (error) {
+            console.error(`Similarity error: ${error.message}`);
+            res.status(404).json({ error: 'No similar artifacts found' });
+            return;
+        }
+        res.json(JSON.parse(stdout));
+    });
+});
+
+// Queue depth, wait times and prefetch hit rate of the worker's job scheduler
+app.get('/scheduler-stats', (req, res) => {
+    if (!process.env.SUMMARY_WORKER_PORT) {
+        res.status(404).json({ error: 'Scheduler runs in the summary worker (SUMMARY_WORKER_PORT)' });
+        return;
+    }
+    let result = null;
+    requestWorker({ stats: true }, (frame) => { result = frame; }, (code) => {
+        if (code !== 0 || result === null) {
+            res.status(502).json({ error: 'Summary worker unavailable' });
+            return;
+        }
+        res.json(result);
+    });
+});
+
 // Endpoint to check if a video exists
 app.get('/check-video/:artifactId', (req, res) => {
   const videoPath = path.join(__dirname, 'videos', `${req.params.artifactId}.mp4`);
@@ -159,6 +341,59 @@ app.get('/check-video/:artifactId', (req, res) => {
   });
 });
 
+// Stream a summary from a one-off artifact_augmentation.py process
+function summarizeWithProcess(artifactId, onChunk, onClose) {
+  const pythonProcess = spawn('python', ['artifact_augmentation.py', artifactId]);
+
+  pythonProcess.stdout.on('data', (data) => onChunk(data.toString()));
+
+  pythonProcess.stderr.on('data', (data) => {
+      console.error(`Python Error: ${data}`);
+  });
+
+  pythonProcess.on('close', onClose);
+}
+
+// Stream a summary from the long-lived worker (python artifact_augmentation.py --serve)
+function summarizeWithWorker(artifactId, onChunk, onClose) {
+  requestWorker({ artifact_id: artifactId }, onChunk, onClose);
+}
+
+// Send one request to the worker and stream back its text frames
+function requestWorker(payload, onChunk, onClose) {
+  const socket = net.connect(Number(process.env.SUMMARY_WORKER_PORT), '127.0.0.1');
+  let buffered = '';
+  let code = 1;
+
+  socket.on('connect', () => {
+      socket.write(JSON.stringify(payload) + '\n');
+  });
+
+  socket.on('data', (data) => {
+      buffered += data.toString();
+      const lines = buffered.split('\n');
+      buffered = lines.pop();
+      lines.filter(line => line.trim()).forEach(line => {
+          const frame = JSON.parse(line);
+          if (frame.chunk !== undefined) {
+              onChunk(frame.chunk);
+          } else if (frame.result !== undefined) {
+              onChunk(frame.result);
+          } else if (frame.done) {
+              code = 0;
+          } else if (frame.error) {
+              console.error(`Summary worker error: ${frame.error}`);
+          }
+      });
+  });
+
+  socket.on('error', (error) => {
+      console.error(`Summary worker connection error: ${error.message}`);
+  });
+
+  socket.on('close', () => onClose(code));
+}
+
 app.post('/generate-summary', (req, res) => {
   const artifactId = String(req.body.artifactId);
   if (!artifactId) {
@@ -170,20 +405,29 @@ app.post('/generate-summary', (req, res) => {
   res.setHeader('Content-Type', 'text/plain');
   res.setHeader('Transfer-Encoding', 'chunked');
 
-  const pythonProcess = spawn('python', ['artifact_augmentation.py', artifactId]);
   let summary = '';
-
-  pythonProcess.stdout.on('data', (data) => {
-      const text = data.toString();
+  const onChunk = (text) => {
       summary += text;
       res.write(text); // Send the chunk immediately
-  });
-
-  pythonProcess.stderr.on('data', (data) => {
-      console.error(`Python Error: ${data}`);
-  });
+  };
+
+  if (process.env.SUMMARY_WORKER_PORT) {
+      summarizeWithWorker(artifactId, onChunk, (code) => {
+          if (code === 0) {
+              // The worker's scheduler runs this ahead of its prefetch work and
+              // answers at once when the video already exists
+              requestWorker({ video: { artifact_id: artifactId, prompt: summary } }, () => {}, (videoCode) => {
+                  if (videoCode === 0) {
+                      videoCache.add(artifactId);
+                  }
+              });
+          }
+          res.end();
+      });
+      return;
+  }
 
-  pythonProcess.on('close', async (code) => {
+  summarizeWithProcess(artifactId, onChunk, async (code) => {
       if (code === 0) {
           // Only start video generation after summary is complete
           const videoPath = path.join(__dirname, 'videos', `${artifactId}.mp4`);
@@ -235,6 +479,25 @@ app.get('/videos/:artifactId', (req, res) => {
   res.sendFile(videoPath);
 });
 
+// Serve narration pre-rendered by batch_narration.py
+app.get('/narration/:artifactId', (req, res) => {
+  const artifactId = req.params.artifactId;
+  const narrationDir = path.resolve(__dirname, process.env.NARRATION_DIR || 'narration');
+  const narrationPath = path.resolve(narrationDir, `${artifactId}.mp3`);
+  // The route param is already URL-decoded, so "..%2F" would otherwise leave the directory
+  if (!/^[\w.-]+$/.test(artifactId) || artifactId.includes('..') || path.dirname(narrationPath) !== narrationDir) {
+      res.status(400).json({ error: 'Invalid artifact ID' });
+      return;
+  }
+  fs.access(narrationPath, fs.constants.F_OK, (err) => {
+      if (err) {
+          res.status(404).json({ error: 'Narration not found' });
+          return;
+      }
+      res.sendFile(narrationPath);
+  });
+});
+
 // Add this near your other routes
 app.get('/health', (req, res) => {
   res.status(200).send('OK');
@@ -0,0 +1,203 @@
+import os
+import re
+import time
+import uuid
+import fcntl
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Written after the last chunk; a spool without it belongs to a stream that died
+END = "\x00"
+
+
+class SingleFlight:
+    """Cross-process single-flight coordination using lock files.
+
+    Work is keyed by a name such as an artifact ID or a prompt hash. The first
+    caller to take the key's flock becomes the leader; concurrent callers in
+    this or any other process attach to its work instead of repeating it.
+    flock locks belong to open file descriptions, so threads of one process
+    coordinate the same way separate processes do, and a crashed leader's lock
+    is released by the kernel.
+
+    For streamed text the leader starts a producer thread that writes every
+    chunk to a spool file named by a token stored in the lock file, and its
+    caller tails that spool just as followers do. The stream is thus
+    finished for everyone even if the leader's own caller stops reading
+    early. An end marker tells followers the stream finished rather than
+    died; the spool is removed once the producer stops either way.
+    """
+
+    def __init__(self, directory: str = "locks", poll_interval: float = 0.05):
+        self.directory = directory
+        self.poll_interval = poll_interval
+
+    def _base(self, key: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9._-]", "_", key))
+
+    @contextmanager
+    def hold(self, key: str):
+        """Hold the key's lock exclusively, waiting for any in-flight holder to finish."""
+        with open(f"{self._base(key)}.lock", "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _is_locked(self, lock_path: str) -> bool:
+        with open(lock_path, "a+") as probe:
+            try:
+                fcntl.flock(probe, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(probe, fcntl.LOCK_UN)
+            return False
+
+    def stream(self, key: str, produce: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """Yield the text stream for `key`, producing it only if nobody else is.
+
+        Args:
+            key: Name identifying the work
+            produce: Called by the leader to create the stream
+
+        Yields:
+            The leader's chunks, to leader and followers alike
+        """
+        base = self._base(key)
+        lock_path = f"{base}.lock"
+        while True:
+            lock_file = open(lock_path, "a+")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                followed = yield from self._follow(base, lock_path)
+                if followed:
+                    return
+                # The leader died before producing anything, take over
+                continue
+
+            # The producer thread releases the lock once the stream ends
+            yield from self._lead(base, lock_file, produce)
+            return
+
+    def _lead(self, base: str, lock_file, produce: Callable[[], Iterator[str]]) -> Iterator[str]:
+        try:
+            lock_file.seek(0)
+            previous = lock_file.read().strip()
+            if previous:
+                # Left behind by a leader that was killed before it could clean up
+                try:
+                    os.remove(f"{base}.{previous}.spool")
+                except FileNotFoundError:
+                    pass
+
+            token = uuid.uuid4().hex
+            spool_path = f"{base}.{token}.spool"
+            spool = open(spool_path, "w", encoding="utf-8")
+            reader = open(spool_path, encoding="utf-8")
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(token)
+            lock_file.flush()
+        except BaseException:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+            raise
+
+        written = threading.Event()
+        errors = []
+
+        def run():
+            try:
+                with spool:
+                    for chunk in produce():
+                        spool.write(chunk)
+                        spool.flush()
+                        written.set()
+                    spool.write(END)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                # Followers that opened the spool keep reading it after the unlink
+                os.remove(spool_path)
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+                written.set()
+
+        # Not a daemon, so a caller that exits early still finishes the stream for its followers
+        producer = threading.Thread(target=run, name=f"single-flight-{os.path.basename(base)}")
+        producer.start()
+
+        def wait():
+            written.wait(self.poll_interval)
+            written.clear()
+
+        with reader:
+            finished, _ = yield from self._tail(reader, producer.is_alive, wait)
+        if not finished:
+            raise errors[0] if errors else RuntimeError(f"Stream {os.path.basename(base)} stopped before finishing")
+
+    def _tail(self, spool, running: Callable[[], bool], wait: Callable[[], None]):
+        """Yield the spool's text as it is written, until its end marker or until the writer stops.
+
+        Returns:
+            Whether the end marker was reached, and whether any text was yielded
+        """
+        yielded = False
+        while True:
+            text = spool.read()
+            stopped = False
+            if not text:
+                if running():
+                    wait()
+                    continue
+                # Whatever was written before the writer stopped
+                text = spool.read()
+                stopped = True
+            finished = text.endswith(END)
+            if finished:
+                text = text[:-len(END)]
+            if text:
+                yielded = True
+                yield text
+            if finished or stopped:
+                return finished, yielded
+
+    def _follow(self, base: str, lock_path: str):
+        """Tail the leader's spool until its end marker.
+
+        Returns:
+            False if the leader stopped before writing anything, so the caller can take over
+
+        Raises:
+            RuntimeError: If the leader stopped partway, leaving the follower a truncated stream
+        """
+        while True:
+            with open(lock_path) as f:
+                token = f.read().strip()
+            spool_path = f"{base}.{token}.spool"
+            try:
+                spool = open(spool_path, encoding="utf-8")
+            except FileNotFoundError:
+                # Not started yet, or finished (or failed) before we could attach
+                if not self._is_locked(lock_path):
+                    return False
+                time.sleep(self.poll_interval)
+                continue
+
+            logger.info(f"Attaching to in-flight stream {os.path.basename(base)}")
+            with spool:
+                finished, yielded = yield from self._tail(spool, lambda: self._is_locked(lock_path),
+                                                          lambda: time.sleep(self.poll_interval))
+            if finished:
+                return True
+            if not yielded:
+                return False
+            raise RuntimeError(f"Leader of {os.path.basename(base)} stopped before finishing")
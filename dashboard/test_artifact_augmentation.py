@@ -0,0 +1,78 @@
+import os
+import json
+import socket
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+import artifact_augmentation
+from artifact_augmentation import SummaryWorker
+from job_scheduler import JobScheduler
+from llm_gateway import LLMGateway
+from single_flight import SingleFlight
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "limited_artifacts.csv")
+
+class TestWorkerSummaries(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.client = MagicMock()
+        # No summary cache, and spools in the temporary directory rather than locks/
+        defaults = patch.object(artifact_augmentation.analyze_artifact, "__defaults__",
+                                (None, SingleFlight(self.tmpdir.name)))
+        gateway = patch("artifact_augmentation.get_gateway", return_value=LLMGateway(client=self.client))
+        api_key = patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test"})
+        for patcher in (defaults, gateway, api_key):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.worker = SummaryWorker(("127.0.0.1", 0), SEED_CSV, scheduler=JobScheduler(max_workers=1),
+                                    prefetch_radius=0)
+        threading.Thread(target=self.worker.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.worker.shutdown()
+        self.worker.server_close()
+        self.tmpdir.cleanup()
+
+    def stream(self, text_stream):
+        stream = MagicMock()
+        stream.__enter__.return_value.text_stream = text_stream
+        stream.__enter__.return_value.get_final_message.return_value = SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=50, output_tokens=2))
+        self.client.messages.stream.return_value = stream
+
+    def request(self, line: bytes) -> list:
+        with socket.create_connection(self.worker.server_address) as conn:
+            conn.sendall(line)
+            with conn.makefile() as f:
+                return [json.loads(frame) for frame in f]
+
+    def test_summary_is_streamed_then_done(self):
+        self.stream(iter(["This artifact is ", "a lexical tablet."]))
+        frames = self.request(b'{"artifact_id": "1.0"}\n')
+        self.assertEqual(frames[-1], {"done": True})
+        self.assertEqual("".join(frame["chunk"] for frame in frames[:-1]), "This artifact is a lexical tablet.")
+        prompt = self.client.messages.stream.call_args.kwargs["messages"][0]["content"]
+        self.assertIn("CDLI Lexical 000002, ex. 065", prompt)
+
+    def test_unknown_artifact_and_malformed_request(self):
+        self.assertEqual(self.request(b'{"artifact_id": "missing"}\n'),
+                         [{"error": "No artifact found with ID: missing"}])
+        self.assertEqual(self.request(b'{"artifact_id": \n'), [{"error": "Malformed request"}])
+        self.client.messages.stream.assert_not_called()
+
+    def test_stream_cut_short_ends_in_an_error(self):
+        def chunks():
+            yield "This artifact is "
+            raise ConnectionError("Connection reset")
+
+        self.stream(chunks())
+        frames = self.request(b'{"artifact_id": "1.0"}\n')
+        self.assertEqual(frames[0], {"chunk": "This artifact is "})
+        self.assertEqual(len(frames), 2)
+        self.assertTrue(frames[1]["error"].startswith("Summary failed"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import threading
+import unittest
+import pandas as pd
+import pyarrow.parquet as pq
+from http.server import ThreadingHTTPServer
+from unittest.mock import patch
+from artifact_augmentation import load_artifact, load_artifact_table
+from artifact_parquet import ArtifactParquetWriter, iter_parquet_artifacts, read_parquet_artifacts, read_parquet_range
+from artifact_schema import read_artifacts
+from cdli_api_scraper import CDLIAPIScraper
+from file_artifacts import load_limited_artifacts
+from test_cdli_api_scraper import PaginatedCSVHandler
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "limited_artifacts.csv")
+
+class TestParquetExport(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), PaginatedCSVHandler)
+        self.server.requested_pages = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.base_url = f"http://{host}:{port}"
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_export_writes_one_row_group_per_page(self):
+        csv_path = os.path.join(self.tmpdir.name, "artifacts.csv")
+        parquet_path = os.path.join(self.tmpdir.name, "artifacts.parquet")
+        CDLIAPIScraper(base_url=self.base_url).export_all_artifacts(csv_path)
+        total = CDLIAPIScraper(base_url=self.base_url).export_all_artifacts(parquet_path, max_workers=3)
+
+        self.assertEqual(total, 21)
+        self.assertEqual(pq.ParquetFile(parquet_path).num_row_groups, 7)
+        from_csv = pd.read_csv(csv_path, dtype=str)
+        from_parquet = read_parquet_artifacts(parquet_path)
+        self.assertEqual(list(from_parquet["artifact_id"]), list(from_csv["artifact_id"]))
+        self.assertEqual(list(from_parquet["designation"]), list(from_csv["designation"]))
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ["artifacts.csv", "artifacts.parquet"])
+
+    def test_interrupted_export_resumes(self):
+        parquet_path = os.path.join(self.tmpdir.name, "artifacts.parquet")
+        scraper = CDLIAPIScraper(base_url=self.base_url)
+        real_pages = scraper.iter_artifact_pages
+
+        def interrupted(*args, **kwargs):
+            for page, df in real_pages(*args, **kwargs):
+                if page == 3:
+                    raise KeyboardInterrupt
+                yield page, df
+
+        with patch.object(scraper, "iter_artifact_pages", side_effect=interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                scraper.export_all_artifacts(parquet_path)
+        self.assertFalse(os.path.exists(parquet_path))
+
+        self.server.requested_pages.clear()
+        total = CDLIAPIScraper(base_url=self.base_url).export_all_artifacts(parquet_path)
+        self.assertEqual(total, 21)
+        self.assertEqual(min(self.server.requested_pages), 3)
+        self.assertEqual(list(read_parquet_artifacts(parquet_path)["artifact_id"]), [str(i) for i in range(1, 22)])
+
+class TestParquetLoaders(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "artifacts.parquet")
+        df = read_artifacts(SEED_CSV)
+        # Pages of 30 rows, the last one missing a column to check it is conformed
+        with ArtifactParquetWriter(self.path) as writer:
+            for start in range(0, 90, 30):
+                writer.write(df.iloc[start:start + 30])
+            writer.write(df.iloc[90:].drop(columns=["seals"]))
+        self.csv = df
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_dtypes_match_csv_schema(self):
+        df = read_parquet_artifacts(self.path)
+        for column in ["artifact_id", "period", "retired", "height", "redirect_artifact_id", "museum_no"]:
+            self.assertEqual(str(df[column].dtype), str(self.csv[column].dtype), column)
+        self.assertEqual(df["artifact_id"].iloc[0], "1.0")
+
+    def test_projection_and_filters(self):
+        df = read_parquet_artifacts(self.path, columns=["artifact_id", "period"],
+                                    filters=[("period", "==", "Uruk IV (ca. 3350-3200 BC)")])
+        self.assertEqual(list(df.columns), ["artifact_id", "period"])
+        expected = self.csv[self.csv["period"] == "Uruk IV (ca. 3350-3200 BC)"]["artifact_id"]
+        self.assertEqual(list(df["artifact_id"]), list(expected))
+
+    def test_range_reads_and_iteration(self):
+        df = read_parquet_range(self.path, offset=25, limit=10, columns=["artifact_id"])
+        self.assertEqual(list(df["artifact_id"]), list(self.csv["artifact_id"][25:35]))
+        self.assertTrue(read_parquet_range(self.path, offset=500, limit=10).empty)
+
+        chunks = list(iter_parquet_artifacts(self.path, chunksize=40, columns=["artifact_id"]))
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 100)
+
+    def test_loaders_accept_parquet(self):
+        artifact = load_artifact(self.path, "42.0")
+        self.assertEqual(artifact.iloc[0]["designation"],
+                         self.csv[self.csv["artifact_id"] == "42.0"].iloc[0]["designation"])
+        self.assertEqual(str(artifact.iloc[0].to_dict()), str(load_artifact(SEED_CSV, "42.0").iloc[0].to_dict()))
+        self.assertIn("42.0", load_artifact_table(self.path, columns=["designation"]).index)
+
+        cwd = os.getcwd()
+        os.chdir(self.tmpdir.name)
+        try:
+            limited = load_limited_artifacts(self.path, limit=3, offset=95)
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(list(limited["artifact_id"]), list(self.csv["artifact_id"][95:98]))
+
+if __name__ == '__main__':
+    unittest.main()
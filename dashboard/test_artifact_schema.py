@@ -0,0 +1,63 @@
+import io
+import os
+import tempfile
+import unittest
+from artifact_schema import read_artifacts, apply_schema
+from artifact_store import ArtifactStore, build_artifact_store
+from artifact_augmentation import load_artifact
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "limited_artifacts.csv")
+
+class TestArtifactSchema(unittest.TestCase):
+    def test_dtypes(self):
+        df = read_artifacts(SEED_CSV)
+        self.assertEqual(df['artifact_id'].iloc[0], '1.0')
+        self.assertEqual(str(df['period'].dtype), 'category')
+        self.assertEqual(str(df['materials'].dtype), 'category')
+        self.assertEqual(str(df['retired'].dtype), 'boolean')
+        self.assertFalse(df['is_school_text'].any())
+        self.assertEqual(str(df['height'].dtype), 'float64')
+        self.assertEqual(str(df['redirect_artifact_id'].dtype), 'Int64')
+        self.assertEqual(df['museum_no'].dtype, object)
+
+    def test_column_subset(self):
+        df = read_artifacts(SEED_CSV, columns=['artifact_id', 'period'])
+        self.assertEqual(list(df.columns), ['artifact_id', 'period'])
+
+        # artifact_id is always loaded so the lookup can filter on it
+        artifact = load_artifact(SEED_CSV, '3.0', columns=['designation'])
+        self.assertEqual(sorted(artifact.columns), ['artifact_id', 'designation'])
+        self.assertEqual(artifact.iloc[0]['designation'], 'ATU 3, pl. 081, W 9123,d')
+
+    def test_store_rows_match_csv_rows(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "artifacts.db")
+            build_artifact_store(SEED_CSV, db_path)
+            from_csv = load_artifact(SEED_CSV, '4.0').reset_index(drop=True)
+            with ArtifactStore(db_path) as store:
+                from_store = store.get('4.0')
+                self.assertEqual(list(store.get_range(0, 2, columns=['artifact_id', 'retired']).columns),
+                                 ['artifact_id', 'retired'])
+                with self.assertRaises(ValueError):
+                    store.get('4.0', columns=['artifact_id; DROP TABLE artifacts'])
+
+        self.assertEqual(from_store.dtypes.astype(str).to_dict(), from_csv.dtypes.astype(str).to_dict())
+        # Prompts built from either source must be identical to share the summary cache
+        self.assertEqual(str(from_store.iloc[0].to_dict()), str(from_csv.iloc[0].to_dict()))
+
+    def test_multi_valued_flags_and_exact_floats(self):
+        csv = "artifact_id,genres,genres_uncertain,languages_uncertain,retired,height\n" \
+              "1.0,Lexical;Literary,0;1,0; 0,0.0,12.3\n2.0,Lexical,1,,1.0,45.7\n"
+        df = read_artifacts(io.StringIO(csv))
+        self.assertEqual(list(df['genres_uncertain']), ['0;1', '1'])
+        self.assertEqual(df['languages_uncertain'].iloc[0], '0; 0')
+        self.assertEqual(list(df['retired']), [False, True])
+        record = df.iloc[0].to_dict()
+        self.assertEqual((record['height'], str(record['height'])), (12.3, '12.3'))
+
+    def test_apply_schema_leaves_unknown_columns(self):
+        df = apply_schema(read_artifacts(SEED_CSV, columns=['artifact_id']).assign(extra=1))
+        self.assertEqual(df['extra'].dtype, 'int64')
+
+if __name__ == '__main__':
+    unittest.main()
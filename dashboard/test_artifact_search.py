@@ -0,0 +1,101 @@
+import os
+import json
+import socket
+import tempfile
+import threading
+import unittest
+from artifact_augmentation import SummaryWorker
+from artifact_schema import read_artifacts
+from artifact_search import ArtifactIndex
+from artifact_store import build_artifact_store
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "limited_artifacts.csv")
+BERLIN = "Vorderasiatisches Museum, Berlin, Germany"
+BAGHDAD = "National Museum of Iraq, Baghdad, Iraq"
+URUK_IV = "Uruk IV (ca. 3350-3200 BC)"
+
+class TestArtifactIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = read_artifacts(SEED_CSV)
+        cls.index = ArtifactIndex(cls.df)
+
+    def expected(self, mask) -> list:
+        return list(self.df[mask]["artifact_id"])
+
+    def test_facet_filters_match_dataframe(self):
+        result = self.index.search({"period": URUK_IV}, limit=100)
+        self.assertEqual([a["artifact_id"] for a in result["artifacts"]], self.expected(self.df["period"] == URUK_IV))
+        self.assertEqual(result["total"], len(result["artifacts"]))
+
+        # Multi-valued fields are split, so an artifact held by both museums matches either
+        in_baghdad = self.df["collections"].astype(str).str.contains(BAGHDAD, regex=False)
+        result = self.index.search({"collections": [BAGHDAD]}, limit=100)
+        self.assertEqual([a["artifact_id"] for a in result["artifacts"]], self.expected(in_baghdad))
+
+        self.assertEqual(self.index.search({"period": "Ur III"})["total"], 0)
+        with self.assertRaises(ValueError):
+            self.index.search({"designation": "x"})
+
+    def test_facet_counts(self):
+        facets = self.index.search(limit=0)["facets"]
+        self.assertEqual(dict(facets["period"])[URUK_IV], int((self.df["period"] == URUK_IV).sum()))
+        self.assertEqual(sum(count for _, count in facets["collections"]), 102)
+
+        # A filtered facet still lists the values it excludes, other facets are narrowed
+        facets = self.index.search({"collections": BAGHDAD}, limit=0)["facets"]
+        self.assertEqual(dict(facets["collections"]), {BERLIN: 70, BAGHDAD: 32})
+        self.assertEqual(sum(count for _, count in facets["period"]), 32)
+
+    def test_text_and_prefix(self):
+        result = self.index.search(text="W 91")
+        self.assertEqual([a["designation"] for a in result["artifacts"]], ["ATU 3, pl. 081, W 9123,d"])
+        self.assertEqual(self.index.search(text="lexical 000002 ex")["total"],
+                         int(self.df["designation"].str.startswith("CDLI Lexical 000002, ex.").sum()))
+
+        result = self.index.search(prefix="vat 152")
+        self.assertEqual(sorted(a["museum_no"] for a in result["artifacts"]), ["VAT 15253", "VAT 15263"])
+        self.assertEqual(self.index.search(prefix="VAT", filters={"collections": BAGHDAD})["total"], 0)
+
+    def test_pagination(self):
+        everything = [a["artifact_id"] for a in self.index.search(limit=100)["artifacts"]]
+        self.assertEqual(everything, list(self.df["artifact_id"]))
+        page = self.index.search(offset=40, limit=15)
+        self.assertEqual([a["artifact_id"] for a in page["artifacts"]], everything[40:55])
+        self.assertEqual(page["total"], 100)
+        self.assertEqual(self.index.search(offset=200)["artifacts"], [])
+
+    def test_from_store_matches_csv(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "artifacts.db")
+            build_artifact_store(SEED_CSV, db_path)
+            from_store = ArtifactIndex.from_file(db_path).search({"genres": "Vocabularies"})
+        from_csv = ArtifactIndex.from_file(SEED_CSV).search({"genres": "Vocabularies"})
+        self.assertEqual(json.dumps(from_store), json.dumps(from_csv))
+
+class TestWorkerSearch(unittest.TestCase):
+    def request(self, payload) -> list:
+        with socket.create_connection(self.worker.server_address) as conn:
+            conn.sendall((json.dumps(payload) + "\n").encode())
+            with conn.makefile() as f:
+                return [json.loads(line) for line in f]
+
+    def setUp(self):
+        self.worker = SummaryWorker(("127.0.0.1", 0), SEED_CSV)
+        threading.Thread(target=self.worker.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.worker.shutdown()
+        self.worker.server_close()
+
+    def test_search_request(self):
+        frames = self.request({"search": {"filters": {"period": [URUK_IV]}, "limit": 2}})
+        self.assertEqual(frames[-1], {"done": True})
+        self.assertEqual(frames[0]["result"]["total"], 5)
+        self.assertEqual(len(frames[0]["result"]["artifacts"]), 2)
+
+        frames = self.request({"search": {"filters": {"museum": ["x"]}}})
+        self.assertIn("error", frames[0])
+
+if __name__ == '__main__':
+    unittest.main()
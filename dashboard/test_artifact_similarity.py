@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+import artifact_similarity
+from artifact_similarity import SimilarityIndex, artifact_vectors, build_similarity_index
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "limited_artifacts.csv")
+
+class TestArtifactVectors(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'artifact_id': ['1.0', '2.0', '3.0', '4.0'],
+            'designation': ['Lexical list ex. 1', 'Lexical list ex. 2', 'Royal inscription', 'Lexical list ex. 3'],
+            'genres': ['Lexical', 'Lexical', 'Royal/Monumental', 'Lexical;Vocabularies'],
+            'period': ['Uruk III', 'Uruk III', 'Ur III', 'Uruk III'],
+            'height': [30.0, 31.0, 120.0, None],
+            'width': [40.0, 41.0, 90.0, None],
+            'thickness': [10.0, 10.0, 30.0, None],
+        })
+
+    def test_vectors_are_unit_length_and_deterministic(self):
+        vectors = artifact_vectors(self.df, dimensions=32)
+        self.assertEqual(vectors.shape, (4, 35))
+        self.assertEqual(vectors.dtype, np.float32)
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1, rtol=1e-5)
+        np.testing.assert_array_equal(vectors, artifact_vectors(self.df, dimensions=32))
+
+    def test_shared_fields_and_size_score_higher(self):
+        vectors = artifact_vectors(self.df)
+        scores = vectors @ vectors[0]
+        self.assertGreater(scores[1], scores[3])
+        self.assertGreater(scores[3], scores[2])
+
+class TestSimilarityIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.count = build_similarity_index(SEED_CSV, cls.tmpdir.name, dimensions=64)
+        cls.index = SimilarityIndex(cls.tmpdir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_index_is_memory_mapped(self):
+        self.assertEqual(self.count, 100)
+        self.assertEqual(len(self.index), 100)
+        self.assertIsInstance(self.index.vectors, np.memmap)
+        with self.assertRaises(FileNotFoundError):
+            SimilarityIndex(os.path.join(self.tmpdir.name, "missing"))
+
+    def test_top_k_matches_brute_force(self):
+        vectors = np.asarray(self.index.vectors)
+        neighbours = self.index.similar('3.0', k=5)
+        self.assertEqual(len(neighbours), 5)
+        self.assertNotIn('3.0', [n['artifact_id'] for n in neighbours])
+
+        scores = vectors @ vectors[list(self.index.ids).index('3.0')]
+        expected = sorted(scores, reverse=True)[1:6]
+        np.testing.assert_allclose([n['score'] for n in neighbours], expected, atol=1e-4)
+        self.assertIsNone(self.index.similar('99999.0'))
+
+    def test_batches_span_blocks(self):
+        ids = ['1.0', '42.0', '100.0', 'missing']
+        whole = self.index.similar_many(ids, k=4)
+        with patch.object(artifact_similarity, "BLOCK_ROWS", 7):
+            blocked = self.index.similar_many(ids, k=4)
+        self.assertEqual(whole, blocked)
+        self.assertEqual(whole['missing'], [])
+        self.assertEqual(whole['42.0'], self.index.similar('42.0', k=4))
+
+if __name__ == '__main__':
+    unittest.main()
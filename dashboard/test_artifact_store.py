@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from artifact_store import ArtifactStore, build_artifact_store, is_store_path
+from artifact_augmentation import load_artifact
+from file_artifacts import load_limited_artifacts
+
+class TestArtifactStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmpdir.name, "artifacts.csv")
+        self.db_path = os.path.join(self.tmpdir.name, "artifacts.db")
+        pd.DataFrame({
+            'artifact_id': ['1.0', '2.0', '3.0', '4.0', '5.0'],
+            'designation': ['A', 'B', 'C', 'D', 'E'],
+            'period': ['Uruk III', 'Uruk III', 'Ur III', 'Ur III', None],
+        }).to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_build_and_lookup(self):
+        count = build_artifact_store(self.csv_path, self.db_path, chunksize=2)
+        self.assertEqual(count, 5)
+        with ArtifactStore(self.db_path) as store:
+            self.assertEqual(len(store), 5)
+            self.assertEqual(store.get_record('3.0')['designation'], 'C')
+            self.assertIsNone(store.get_record('99.0'))
+
+    def test_get_range_keeps_csv_order(self):
+        build_artifact_store(self.csv_path, self.db_path, chunksize=2)
+        with ArtifactStore(self.db_path) as store:
+            df = store.get_range(offset=1, limit=3)
+        self.assertEqual(list(df['artifact_id']), ['2.0', '3.0', '4.0'])
+
+    def test_neighbour_ids(self):
+        build_artifact_store(self.csv_path, self.db_path)
+        with ArtifactStore(self.db_path) as store:
+            self.assertEqual(store.neighbour_ids('1.0', radius=2), ['2.0', '3.0'])
+            self.assertEqual(store.neighbour_ids('3.0', radius=1), ['2.0', '4.0'])
+            self.assertEqual(store.neighbour_ids('99.0'), [])
+
+    def test_loaders_accept_store(self):
+        build_artifact_store(self.csv_path, self.db_path)
+        self.assertTrue(is_store_path(self.db_path))
+        self.assertFalse(is_store_path(self.csv_path))
+
+        from_store = load_artifact(self.db_path, '2.0')
+        from_csv = load_artifact(self.csv_path, '2.0')
+        self.assertEqual(from_store.iloc[0]['designation'], from_csv.iloc[0]['designation'])
+
+        cwd = os.getcwd()
+        os.chdir(self.tmpdir.name)
+        try:
+            limited = load_limited_artifacts(self.db_path, limit=2, offset=2)
+            self.assertEqual(list(limited['artifact_id']), ['3.0', '4.0'])
+            limited_csv = load_limited_artifacts(self.csv_path, limit=2, offset=2)
+            self.assertEqual(list(limited_csv['designation']), ['C', 'D'])
+        finally:
+            os.chdir(cwd)
+
+if __name__ == '__main__':
+    unittest.main()
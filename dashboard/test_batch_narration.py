@@ -0,0 +1,46 @@
+import os
+import json
+import tempfile
+import unittest
+from batch_narration import iter_summaries, narration_path, render_all
+
+class TestBatchNarration(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.summaries = os.path.join(self.tmpdir.name, "summaries.jsonl")
+        self.narration_dir = os.path.join(self.tmpdir.name, "narration")
+        with open(self.summaries, "w") as f:
+            f.write(json.dumps({"artifact_id": "1.0", "error": "overloaded"}) + "\n")
+            f.write(json.dumps({"artifact_id": "1.0", "summary": "This artifact is a tablet. It is clay."}) + "\n")
+            f.write(json.dumps({"artifact_id": "2.0", "summary": "This artifact is a seal."}) + "\n")
+            f.write('{"artifact_id": "3.0", "summ')
+        self.synthesized = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _synthesize(self, text, previous_text=None):
+        self.synthesized.append(text)
+        if "seal" in text:
+            raise RuntimeError("quota exceeded")
+        yield text.encode()
+
+    def test_iter_summaries_skips_errors_and_partial_lines(self):
+        records = list(iter_summaries(self.summaries))
+        self.assertEqual([r["artifact_id"] for r in records], ["1.0", "2.0"])
+        self.assertEqual(list(iter_summaries(self.summaries, ids={"2.0"}))[0]["artifact_id"], "2.0")
+
+    def test_render_all_writes_audio_and_skips_existing(self):
+        stats = render_all(iter_summaries(self.summaries), self._synthesize, self.narration_dir, concurrency=2)
+        self.assertEqual((stats["rendered"], stats["failed"], stats["skipped"]), (1, 1, 0))
+
+        with open(narration_path("1.0", self.narration_dir), "rb") as f:
+            self.assertEqual(f.read(), b"This artifact is a tablet.It is clay.")
+        # A failed render leaves nothing behind for the dashboard to serve
+        self.assertEqual(os.listdir(self.narration_dir), ["1.0.mp3"])
+
+        stats = render_all(iter_summaries(self.summaries), self._synthesize, self.narration_dir)
+        self.assertEqual((stats["rendered"], stats["skipped"]), (0, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import json
+import asyncio
+import tempfile
+import threading
+import unittest
+import anthropic
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from artifact_augmentation import SummaryWorker, artifact_prompt, default_inscriptions, summary_cache_key
+from batch_summaries import BatchSummarizer, completed_ids, iter_artifacts
+from content_store import ContentStore
+from inscription_parser import build_inscription_index
+from job_scheduler import JobScheduler
+from llm_gateway import LLMGateway
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "limited_artifacts.csv")
+
+ATF = """&P000001 = ATU 3, pl. 081, W 9123,d
+@tablet
+@obverse
+1. 1(N01) GAL~a [...]
+"""
+
+class FakeMessagesHandler(BaseHTTPRequestHandler):
+    """Stand-in for the Messages API that rate-limits the first request."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        if len(self.server.requests) == 1:
+            self._send(429, {"type": "error", "error": {"type": "rate_limit_error", "message": "slow down"}},
+                       {"retry-after": "0.2"})
+            return
+        prompt = body["messages"][0]["content"]
+        designation = prompt.split("Designation: ")[1].split("\n")[0]
+        self._send(200, {
+            "id": "msg_test",
+            "type": "message",
+            "role": "assistant",
+            "model": body["model"],
+            "content": [{"type": "text", "text": f"This artifact is {designation}."}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 100, "output_tokens": 8},
+        })
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestBatchSummarizer(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeMessagesHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.gateway = LLMGateway(async_client=anthropic.AsyncAnthropic(
+            api_key="test", base_url=f"http://{host}:{port}", max_retries=0))
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.tmpdir.name, "summaries.jsonl")
+        self.artifacts = [{"artifact_id": f"{i}.0", "designation": f"tablet {i}"} for i in range(1, 6)]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_batch_honours_retry_after_and_resumes(self):
+        summarizer = BatchSummarizer(self.gateway, concurrency=2)
+        result = asyncio.run(summarizer.run(self.artifacts[:3], self.output_path))
+        self.assertEqual(result["completed"], 3)
+        self.assertEqual(result["retries"], 1)
+        self.assertGreater(result["artifacts_per_minute"], 0)
+
+        with open(self.output_path) as f:
+            records = {r["artifact_id"]: r for r in map(json.loads, f)}
+        self.assertEqual(records["2.0"]["summary"], "This artifact is tablet 2.")
+        self.assertEqual(records["2.0"]["output_tokens"], 8)
+
+        # A rerun over the whole table only requests the two missing artifacts
+        summarizer = BatchSummarizer(self.gateway, concurrency=2)
+        result = asyncio.run(summarizer.run(self.artifacts, self.output_path))
+        self.assertEqual((result["completed"], result["skipped"]), (2, 3))
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertEqual(completed_ids(self.output_path), {a["artifact_id"] for a in self.artifacts})
+        # The gateway accounted for every call, including the rate-limited one
+        self.assertEqual(self.gateway.totals["calls"], 6)
+        self.assertEqual(self.gateway.totals["errors"], 1)
+        self.assertEqual(self.gateway.totals["output_tokens"], 40)
+
+    def test_resume_after_a_partly_written_line(self):
+        with open(self.output_path, "w") as f:
+            f.write(json.dumps({"artifact_id": "1.0", "summary": "This artifact is tablet 1."}) + "\n")
+            f.write('{"artifact_id": "2.0", "summ')
+
+        summarizer = BatchSummarizer(self.gateway, concurrency=2)
+        result = asyncio.run(summarizer.run(self.artifacts[:3], self.output_path))
+        self.assertEqual((result["completed"], result["skipped"]), (2, 1))
+        with open(self.output_path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(sorted(r["artifact_id"] for r in records), ["1.0", "2.0", "3.0"])
+
+    def test_bad_rows_fail_alone(self):
+        summarizer = BatchSummarizer(self.gateway, concurrency=2)
+        summarize = summarizer.summarize
+
+        async def summarize_or_fail(artifact):
+            if artifact["artifact_id"] == "2.0":
+                raise KeyError("designation")
+            return await summarize(artifact)
+
+        summarizer.summarize = summarize_or_fail
+        result = asyncio.run(asyncio.wait_for(summarizer.run(self.artifacts, self.output_path), 10))
+        self.assertEqual((result["completed"], result["failed"]), (4, 1))
+        with open(self.output_path) as f:
+            records = {r["artifact_id"]: r for r in map(json.loads, f)}
+        self.assertIn("KeyError", records["2.0"]["error"])
+
+    def test_dead_workers_fail_the_batch(self):
+        summarizer = BatchSummarizer(self.gateway, concurrency=2)
+
+        async def unwritable(artifact):
+            return {"artifact_id": artifact["artifact_id"], "summary": object()}
+
+        summarizer.summarize = unwritable
+        # More artifacts than the queue holds, which used to block the producer forever
+        with self.assertRaises(TypeError):
+            asyncio.run(asyncio.wait_for(summarizer.run(self.artifacts * 4, self.output_path), 10))
+
+    def test_batch_and_worker_share_cache_keys(self):
+        dump = os.path.join(self.tmpdir.name, "dump.atf")
+        with open(dump, "w") as f:
+            f.write(ATF)
+        index_dir = os.path.join(self.tmpdir.name, "inscription_index")
+        build_inscription_index(dump, index_dir, processes=1)
+        cache = ContentStore(os.path.join(self.tmpdir.name, "cache"), suffix=".txt")
+
+        # Both open the default index, as they do once `inscription_parser.py build` has been run
+        default_inscriptions.cache_clear()
+        self.addCleanup(default_inscriptions.cache_clear)
+        with patch("inscription_parser.INSCRIPTION_INDEX", index_dir):
+            worker = SummaryWorker(("127.0.0.1", 0), SEED_CSV, scheduler=JobScheduler(max_workers=1))
+            try:
+                artifact = worker.lookup("1.0")
+            finally:
+                worker.server_close()
+            summarizer = BatchSummarizer(self.gateway, cache=cache)
+            asyncio.run(summarizer.run(iter_artifacts(SEED_CSV, ids={"1.0"}), self.output_path))
+
+        self.assertTrue(artifact["inscription"].startswith("obverse: 1(N01) GAL~a"))
+        self.assertEqual(summarizer.stats["completed"], 1)
+        self.assertIn(summary_cache_key(artifact_prompt(artifact)), cache)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,18 @@ import unittest
 from unittest.mock import patch, Mock
 import pandas as pd
 import io
+import os
+import json
+import time
+import random
 import logging
-from cdli_api_scraper import CDLIAPIScraper
+import tempfile
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from cdli_api_scraper import CDLIAPIScraper, TokenBucket
+from http_cache import HTTPCache
 
 class TestCDLIAPIScraper(unittest.TestCase):
     def setUp(self):
@@ -76,7 +86,7 @@ class TestCDLIAPIScraper(unittest.TestCase):
     def test_get_tabular_export_csv(self, mock_get):
         self.logger.info("Running test_get_tabular_export_csv")
         mock_response = Mock()
-        mock_response.text = "id,type\nP000001,artifact"
+        mock_response.content = b"id,type\nP000001,artifact"
         mock_get.return_value = mock_response
 
         result = self.scraper.get_tabular_export(format="csv")
@@ -94,7 +104,7 @@ class TestCDLIAPIScraper(unittest.TestCase):
     def test_get_tabular_export_tsv(self, mock_get):
         self.logger.info("Running test_get_tabular_export_tsv")
         mock_response = Mock()
-        mock_response.text = "id\ttype\nP000001\tartifact"
+        mock_response.content = b"id\ttype\nP000001\tartifact"
         mock_get.return_value = mock_response
 
         result = self.scraper.get_tabular_export(format="tsv")
@@ -131,5 +141,219 @@ class TestCDLIAPIScraper(unittest.TestCase):
         )
         mock_read_excel.assert_called_once()
 
+    def _page_response(self, text):
+        response = Mock()
+        response.content = text.encode()
+        return response
+
+    def _not_found_response(self):
+        response = Mock()
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Client Error: Not Found")
+        return response
+
+    @patch('cdli_api_scraper.time.sleep')
+    @patch('cdli_api_scraper.requests.Session.get')
+    def test_export_all_artifacts_resumes_from_checkpoint(self, mock_get, mock_sleep):
+        self.logger.info("Running test_export_all_artifacts_resumes_from_checkpoint")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_path = os.path.join(tmpdir, "all_artifacts.csv")
+            checkpoint_path = output_path + ".checkpoint.json"
+
+            # Page 3 keeps failing with a transient error
+            mock_get.side_effect = [
+                self._page_response("artifact_id,period\n1,Uruk III\n2,Uruk III"),
+                self._page_response("artifact_id,period\n3,Ur III"),
+            ] + [requests.exceptions.ConnectionError("connection reset")] * 3
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                self.scraper.export_all_artifacts(output_path)
+
+            with open(checkpoint_path) as f:
+                checkpoint = json.load(f)
+            self.assertEqual(checkpoint["next_page"], 3)
+            self.assertEqual(checkpoint["records"], 3)
+
+            # A rerun picks up at page 3 and stops at the 404
+            mock_get.reset_mock()
+            mock_get.side_effect = [
+                self._page_response("artifact_id,period\n4,Old Babylonian"),
+            ] + [self._not_found_response()] * 3
+            total = self.scraper.export_all_artifacts(output_path)
+
+            self.assertEqual(total, 4)
+            self.assertEqual(mock_get.call_args_list[0].kwargs["params"], {"page": 3, "page_size": 1000})
+            self.assertFalse(os.path.exists(checkpoint_path))
+            result = pd.read_csv(output_path)
+            self.assertEqual(list(result["artifact_id"]), [1, 2, 3, 4])
+            self.assertEqual(result.iloc[3]["period"], "Old Babylonian")
+
+    def test_enrich_artifacts_reports_errors_and_writes_jsonl(self):
+        self.logger.info("Running test_enrich_artifacts_reports_errors_and_writes_jsonl")
+
+        def fake_inscription(artifact_id, format):
+            if artifact_id == "P000002":
+                raise requests.exceptions.HTTPError("404 Client Error: Not Found")
+            return f"&{artifact_id} = ..."
+
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                patch.object(self.scraper, 'get_inscription', side_effect=fake_inscription), \
+                patch.object(self.scraper, 'get_metadata', side_effect=lambda artifact_id: {"id": artifact_id}):
+            output_path = os.path.join(tmpdir, "enrichment.jsonl")
+            ids = (f"P00000{i}" for i in range(1, 4))
+            results = list(self.scraper.enrich_artifacts(
+                ids, resources=[("metadata", "json"), ("inscription", "atf")],
+                max_workers=2, output_path=output_path,
+            ))
+
+            with open(output_path) as f:
+                written = [json.loads(line) for line in f]
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(written, results)
+        failed = [r for r in results if "error" in r]
+        self.assertEqual(len(failed), 1)
+        self.assertEqual((failed[0]["artifact_id"], failed[0]["resource"]), ("P000002", "inscription"))
+        by_key = {(r["artifact_id"], r["resource"]): r for r in results}
+        self.assertEqual(by_key[("P000003", "inscription")]["data"], "&P000003 = ...")
+        self.assertEqual(by_key[("P000001", "metadata")]["data"], {"id": "P000001"})
+
+class PaginatedCSVHandler(BaseHTTPRequestHandler):
+    """Stand-in for the CDLI artifact listing: `pages` pages of CSV, then 404."""
+    pages = 7
+    rows_per_page = 3
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query["page"][0])
+        self.server.requested_pages.append(page)
+        # Random delays make pages complete out of order
+        time.sleep(random.uniform(0, 0.05))
+        if page > self.pages:
+            self.send_response(404)
+            self.end_headers()
+            return
+        first = (page - 1) * self.rows_per_page + 1
+        rows = [f"{i},designation {i}" for i in range(first, first + self.rows_per_page)]
+        body = ("artifact_id,designation\n" + "\n".join(rows)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestConcurrentPagination(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), PaginatedCSVHandler)
+        self.server.requested_pages = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.base_url = f"http://{host}:{port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_concurrent_pages_keep_page_order(self):
+        scraper = CDLIAPIScraper(base_url=self.base_url, requests_per_second=1000)
+        df = scraper.get_all_artifacts(max_workers=4)
+        self.assertEqual(list(df["artifact_id"]), list(range(1, 22)))
+        # Nothing is fetched far past the end, and 404s are not retried
+        self.assertLessEqual(max(self.server.requested_pages), 7 + 4)
+        self.assertEqual(len(self.server.requested_pages), len(set(self.server.requested_pages)))
+
+    def test_concurrent_export_matches_sequential(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sequential_path = os.path.join(tmpdir, "sequential.csv")
+            concurrent_path = os.path.join(tmpdir, "concurrent.csv")
+            CDLIAPIScraper(base_url=self.base_url).export_all_artifacts(sequential_path)
+            CDLIAPIScraper(base_url=self.base_url).export_all_artifacts(concurrent_path, max_workers=3)
+            with open(sequential_path) as f1, open(concurrent_path) as f2:
+                self.assertEqual(f1.read(), f2.read())
+
+class TestTokenBucket(unittest.TestCase):
+    def test_limits_rate_after_burst(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        # One token is available immediately, the other five arrive at 50/s
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 50 * 0.9)
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """Stand-in for a per-artifact endpoint that supports conditional requests."""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        body = f"&{self.path.split('/')[2]} = ...".encode()
+        etag = '"v1"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/x-c-atf; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestHTTPCache(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.base_url = f"http://{host}:{port}"
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmpdir.name, "http_cache.db")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_fresh_entries_are_served_from_disk(self):
+        scraper = CDLIAPIScraper(base_url=self.base_url, cache=HTTPCache(self.cache_path))
+        self.assertEqual(scraper.get_inscription("P000001"), "&P000001 = ...")
+        # A new scraper with a new cache object still reads the same file
+        scraper = CDLIAPIScraper(base_url=self.base_url, cache=HTTPCache(self.cache_path))
+        self.assertEqual(scraper.get_inscription("P000001"), "&P000001 = ...")
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(scraper.cache.stats["hits"], 1)
+
+    def test_stale_entries_are_revalidated(self):
+        cache = HTTPCache(self.cache_path, ttl=0)
+        scraper = CDLIAPIScraper(base_url=self.base_url, cache=cache)
+        scraper.get_inscription("P000001")
+        self.assertEqual(scraper.get_inscription("P000001"), "&P000001 = ...")
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(cache.stats["misses"], 1)
+        self.assertEqual(cache.stats["revalidations"], 1)
+
+    def test_accept_header_is_part_of_the_key(self):
+        cache = HTTPCache(self.cache_path)
+        scraper = CDLIAPIScraper(base_url=self.base_url, cache=cache)
+        scraper.get_inscription("P000001", format="atf")
+        scraper.get_inscription("P000001", format="conll-u")
+        self.assertEqual(cache.stats["misses"], 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = HTTPCache(self.cache_path, max_bytes=30)
+        scraper = CDLIAPIScraper(base_url=self.base_url, cache=cache)
+        for artifact_id in ["P000001", "P000002", "P000001", "P000003"]:
+            scraper.get_inscription(artifact_id)
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["evictions"], 1)
+        self.assertLessEqual(cache.total_bytes, 30)
+        # P000002 was least recently used, P000001 survives
+        scraper.get_inscription("P000001")
+        self.assertEqual(cache.stats["hits"], 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,97 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from content_store import ContentStore
+import artifact_augmentation
+from llm_gateway import LLMGateway
+
+class TestContentStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_put_and_get(self):
+        store = ContentStore(self.tmpdir.name, suffix=".txt")
+        key = ContentStore.make_key("prompt", "system", "model")
+        self.assertIsNone(store.get(key))
+        store.put(key, b"This artifact is a tablet")
+        self.assertEqual(store.get(key), b"This artifact is a tablet")
+        self.assertEqual(store.stats["hits"], 1)
+        self.assertEqual(store.stats["misses"], 1)
+        # Another instance over the same directory sees the entry
+        self.assertIn(key, ContentStore(self.tmpdir.name, suffix=".txt"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        store = ContentStore(self.tmpdir.name, max_bytes=25)
+        keys = [ContentStore.make_key(i) for i in range(3)]
+        store.put(keys[0], b"0" * 10)
+        store.put(keys[1], b"1" * 10)
+        # Make the first entry the most recently used
+        past = time.time() - 60
+        os.utime(store.path(keys[1]), (past, past))
+        os.utime(store.path(keys[0]), (past - 60, past - 60))
+        store.get(keys[0])
+        store.put(keys[2], b"2" * 10)
+
+        self.assertIn(keys[0], store)
+        self.assertNotIn(keys[1], store)
+        self.assertIn(keys[2], store)
+        self.assertEqual(store.stats["evictions"], 1)
+
+class TestSummaryCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ContentStore(self.tmpdir.name, suffix=".txt")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _client(self, chunks):
+        stream = MagicMock()
+        stream.__enter__.return_value.text_stream = iter(chunks)
+        stream.__enter__.return_value.get_final_message.return_value = SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=50, output_tokens=len(chunks)))
+        client = MagicMock()
+        client.messages.stream.return_value = stream
+        return client
+
+    @patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test"})
+    def test_completed_summary_is_replayed(self):
+        artifact = {"artifact_id": "1.0", "designation": "CDLI Lexical 000002, ex. 065"}
+        client = self._client(["This artifact is ", "a lexical tablet."])
+        gateway = LLMGateway(client=client)
+        with patch("artifact_augmentation.get_gateway", return_value=gateway):
+            first = "".join(artifact_augmentation.analyze_artifact(artifact, cache=self.cache, flights=None))
+            second = "".join(artifact_augmentation.analyze_artifact(artifact, cache=self.cache, flights=None))
+
+        self.assertEqual(first, "This artifact is a lexical tablet.")
+        self.assertEqual(second, first)
+        client.messages.stream.assert_called_once()
+        self.assertEqual(gateway.totals["calls"], 1)
+        self.assertEqual(gateway.totals["output_tokens"], 2)
+
+    @patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test"})
+    def test_summary_cut_short_raises_and_is_not_cached(self):
+        def chunks():
+            yield "This artifact is "
+            raise ConnectionError("Connection reset")
+
+        artifact = {"artifact_id": "1.0", "designation": "CDLI Lexical 000002, ex. 065"}
+        client = self._client([])
+        client.messages.stream.return_value.__enter__.return_value.text_stream = chunks()
+        gateway = LLMGateway(client=client)
+        received = []
+        with patch("artifact_augmentation.get_gateway", return_value=gateway):
+            with self.assertRaises(RuntimeError):
+                for chunk in artifact_augmentation.analyze_artifact(artifact, cache=self.cache, flights=None):
+                    received.append(chunk)
+        self.assertEqual(received, ["This artifact is "])
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+if __name__ == '__main__':
+    unittest.main()
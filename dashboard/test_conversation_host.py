@@ -0,0 +1,225 @@
+import json
+import base64
+import asyncio
+import unittest
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+from conversation_host import BufferAudioInterface, ConversationHost, kiosk_handler
+
+class FakeAgent:
+    """Stand-in for the conversation websocket.
+
+    Each user audio chunk is answered with a transcript, a response and
+    `audio_events` audio events echoing the chunk. A chunk of b"interrupt"
+    is answered with audio, an interruption, then audio again.
+    """
+
+    def __init__(self, audio_events=1):
+        self.audio_events = audio_events
+        self.pongs = []
+        self.paths = []
+
+    async def handler(self, websocket):
+        self.paths.append(websocket.request.path)
+        event_id = 0
+        await websocket.send(json.dumps({
+            "type": "conversation_initiation_metadata",
+            "conversation_initiation_metadata_event": {"conversation_id": f"conv-{len(self.paths)}"},
+        }))
+        await websocket.send(json.dumps({"type": "ping", "ping_event": {"event_id": 1, "ping_ms": 5}}))
+
+        async def audio(data):
+            nonlocal event_id
+            event_id += 1
+            await websocket.send(json.dumps({"type": "audio", "audio_event": {
+                "audio_base_64": base64.b64encode(data).decode(), "event_id": event_id}}))
+
+        try:
+            async for raw in websocket:
+                message = json.loads(raw)
+                if message.get("type") == "pong":
+                    self.pongs.append(message["event_id"])
+                    continue
+                chunk = base64.b64decode(message["user_audio_chunk"])
+                if chunk == b"interrupt":
+                    for _ in range(5):
+                        await audio(b"stale")
+                    await websocket.send(json.dumps({"type": "interruption",
+                                                     "interruption_event": {"event_id": event_id}}))
+                    await audio(b"fresh")
+                    continue
+                await websocket.send(json.dumps({"type": "user_transcript",
+                                                 "user_transcription_event": {"user_transcript": chunk.decode()}}))
+                await websocket.send(json.dumps({"type": "agent_response",
+                                                 "agent_response_event": {"agent_response": f"heard {chunk.decode()}"}}))
+                for i in range(self.audio_events):
+                    await audio(chunk + str(i).encode())
+        except ConnectionClosed:
+            pass
+
+    async def __aenter__(self):
+        self.server = await serve(self.handler, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+class SlowURLHost(ConversationHost):
+    """Host whose URL takes a while to fetch, like a signed URL, or cannot be fetched at all."""
+
+    def __init__(self, *args, fail=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail = fail
+
+    async def _url(self) -> str:
+        await asyncio.sleep(0.05)
+        if self.fail:
+            raise KeyError("signed_url")
+        return await super()._url()
+
+class TestConversationHost(unittest.TestCase):
+    def run_async(self, coroutine):
+        return asyncio.run(asyncio.wait_for(coroutine, 10))
+
+    def test_concurrent_sessions(self):
+        async def run():
+            async with FakeAgent() as agent, ConversationHost("agent-1", base_url=agent.url) as host:
+                transcripts = []
+                sessions = []
+                for i in range(5):
+                    audio = BufferAudioInterface()
+                    session = await host.start_session(audio, session_id=f"kiosk-{i}",
+                                                       user_transcript=transcripts.append)
+                    audio.feed(f"hello {i}".encode())
+                    sessions.append((session, audio))
+                self.assertEqual(host.stats()["active"], 5)
+
+                for i, (session, audio) in enumerate(sessions):
+                    self.assertEqual(await audio.output.get(), f"hello {i}0".encode())
+                    audio.feed(None)
+                    await session.task
+                    self.assertEqual(session.end_reason, "user_left")
+                    self.assertEqual(audio.events[-1], {"type": "agent_response", "text": f"heard hello {i}"})
+
+                stats = host.stats()
+                self.assertEqual(stats["active"], 0)
+                self.assertEqual(sorted(transcripts), [f"hello {i}" for i in range(5)])
+                self.assertEqual(len(agent.pongs), 5)
+                self.assertTrue(all(path == "/v1/convai/conversation?agent_id=agent-1" for path in agent.paths))
+                ended = {summary["session_id"]: summary for summary in stats["ended"]}
+                self.assertEqual(len({summary["conversation_id"] for summary in ended.values()}), 5)
+                summary = ended["kiosk-0"]
+                self.assertEqual(summary["turn"]["count"], 1)
+                self.assertEqual(summary["first_audio"]["count"], 1)
+                self.assertEqual(summary["ping"]["p50_ms"], 5)
+                self.assertEqual((summary["chunks_in"], summary["chunks_out"]), (1, 1))
+
+        self.run_async(run())
+
+    def test_backpressure(self):
+        async def run():
+            async with FakeAgent(audio_events=50) as agent, \
+                    ConversationHost("agent-1", base_url=agent.url, output_buffer=4) as host:
+                audio = BufferAudioInterface(max_output_chunks=2)
+                session = await host.start_session(audio)
+                audio.feed(b"x")
+                await asyncio.sleep(0.2)
+                # Nothing is played, so the session stops reading once both buffers fill
+                self.assertEqual(audio.output.qsize(), 2)
+                self.assertEqual(session.queue.qsize(), 4)
+                self.assertGreater(session.stats.backpressure_waits, 0)
+
+                received = [await audio.output.get() for _ in range(50)]
+                self.assertEqual(received, [f"x{i}".encode() for i in range(50)])
+                self.assertLessEqual(session.stats.max_buffered, 4)
+                await host.end_session(session.session_id)
+                self.assertEqual(session.end_reason, "ended")
+
+        self.run_async(run())
+
+    def test_interruption_drops_unplayed_audio(self):
+        async def run():
+            async with FakeAgent() as agent, ConversationHost("agent-1", base_url=agent.url) as host:
+                audio = BufferAudioInterface()
+                session = await host.start_session(audio)
+                audio.feed(b"interrupt")
+                while session.stats.chunks_out < 6 - session.stats.dropped_chunks:
+                    await asyncio.sleep(0.01)
+                self.assertEqual(audio.interruptions, 1)
+                self.assertEqual(await audio.output.get(), b"fresh")
+                self.assertTrue(audio.output.empty())
+                await host.end_session(session.session_id)
+
+        self.run_async(run())
+
+    def test_idle_sessions_reaped(self):
+        async def run():
+            async with FakeAgent() as agent, ConversationHost("agent-1", base_url=agent.url, idle_timeout=0.2,
+                                                               reap_interval=0.05) as host:
+                idle = await host.start_session(BufferAudioInterface())
+                active_audio = BufferAudioInterface()
+                active = await host.start_session(active_audio)
+                for _ in range(8):
+                    active_audio.feed(b"still here")
+                    await asyncio.sleep(0.05)
+                await idle.task
+                self.assertEqual(idle.end_reason, "idle")
+                self.assertIn(active.session_id, host.sessions)
+            self.assertEqual(active.end_reason, "shutdown")
+
+        self.run_async(run())
+
+    def test_full_host_turns_clients_away(self):
+        async def run():
+            async with FakeAgent() as agent, ConversationHost("agent-1", base_url=agent.url, max_sessions=1) as host:
+                async with serve(kiosk_handler(host), "127.0.0.1", 0) as kiosk:
+                    port = kiosk.sockets[0].getsockname()[1]
+                    async with connect(f"ws://127.0.0.1:{port}") as first:
+                        await first.send(b"hello")
+                        self.assertEqual(json.loads(await first.recv()),
+                                         {"type": "user_transcript", "text": "hello"})
+                        self.assertEqual(json.loads(await first.recv())["type"], "agent_response")
+                        self.assertEqual(await first.recv(), b"hello0")
+
+                        async with connect(f"ws://127.0.0.1:{port}") as second:
+                            with self.assertRaises(ConnectionClosed) as closed:
+                                await second.recv()
+                            self.assertEqual(closed.exception.rcvd.code, 1013)
+
+                        await first.send(json.dumps({"type": "end"}))
+                        with self.assertRaises(ConnectionClosed):
+                            await first.recv()
+                self.assertEqual(host.ended[-1]["reason"], "user_left")
+
+        self.run_async(run())
+
+    def test_concurrent_starts_respect_max_sessions(self):
+        async def run():
+            async with FakeAgent() as agent, SlowURLHost("agent-1", base_url=agent.url, max_sessions=2) as host:
+                results = await asyncio.gather(*(host.start_session(BufferAudioInterface()) for _ in range(6)),
+                                               return_exceptions=True)
+                self.assertEqual(sum(isinstance(result, RuntimeError) for result in results), 4)
+                self.assertEqual((len(host.sessions), host.starting), (2, 0))
+
+                host.fail = True
+                await host.end_session(next(iter(host.sessions)))
+                with self.assertRaises(ConnectionError):
+                    await host.start_session(BufferAudioInterface())
+                # The failed start gave its slot back
+                self.assertEqual((len(host.sessions), host.starting), (1, 0))
+
+                async with serve(kiosk_handler(host), "127.0.0.1", 0) as kiosk:
+                    port = kiosk.sockets[0].getsockname()[1]
+                    async with connect(f"ws://127.0.0.1:{port}") as client:
+                        with self.assertRaises(ConnectionClosed) as closed:
+                            await client.recv()
+                        self.assertEqual(closed.exception.rcvd.code, 1011)
+
+        self.run_async(run())
+
+if __name__ == '__main__':
+    unittest.main()
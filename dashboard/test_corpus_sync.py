@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from unittest.mock import Mock
+from artifact_store import ArtifactStore, build_artifact_store
+from corpus_sync import CorpusSync
+
+class TestCorpusSync(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "artifacts.db")
+        csv_path = os.path.join(self.tmpdir.name, "artifacts.csv")
+        # Local corpus as written by an earlier export, IDs spelled as floats
+        pd.DataFrame({
+            'artifact_id': [1.0, 2.0, 3.0, 4.0],
+            'designation': ['A', 'B', 'C', 'D'],
+            'height': [31.0, None, 12.5, 40.0],
+            'retired': [0.0, 0.0, 0.0, 0.0],
+        }).to_csv(csv_path, index=False)
+        build_artifact_store(csv_path, self.db_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _scraper(self, pages):
+        scraper = Mock()
+        scraper.iter_artifact_pages.side_effect = lambda **kwargs: iter(list(enumerate(pages, start=1)))
+        return scraper
+
+    def _pages(self, rows):
+        df = pd.DataFrame(rows, columns=['artifact_id', 'designation', 'height', 'retired'])
+        return [df.iloc[:2].reset_index(drop=True), df.iloc[2:].reset_index(drop=True)]
+
+    def test_only_differences_are_written(self):
+        unchanged = [[1, 'A', 31, 0], [2, 'B', None, 0], [3, 'C', 12.5, 0], [4, 'D', 40, 0]]
+        corpus = CorpusSync(self.db_path, self._scraper(self._pages(unchanged)))
+        summary = corpus.sync()
+        self.assertEqual((summary['added'], summary['changed'], summary['retired']), ([], [], []))
+        self.assertEqual(summary['unchanged'], 4)
+
+        fresh = [[1, 'A', 31, 0], [2, 'B (revised)', None, 0], [3, 'C', 12.5, 1], [4, 'D', 40, 0], [5, 'E', 9, 0],
+                 [6, 'F', None, 1]]
+        corpus.scraper = self._scraper(self._pages(fresh))
+        summary = corpus.sync()
+        corpus.close()
+
+        self.assertEqual(summary['changed'], ['2.0'])
+        # New artifacts take the stored ID spelling, and one already retired is not counted as added
+        self.assertEqual(summary['retired'], ['3.0', '6.0'])
+        self.assertEqual(summary['added'], ['5.0'])
+        self.assertEqual(summary['pages_unchanged'], 0)
+        self.assertEqual(summary['missing'], 0)
+
+        with ArtifactStore(self.db_path) as store:
+            self.assertEqual(len(store), 6)
+            self.assertEqual(store.get_record('2.0')['designation'], 'B (revised)')
+            self.assertEqual(store.get_record('5.0')['designation'], 'E')
+            self.assertEqual(list(store.get_range(0, 10)['artifact_id'])[:4], ['1.0', '2.0', '3.0', '4.0'])
+
+    def test_unchanged_pages_are_skipped_and_missing_reported(self):
+        pages = self._pages([[1, 'A', 31, 0], [2, 'B', None, 0], [3, 'C', 12.5, 0], [4, 'D', 40, 0]])
+        corpus = CorpusSync(self.db_path, self._scraper(pages))
+        corpus.sync()
+        corpus.scraper = self._scraper(pages[:1])
+        summary = corpus.sync()
+        corpus.close()
+        self.assertEqual(summary['pages_unchanged'], 1)
+        self.assertEqual(summary['missing'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
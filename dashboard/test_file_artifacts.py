@@ -0,0 +1,92 @@
+import os
+import csv
+import gzip
+import json
+import hashlib
+import tempfile
+import unittest
+import pandas as pd
+from artifact_store import build_artifact_store
+from file_artifacts import MANIFEST, build_artifact_pages, serialize_page
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "limited_artifacts.csv")
+
+class TestArtifactPages(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmpdir.name, "artifacts.csv")
+        self.pages_dir = os.path.join(self.tmpdir.name, "pages")
+        pd.DataFrame({
+            'artifact_id': [f'{i}.0' for i in range(1, 8)],
+            'designation': ['A', 'B', 'C', 'D', 'E', 'F', 'G'],
+            'period': ['Uruk III', 'Uruk III', 'Ur III', None, 'Ur III', 'Ur III', 'Uruk IV'],
+            'height': [31.0, None, 12.5, 40.0, 8.0, 9.0, 10.0],
+        }).to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_page(self, page, suffix="gz"):
+        with gzip.open(os.path.join(self.pages_dir, f"{page['file']}.{suffix}")) as f:
+            return f.read()
+
+    def test_pages_cover_the_table(self):
+        manifest = build_artifact_pages(self.csv_path, self.pages_dir, page_size=3)
+        self.assertEqual((manifest["total"], manifest["page_size"]), (7, 3))
+        self.assertEqual([page["rows"] for page in manifest["pages"]], [3, 3, 1])
+        self.assertEqual(manifest["columns"], ['artifact_id', 'designation', 'period', 'height'])
+        self.assertIn("gzip", manifest["encodings"])
+
+        body = self.read_page(manifest["pages"][1])
+        self.assertEqual(manifest["pages"][1]["etag"], hashlib.sha256(body).hexdigest())
+        # Strings with blanks for missing values, as parsed from limited_artifacts.csv before
+        self.assertEqual(json.loads(body)[0], {'artifact_id': '4.0', 'designation': 'D', 'period': '',
+                                               'height': '40.0'})
+        with open(os.path.join(self.pages_dir, MANIFEST)) as f:
+            self.assertEqual(json.load(f), manifest)
+
+    def test_rebuild_keeps_unchanged_pages(self):
+        first = build_artifact_pages(self.csv_path, self.pages_dir, page_size=3)
+        df = pd.read_csv(self.csv_path, dtype={'artifact_id': str})
+        df.loc[6, 'designation'] = 'G2'
+        df.to_csv(self.csv_path, index=False)
+        second = build_artifact_pages(self.csv_path, self.pages_dir, page_size=3)
+
+        self.assertEqual(first["pages"][:2], second["pages"][:2])
+        self.assertNotEqual(first["pages"][2]["etag"], second["pages"][2]["etag"])
+        # The replaced page outlives one build, for requests that read the old manifest
+        replaced = os.path.join(self.pages_dir, f"{first['pages'][2]['file']}.gz")
+        self.assertTrue(os.path.exists(replaced))
+        build_artifact_pages(self.csv_path, self.pages_dir, page_size=3)
+        files = sorted(name for name in os.listdir(self.pages_dir) if name.startswith("page-"))
+        self.assertEqual(len(files), 3 * len(second["encodings"]))
+        self.assertFalse(os.path.exists(replaced))
+
+    def test_ndjson_from_store(self):
+        db_path = os.path.join(self.tmpdir.name, "artifacts.db")
+        build_artifact_store(self.csv_path, db_path)
+        manifest = build_artifact_pages(db_path, self.pages_dir, page_size=5, format="ndjson",
+                                        columns=['artifact_id', 'designation'])
+        self.assertEqual(manifest["content_type"], "application/x-ndjson")
+        lines = self.read_page(manifest["pages"][1]).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         [{'artifact_id': '6.0', 'designation': 'F'}, {'artifact_id': '7.0', 'designation': 'G'}])
+
+        with self.assertRaises(ValueError):
+            serialize_page([], "xml")
+
+    def test_rows_match_the_csv_route(self):
+        # /artifacts-data without pages: each CSV value as text, trimmed
+        with open(SEED_CSV, newline="") as f:
+            expected = [{key: value.strip() for key, value in row.items()} for row in csv.DictReader(f)]
+        db_path = os.path.join(self.tmpdir.name, "artifacts.db")
+        build_artifact_store(SEED_CSV, db_path)
+
+        for source in (SEED_CSV, db_path):
+            manifest = build_artifact_pages(source, self.pages_dir, page_size=len(expected))
+            rows = json.loads(self.read_page(manifest["pages"][0]))
+            self.assertEqual(rows, expected)
+            self.assertEqual((rows[0]["retired"], rows[0]["height"]), ("0.0", "31.0"))
+
+if __name__ == '__main__':
+    unittest.main()
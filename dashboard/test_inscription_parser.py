@@ -0,0 +1,155 @@
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+from artifact_augmentation import SummaryWorker
+from job_scheduler import JobScheduler
+from prompt_builder import build_prompt
+from inscription_parser import (BROKEN, DAMAGED, UNCERTAIN, InscriptionCorpus, build_inscription_index,
+                                parse_inscription)
+
+ATF = """&P000001 = ATU 3, pl. 081, W 9123,d
+#atf: lang qpc
+@tablet
+@obverse
+@column 1
+1. 1(N01) GAL~a [...]
+#lem: X; X
+2. [a-na {d}en-lil2 x] szu#-nu?
+   ma-na ($ blank space $)
+$ rest broken
+@reverse
+1'. {d}en-lil2 |GA2xAN| 5(disz)
+"""
+
+CDLI_CONLL = """#new_text=P000002
+# ID\tFORM\tSEGM\tXPOSTAG\tHEAD\tDEPREL\tMISC
+o.1.1\t1(disz)\t\tNU\t\t\t
+o.1.2\tsila3\t\tN\t\t\t
+o.2.1\t{d}en-lil2\t\tDN\t\t\t
+r.1.1\tmu\t\tN\t\t\t
+"""
+
+CONLL_U = """# newdoc id = P000003
+# sent_id = 1
+1\t{d}en-lil2\tEnlil\tPROPN\t_\t_\t0\troot\t_\t_
+2-3\tlugal-e\t_\t_\t_\t_\t_\t_\t_\t_
+2\tlugal\tlugal\tNOUN\t_\t_\t1\tappos\t_\t_
+3\te\te\tADP\t_\t_\t2\tcase\t_\t_
+
+# sent_id = 2
+1\tmu\tmu\tNOUN\t_\t_\t0\troot\t_\t_
+"""
+
+class TestInscriptionParser(unittest.TestCase):
+    def test_atf_surfaces_lines_and_flags(self):
+        corpus = parse_inscription(ATF).finish()
+        # Stored under the artifact table's ID spelling, found by either
+        self.assertEqual(list(corpus.artifact_ids), ["1.0"])
+        self.assertEqual(corpus.lines("1.0"), corpus.lines("P000001"))
+        self.assertEqual(corpus.lines("1.0"), [
+            ("obverse", ["1(N01) GAL~a [...]", "[a-na] [{d}en-lil2] [x] szu-nu#? ma-na"]),
+            ("reverse", ["{d}en-lil2 |GA2xAN| 5(disz)"]),
+        ])
+        flags = corpus.token_flags[corpus.tokens.index("szu-nu") == corpus.token_ids]
+        self.assertEqual(int(flags[0]), DAMAGED | UNCERTAIN)
+        self.assertEqual(int(corpus.token_flags[corpus.token_ids == corpus.tokens.index("x")][0]), BROKEN)
+
+        # Each distinct token is stored and split into signs once
+        self.assertEqual(corpus.tokens.count("{d}en-lil2"), 1)
+        counts = dict(zip(corpus.signs, corpus.sign_counts()))
+        self.assertEqual((counts["{d}"], counts["lil2"], counts["na"]), (2, 2, 2))
+        self.assertEqual(counts["|GA2xAN|"], 1)
+
+    def test_conll_formats(self):
+        corpus = parse_inscription(CDLI_CONLL, "cdli-conll").finish()
+        self.assertEqual(corpus.lines("2.0"), [("obverse", ["1(disz) sila3", "{d}en-lil2"]), ("reverse", ["mu"])])
+
+        corpus = parse_inscription(CONLL_U, "conll-u").finish()
+        self.assertEqual(corpus.lines("3.0"), [("", ["{d}en-lil2 lugal e", "mu"])])
+
+        # An explicit artifact ID replaces the one in the text
+        corpus = parse_inscription(CONLL_U, "conll-u", artifact_id="3.0").finish()
+        self.assertEqual(list(corpus.artifact_ids), ["3.0"])
+
+        with self.assertRaises(ValueError):
+            parse_inscription(ATF, "tei")
+
+    def test_prompt_text(self):
+        corpus = parse_inscription(ATF).finish()
+        self.assertEqual(corpus.prompt_text("P000001", max_lines=2),
+                         "obverse: 1(N01) GAL~a [...] / [a-na] [{d}en-lil2] [x] szu-nu#? ma-na; …")
+        self.assertEqual(corpus.prompt_text("missing"), "")
+
+        prompt = build_prompt({"designation": "ATU 3, pl. 081", "inscription": corpus.prompt_text("P000001")})
+        self.assertIn("Inscription: obverse: 1(N01) GAL~a [...] / ", prompt)
+
+    def test_corpus_mode_matches_single_process(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Records as written by CDLIAPIScraper.enrich_artifacts
+            source = os.path.join(tmpdir, "enriched.jsonl")
+            with open(source, "w") as f:
+                for i in range(30):
+                    text = ATF.replace("P000001", f"P{i:06d}").replace("GAL~a", f"sze{i % 7}")
+                    f.write(json.dumps({"artifact_id": f"{i}.0", "resource": "inscription",
+                                        "format": "atf", "data": text}) + "\n")
+                    f.write(json.dumps({"artifact_id": f"{i}.0", "resource": "metadata", "data": {}}) + "\n")
+                f.write(json.dumps({"artifact_id": "99.0", "resource": "inscription", "error": "404"}) + "\n")
+
+            pooled = build_inscription_index(source, os.path.join(tmpdir, "pooled"), processes=2, batch_size=7)
+            single = build_inscription_index(source, os.path.join(tmpdir, "single"), processes=1, batch_size=1000)
+            self.assertEqual(len(pooled), 30)
+            self.assertEqual(pooled.tokens, single.tokens)
+            np.testing.assert_array_equal(pooled.token_ids, single.token_ids)
+            np.testing.assert_array_equal(pooled.line_offsets, single.line_offsets)
+            self.assertEqual(pooled.lines("29.0"), single.lines("29.0"))
+
+            loaded = InscriptionCorpus.load(os.path.join(tmpdir, "pooled"))
+            self.assertIsInstance(loaded.token_ids, np.memmap)
+            self.assertEqual(loaded.lines("12.0")[0][1][0], "1(N01) sze5 [...]")
+            stats = loaded.stats(top=1)
+            self.assertEqual((stats["artifacts"], stats["lines"], stats["tokens"]), (30, 90, 330))
+            self.assertEqual(stats["top_tokens"], [("{d}en-lil2", 60)])
+            np.testing.assert_array_equal(loaded.tokens_per_artifact(), np.full(30, 11))
+
+    def test_dump_and_directory_ids_match_the_table(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dump = os.path.join(tmpdir, "cdliatf_unblocked.atf")
+            with open(dump, "w") as f:
+                f.write(ATF + ATF.replace("P000001", "P000003").replace("GAL~a", "sze3"))
+            corpus = build_inscription_index(dump, os.path.join(tmpdir, "dump"), processes=1, batch_size=1)
+            self.assertEqual(list(corpus.artifact_ids), ["1.0", "3.0"])
+
+            files = os.path.join(tmpdir, "files")
+            os.makedirs(files)
+            with open(os.path.join(files, "P000002.conll"), "w") as f:
+                f.write(CDLI_CONLL)
+            corpus = build_inscription_index(files, os.path.join(tmpdir, "files_index"), processes=1)
+            self.assertEqual(list(corpus.artifact_ids), ["2.0"])
+
+    def test_worker_prompts_include_inscriptions(self):
+        seed_csv = os.path.join(os.path.dirname(os.path.abspath(__file__)), "limited_artifacts.csv")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dump = os.path.join(tmpdir, "dump.atf")
+            with open(dump, "w") as f:
+                f.write(ATF.replace("P000001", "P000003"))
+            build_inscription_index(dump, os.path.join(tmpdir, "index"), processes=1)
+            worker = SummaryWorker(("127.0.0.1", 0), seed_csv, scheduler=JobScheduler(max_workers=1),
+                                   inscription_index=os.path.join(tmpdir, "index"))
+            try:
+                self.assertTrue(worker.lookup("3.0")["inscription"].startswith("obverse: 1(N01) GAL~a"))
+                self.assertEqual(worker.lookup("1.0")["inscription"], "")
+            finally:
+                worker.server_close()
+
+            # An index keyed by IDs the table does not use is reported
+            corpus = parse_inscription(ATF, artifact_id="X-1").finish()
+            corpus.save(os.path.join(tmpdir, "unmatched"))
+            with self.assertLogs("artifact_augmentation", "WARNING") as logs:
+                SummaryWorker(("127.0.0.1", 0), seed_csv, scheduler=JobScheduler(max_workers=1),
+                              inscription_index=os.path.join(tmpdir, "unmatched")).server_close()
+            self.assertIn("'X-1'", logs.output[0])
+
+if __name__ == '__main__':
+    unittest.main()
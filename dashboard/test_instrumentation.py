@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+import urllib.request
+import instrumentation
+from instrumentation import Registry
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.was_enabled = instrumentation.enabled
+        instrumentation.enable()
+        self.registry = Registry()
+
+    def tearDown(self):
+        instrumentation.enable(self.was_enabled)
+
+    def test_prometheus_text_format(self):
+        requests = self.registry.counter("cdli_requests_total", "Requests made")
+        latency = self.registry.histogram("cdli_request_seconds", "Request latency", buckets=(0.1, 1.0))
+        requests.inc(outcome="ok")
+        requests.inc(2, outcome="ok")
+        latency.observe(0.05, outcome="ok")
+        latency.observe(0.1, outcome="ok")
+        latency.observe(3.0, outcome="ok")
+
+        self.assertEqual(self.registry.render(), "\n".join([
+            "# HELP cdli_request_seconds Request latency",
+            "# TYPE cdli_request_seconds histogram",
+            'cdli_request_seconds_bucket{outcome="ok",le="0.1"} 2',
+            'cdli_request_seconds_bucket{outcome="ok",le="1"} 2',
+            'cdli_request_seconds_bucket{outcome="ok",le="+Inf"} 3',
+            'cdli_request_seconds_sum{outcome="ok"} 3.15',
+            'cdli_request_seconds_count{outcome="ok"} 3',
+            "# HELP cdli_requests_total Requests made",
+            "# TYPE cdli_requests_total counter",
+            'cdli_requests_total{outcome="ok"} 3',
+        ]) + "\n")
+
+    def test_label_values_are_escaped(self):
+        errors = self.registry.counter("errors_total", "Errors")
+        errors.inc(error='bad "quote"')
+        self.assertIn('errors_total{error="bad \\"quote\\""} 1', self.registry.render())
+
+    def test_disabled_metrics_record_nothing(self):
+        instrumentation.enable(False)
+        latency = self.registry.histogram("tts_sentence_seconds", "TTS latency")
+        latency.observe(1.0)
+        with latency.time():
+            pass
+        self.registry.counter("tts_characters_total", "Characters").inc(10)
+        self.assertEqual(self.registry.render(), "")
+
+    def test_registering_twice_returns_the_same_metric(self):
+        first = self.registry.histogram("llm_request_seconds", "LLM latency")
+        self.assertIs(self.registry.histogram("llm_request_seconds", "LLM latency"), first)
+        with self.assertRaises(ValueError):
+            self.registry.counter("llm_request_seconds", "LLM latency")
+
+    def test_export_to_file_and_http(self):
+        metric = instrumentation.counter("test_exports_total", "Exports")
+        metric.inc()
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                instrumentation.write_metrics(os.path.join(tmpdir, "metrics-{pid}.prom"))
+                with open(os.path.join(tmpdir, f"metrics-{os.getpid()}.prom")) as f:
+                    self.assertIn("test_exports_total 1", f.read())
+
+            server = instrumentation.serve_metrics(0)
+            try:
+                url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+                with urllib.request.urlopen(url) as response:
+                    self.assertIn("test_exports_total 1", response.read().decode())
+            finally:
+                server.shutdown()
+                server.server_close()
+        finally:
+            with metric.lock:
+                metric.values.clear()
+
+    def test_latency_summary(self):
+        self.assertEqual(instrumentation.latency_summary([]), {"count": 0})
+        self.assertEqual(instrumentation.latency_summary([0.004, 0.001, 0.002, 0.003]),
+                         {"count": 4, "p50_ms": 2.5, "p95_ms": 3.9, "max_ms": 4.0})
+        self.assertEqual(instrumentation.latency_summary([5], scale=1, percentiles=(50, 99)),
+                         {"count": 1, "p50_ms": 5, "p99_ms": 5, "max_ms": 5})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import json
+import socket
+import threading
+import unittest
+from concurrent.futures import CancelledError
+from artifact_augmentation import SummaryWorker
+from artifact_schema import read_artifacts
+from job_scheduler import HIT, INFLIGHT, MISS, JobScheduler
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "limited_artifacts.csv")
+
+class TestJobScheduler(unittest.TestCase):
+    def setUp(self):
+        self.order = []
+        self.release = threading.Event()
+
+    def job(self, name, block=False):
+        def run():
+            if block:
+                self.release.wait(5)
+            self.order.append(name)
+            return name
+        return run
+
+    def wait_running(self, scheduler, priority):
+        while scheduler.stats()["running"][priority] == 0:
+            self.release.wait(0.001)
+
+    def test_interactive_runs_before_queued_prefetch(self):
+        scheduler = JobScheduler(max_workers=1, max_prefetch=1)
+        busy = scheduler.submit("summary", "busy", self.job("busy", block=True))
+        self.wait_running(scheduler, "interactive")
+        scheduler.prefetch("summary", "a", self.job("a"))
+        scheduler.prefetch("summary", "b", self.job("b"))
+        clicked = scheduler.submit("summary", "c", self.job("c"))
+        self.assertEqual(scheduler.stats()["queued"], {"interactive": 1, "prefetch": 2})
+        self.release.set()
+        self.assertEqual(clicked.result(5), "c")
+        scheduler.shutdown()
+        # Queued prefetch work may run or be dropped by shutdown, but only after the click
+        self.assertEqual(self.order[:2], ["busy", "c"])
+        self.assertEqual(busy.result(), "busy")
+
+    def test_prefetch_never_takes_every_worker(self):
+        scheduler = JobScheduler(max_workers=2, max_prefetch=1)
+        scheduler.prefetch("video", "a", self.job("a", block=True))
+        self.wait_running(scheduler, "prefetch")
+        scheduler.prefetch("video", "b", self.job("b"))
+        clicked = scheduler.submit("video", "c", self.job("c"))
+        self.assertEqual(clicked.result(5), "c")
+        self.assertEqual(self.order, ["c"])
+        self.release.set()
+        scheduler.shutdown()
+
+    def test_interactive_request_promotes_queued_prefetch(self):
+        scheduler = JobScheduler(max_workers=1, max_prefetch=1)
+        scheduler.submit("summary", "busy", self.job("busy", block=True))
+        self.wait_running(scheduler, "interactive")
+        queued = scheduler.prefetch("summary", "a", self.job("a"))
+        scheduler.prefetch("summary", "b", self.job("b"))
+        self.assertIs(scheduler.submit("summary", "a", self.job("a")), queued)
+        self.release.set()
+        self.assertEqual(queued.result(5), "a")
+        scheduler.shutdown()
+        self.assertEqual(self.order[:2], ["busy", "a"])
+
+    def test_budget_and_queue_limit(self):
+        scheduler = JobScheduler(max_workers=1, max_prefetch=1, max_queued_prefetch=2, budgets={"video": 3})
+        scheduler.submit("summary", "busy", self.job("busy", block=True))
+        self.wait_running(scheduler, "interactive")
+        oldest = scheduler.prefetch("video", "a", self.job("a"))
+        scheduler.prefetch("video", "b", self.job("b"))
+        scheduler.prefetch("video", "c", self.job("c"))
+        self.assertIsNone(scheduler.prefetch("video", "d", self.job("d")))
+        self.assertEqual(scheduler.budget_remaining("video"), 0)
+        self.assertIsNone(scheduler.budget_remaining("summary"))
+        with self.assertRaises(CancelledError):
+            oldest.result()
+
+        stats = scheduler.stats()["prefetch"]["video"]
+        self.assertEqual((stats["submitted"], stats["dropped"], stats["over_budget"]), (3, 1, 1))
+        self.release.set()
+        scheduler.shutdown()
+
+    def test_hit_rate(self):
+        scheduler = JobScheduler(max_workers=2, max_prefetch=2)
+        scheduler.prefetch("summary", "done", self.job("done")).result(5)
+        running = scheduler.prefetch("summary", "running", self.job("running", block=True))
+        self.wait_running(scheduler, "prefetch")
+        self.assertEqual(scheduler.claim("summary", "done"), HIT)
+        self.assertEqual(scheduler.claim("summary", "running"), INFLIGHT)
+        self.assertEqual(scheduler.claim("summary", "done"), MISS)
+        self.assertEqual(scheduler.claim("summary", "never"), MISS)
+
+        stats = scheduler.stats()
+        self.assertEqual(stats["requests"]["summary"]["hit_rate"], 0.25)
+        self.assertEqual(stats["wait"]["prefetch"]["count"], 2)
+        self.release.set()
+        running.result(5)
+        scheduler.shutdown()
+
+    def test_failed_prefetch_is_not_a_hit(self):
+        scheduler = JobScheduler(max_workers=1)
+
+        def fail():
+            raise RuntimeError("No summary generated")
+
+        with self.assertRaises(RuntimeError):
+            scheduler.prefetch("summary", "a", fail).result(5)
+        self.assertEqual(scheduler.claim("summary", "a"), MISS)
+        self.assertEqual(scheduler.stats()["prefetch"]["summary"]["failed"], 1)
+        scheduler.shutdown()
+
+class TestWorkerPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.worker = SummaryWorker(("127.0.0.1", 0), SEED_CSV, scheduler=JobScheduler(max_workers=1),
+                                    prefetch_radius=2)
+        threading.Thread(target=self.worker.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.worker.shutdown()
+        self.worker.server_close()
+
+    def test_neighbours_follow_table_order(self):
+        ids = list(read_artifacts(SEED_CSV)['artifact_id'])
+        self.assertEqual(self.worker.neighbour_ids(ids[0]), ids[1:3])
+        self.assertEqual(self.worker.neighbour_ids(ids[3]), ids[1:3] + ids[4:6])
+        self.assertEqual(self.worker.neighbour_ids("missing"), [])
+
+    def test_stats_request(self):
+        with socket.create_connection(self.worker.server_address) as conn:
+            conn.sendall(b'{"stats": true}\n')
+            with conn.makefile() as f:
+                frames = [json.loads(line) for line in f]
+        self.assertEqual(frames[-1], {"done": True})
+        self.assertEqual(frames[0]["result"]["queued"], {"interactive": 0, "prefetch": 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import unittest
+from artifact_schema import read_artifacts
+from prompt_builder import build_prompt, estimate_tokens, prompt_fields
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "limited_artifacts.csv")
+
+class TestPromptBuilder(unittest.TestCase):
+    def setUp(self):
+        self.artifact = {
+            'artifact_id': '7.0',
+            'designation': 'ATU 3, pl. 081, W 9123,d',
+            'museum_no': 'VAT 15253',
+            'period': 'Uruk IV (ca. 3350-3200 BC)',
+            'is_period_uncertain': True,
+            'genres': 'Lexical;Vocabularies; lexical;',
+            'height': 42.0, 'width': float('nan'), 'thickness': 19.0,
+            'weight': 0.0,
+            'dates': '00.00.00.00',
+            'is_school_text': False,
+            'retired': False,
+            'publications_comment': '; ; ; ; ',
+            'condition_description': None,
+            'new_column': 'kept',
+        }
+
+    def test_drops_empty_and_placeholder_values(self):
+        prompt = build_prompt(self.artifact)
+        for dropped in ('artifact_id', '7.0', 'Weight', 'Dates', 'School text', 'retired', 'Publication notes',
+                        'Condition', 'nan', 'None'):
+            self.assertNotIn(dropped, prompt)
+        self.assertIn('Genre: Lexical; Vocabularies\n', prompt)
+        self.assertIn('Period: Uruk IV (ca. 3350-3200 BC) (uncertain)\n', prompt)
+        self.assertIn('Size (h x w x t): 42 x ? x 19 mm\n', prompt)
+        self.assertIn('New column: kept', prompt)
+
+    def test_fields_ranked_by_importance(self):
+        labels = [label for _, label, _ in prompt_fields(self.artifact)]
+        self.assertEqual(labels[0], 'Designation')
+        self.assertLess(labels.index('Period'), labels.index('Museum no.'))
+        self.assertEqual(labels[-1], 'New column')
+
+    def test_token_budget(self):
+        artifact = read_artifacts(SEED_CSV).iloc[2].to_dict()
+        full = build_prompt(artifact, token_budget=10000)
+        short = build_prompt(artifact, token_budget=60)
+        self.assertLessEqual(estimate_tokens(short), 60)
+        self.assertTrue(short.startswith('# Artifact\nDesignation: ATU 3'))
+        self.assertNotIn('External resources', short)
+        self.assertIn('External resources', full)
+
+    def test_smaller_than_one_heading_per_column(self):
+        for artifact in read_artifacts(SEED_CSV).to_dict('records'):
+            legacy = "".join(f"## {key}\n\n{value}\n\n" for key, value in artifact.items())
+            self.assertLess(estimate_tokens(build_prompt(artifact)), estimate_tokens(legacy) / 2)
+
+if __name__ == '__main__':
+    unittest.main()
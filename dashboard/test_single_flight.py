@@ -0,0 +1,116 @@
+import os
+import time
+import tempfile
+import threading
+import unittest
+from single_flight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _produce(self):
+        self.calls += 1
+        for word in ["This ", "artifact ", "is ", "a ", "tablet."]:
+            time.sleep(0.05)
+            yield word
+
+    def test_concurrent_streams_share_one_producer(self):
+        # Separate instances behave like separate processes sharing the directory
+        results = []
+
+        def consume():
+            flights = SingleFlight(self.tmpdir.name, poll_interval=0.01)
+            results.append("".join(flights.stream("summary-1.0", self._produce)))
+
+        threads = [threading.Thread(target=consume) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ["This artifact is a tablet."] * 4)
+        # Spools are removed once the stream is complete
+        self.assertEqual([name for name in os.listdir(self.tmpdir.name) if not name.endswith(".lock")], [])
+
+    def test_sequential_streams_each_produce(self):
+        flights = SingleFlight(self.tmpdir.name)
+        self.assertEqual("".join(flights.stream("k", self._produce)), "This artifact is a tablet.")
+        self.assertEqual("".join(flights.stream("k", self._produce)), "This artifact is a tablet.")
+        self.assertEqual(self.calls, 2)
+
+    def test_follower_finishes_when_leader_stops_reading(self):
+        leader = SingleFlight(self.tmpdir.name, poll_interval=0.01).stream("k", self._produce)
+        self.assertTrue(next(leader))
+        results = []
+
+        def follow():
+            results.append("".join(SingleFlight(self.tmpdir.name, poll_interval=0.01).stream("k", self._produce)))
+
+        follower = threading.Thread(target=follow)
+        follower.start()
+        time.sleep(0.02)
+        # e.g. speech synthesis failing mid-summary; the stream carries on for the follower
+        leader.close()
+        follower.join()
+
+        self.assertEqual(results, ["This artifact is a tablet."])
+        self.assertEqual(self.calls, 1)
+
+    def test_follower_takes_over_when_leader_fails_early(self):
+        def failing():
+            time.sleep(0.1)
+            raise RuntimeError("API down")
+            yield
+
+        errors = []
+
+        def lead():
+            try:
+                list(SingleFlight(self.tmpdir.name).stream("k", failing))
+            except RuntimeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        time.sleep(0.02)
+        text = "".join(SingleFlight(self.tmpdir.name, poll_interval=0.01).stream("k", self._produce))
+        leader.join()
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(text, "This artifact is a tablet.")
+
+    def test_follower_fails_when_leader_stops_partway(self):
+        def truncated():
+            yield "This "
+            time.sleep(0.1)
+            raise RuntimeError("Stream cut short")
+
+        errors = []
+
+        def lead():
+            try:
+                list(SingleFlight(self.tmpdir.name).stream("k", truncated))
+            except RuntimeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        time.sleep(0.05)
+        received = []
+        with self.assertRaises(RuntimeError):
+            for chunk in SingleFlight(self.tmpdir.name, poll_interval=0.01).stream("k", self._produce):
+                received.append(chunk)
+        leader.join()
+
+        self.assertEqual((received, len(errors), self.calls), (["This "], 1, 0))
+        self.assertEqual([name for name in os.listdir(self.tmpdir.name) if not name.endswith(".lock")], [])
+
+if __name__ == '__main__':
+    unittest.main()
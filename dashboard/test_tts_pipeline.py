@@ -0,0 +1,90 @@
+import time
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from content_store import ContentStore
+from tts_pipeline import ElevenLabsSynthesizer, iter_sentences, speak
+
+class FakeElevenLabs:
+    """Stands in for the ElevenLabs client, counting synthesis requests."""
+
+    def __init__(self):
+        self.requests = []
+        self.voices = SimpleNamespace(get_all=lambda show_legacy: SimpleNamespace(
+            voices=[SimpleNamespace(name="Brian", voice_id="nPczCjzI2devNBz1zQrb")]))
+        self.text_to_speech = SimpleNamespace(convert_as_stream=self._convert)
+
+    def _convert(self, voice_id, text, **kwargs):
+        self.requests.append((voice_id, text))
+        yield b"ID3"
+        yield text.encode()
+
+class TestTTSPipeline(unittest.TestCase):
+    def test_sentences_split_across_tokens(self):
+        tokens = ["This tablet dates to ca", ". 2100 BC and was found ", "at Ur. It rec", "ords barley rations! ",
+                  "\"Later copies exist.\" "]
+        self.assertEqual(list(iter_sentences(tokens, min_chars=10)), [
+            "This tablet dates to ca. 2100 BC and was found at Ur.",
+            "It records barley rations!",
+            "\"Later copies exist.\"",
+        ])
+
+    def test_short_sentences_are_merged(self):
+        self.assertEqual(list(iter_sentences(["Yes. It is a seal impression."], min_chars=10)),
+                         ["Yes. It is a seal impression."])
+
+    def test_first_audio_arrives_before_text_finishes(self):
+        first_sentence_spoken = threading.Event()
+
+        def tokens():
+            yield "The first sentence is here. The"
+            # Hold back the rest of the text until audio for the first sentence is out
+            self.assertTrue(first_sentence_spoken.wait(2))
+            yield " second sentence follows."
+
+        audio = speak(tokens(), lambda text, previous_text=None: [text.encode()])
+        self.assertEqual(next(audio), b"The first sentence is here.")
+        first_sentence_spoken.set()
+        self.assertEqual(list(audio), [b"The second sentence follows."])
+
+    def test_audio_is_yielded_in_sentence_order(self):
+        calls = []
+
+        def synthesize(text, previous_text=None):
+            calls.append((text, previous_text))
+            # Earlier sentences take longer, so they finish after later ones
+            time.sleep(0.1 if text.startswith("One") else 0.01)
+            yield text[:5].encode()
+            yield text[5:].encode()
+
+        text = ["One sentence comes first. ", "Two sentences follow it. ", "Three makes a list."]
+        audio = b"".join(speak(iter(text), synthesize, max_workers=3))
+        self.assertEqual(audio, b"".join(t.strip().encode() for t in text))
+        self.assertIn(("Two sentences follow it.", "One sentence comes first."), calls)
+
+    def test_synthesis_errors_are_raised(self):
+        def synthesize(text, previous_text=None):
+            raise RuntimeError("quota exceeded")
+
+        with self.assertRaises(RuntimeError):
+            list(speak(iter(["A sentence long enough to send."]), synthesize))
+
+    def test_synthesizer_replays_cached_sentences(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            client = FakeElevenLabs()
+            synthesize = ElevenLabsSynthesizer(client, cache=ContentStore(tmpdir, suffix=".mp3"))
+            first = b"".join(synthesize("This artifact is a tablet."))
+            second = b"".join(synthesize("This artifact is a tablet.", previous_text="Anything."))
+
+            self.assertEqual(first, b"ID3This artifact is a tablet.")
+            self.assertEqual(second, first)
+            self.assertEqual(client.requests, [("nPczCjzI2devNBz1zQrb", "This artifact is a tablet.")])
+
+            # A different voice is a different entry
+            other = ElevenLabsSynthesizer(client, voice="21m00Tcm4TlvDq8ikWAM", cache=synthesize.cache)
+            b"".join(other("This artifact is a tablet."))
+            self.assertEqual(len(client.requests), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from video_jobs import VideoJobManager, COMPLETED, FAILED, GENERATING
+
+VIDEO_BYTES = b"\x00\x00\x00\x18ftypmp42" * 1000
+
+class VideoHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(VIDEO_BYTES)))
+        self.end_headers()
+        self.wfile.write(VIDEO_BYTES)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestVideoJobManager(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), VideoHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.video_url = f"http://{host}:{port}/video.mp4"
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def _client(self, polls_until_done=2, fail=False):
+        client = Mock()
+        client.generations.create.side_effect = lambda **kwargs: SimpleNamespace(id=f"gen-{kwargs['prompt']}")
+        states = {}
+
+        def get(id):
+            states[id] = states.get(id, 0) + 1
+            if fail:
+                return SimpleNamespace(state="failed", failure_reason="moderation")
+            if states[id] < polls_until_done:
+                return SimpleNamespace(state="dreaming")
+            return SimpleNamespace(state="completed", assets=SimpleNamespace(video=self.video_url))
+
+        client.generations.get.side_effect = get
+        return client
+
+    def _manager(self, client):
+        return VideoJobManager(self.tmpdir.name, client=client, poll_initial=0.01, poll_max=0.02)
+
+    def test_concurrent_jobs_download_atomically(self):
+        client = self._client()
+        manager = self._manager(client)
+        futures = [manager.submit(f"{i}.0", f"prompt {i}") for i in range(4)]
+        # A second request for the same artifact attaches to the running job
+        self.assertIs(manager.submit("0.0", "prompt 0"), futures[0])
+        jobs = [future.result() for future in futures]
+        manager.shutdown()
+
+        self.assertTrue(all(job["state"] == COMPLETED for job in jobs))
+        self.assertEqual(client.generations.create.call_count, 4)
+        with open(manager.video_path("2.0"), "rb") as f:
+            self.assertEqual(f.read(), VIDEO_BYTES)
+        self.assertFalse([name for name in os.listdir(self.tmpdir.name) if name.endswith(".part")])
+        self.assertEqual(manager.load_job("2.0")["bytes"], len(VIDEO_BYTES))
+
+    def test_resume_reuses_persisted_generation(self):
+        manager = self._manager(self._client())
+        manager._update({"artifact_id": "7.0", "prompt": "p", "state": GENERATING, "generation_id": "gen-p"})
+
+        client = self._client()
+        manager = self._manager(client)
+        jobs = {artifact_id: future.result() for artifact_id, future in manager.resume().items()}
+        manager.shutdown()
+
+        self.assertEqual(jobs["7.0"]["state"], COMPLETED)
+        client.generations.create.assert_not_called()
+        self.assertTrue(os.path.exists(manager.video_path("7.0")))
+
+    def test_failed_generation_is_recorded(self):
+        manager = self._manager(self._client(fail=True))
+        job = manager.generate("9.0", "p")
+        manager.shutdown()
+        self.assertEqual(job["state"], FAILED)
+        self.assertIn("moderation", manager.load_job("9.0")["error"])
+
+    def test_managers_in_separate_processes_share_one_generation(self):
+        client = self._client(polls_until_done=5)
+        # Two managers over the same directory stand in for two processes
+        first, second = self._manager(client), self._manager(client)
+        futures = [first.submit("3.0", "p"), second.submit("3.0", "p")]
+        jobs = [future.result() for future in futures]
+        first.shutdown()
+        second.shutdown()
+
+        self.assertEqual(client.generations.create.call_count, 1)
+        self.assertEqual([job["state"] for job in jobs], [COMPLETED, COMPLETED])
+
+if __name__ == '__main__':
+    unittest.main()
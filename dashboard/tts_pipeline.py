@@ -0,0 +1,235 @@
+import os
+import re
+import sys
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+from content_store import ContentStore
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+SYNTHESIS_SECONDS = instrumentation.histogram("tts_sentence_seconds", "Time to synthesize one sentence, by cache result")
+SYNTHESIS_FIRST_AUDIO = instrumentation.histogram(
+    "tts_sentence_first_audio_seconds", "Time to the first audio chunk of a synthesized sentence")
+SYNTHESIS_CHARACTERS = instrumentation.counter("tts_characters_total", "Characters of text spoken, by cache result")
+PIPELINE_FIRST_AUDIO = instrumentation.histogram(
+    "tts_pipeline_first_audio_seconds", "Time from starting a spoken summary to its first audio chunk")
+
+DEFAULT_VOICE = "Brian"
+DEFAULT_MODEL = "eleven_multilingual_v2"
+DEFAULT_OUTPUT_FORMAT = "mp3_44100_128"
+
+# Synthesized sentences keyed by text, voice, model and format. Set
+# AUDIO_CACHE_DIR to an empty string to always call the API.
+AUDIO_CACHE_DIR = os.environ.get("AUDIO_CACHE_DIR", "audio_cache")
+audio_cache = ContentStore(
+    AUDIO_CACHE_DIR,
+    max_bytes=int(os.environ.get("AUDIO_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+    suffix=".mp3",
+) if AUDIO_CACHE_DIR else None
+
+# A sentence ends at . ! or ? (plus closing quotes or brackets) followed by
+# whitespace and something that starts a new sentence
+SENTENCE_BOUNDARY = re.compile(r"[.!?][\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+
+# Words that end in a period without ending the sentence
+ABBREVIATIONS = {"ca", "c", "cf", "e.g", "i.e", "etc", "mod", "no", "nos", "pl", "vol", "fig", "dr", "mr", "mrs", "st"}
+
+_END = object()
+
+
+def iter_sentences(tokens: Iterable[str], min_chars: int = 20) -> Iterator[str]:
+    """Cut a stream of text tokens into sentences as soon as each one is complete.
+
+    A boundary is only accepted once the start of the next sentence has
+    arrived, so "ca. 3200 BC" and similar abbreviations are not split.
+    Sentences shorter than `min_chars` are merged into the next one to avoid
+    many tiny TTS requests.
+    """
+    buffer = ""
+    for token in tokens:
+        buffer += token
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(buffer):
+            sentence = buffer[start:match.end()].strip()
+            last_word = sentence.rstrip(".!?\"')]").rsplit(None, 1)[-1].lower() if sentence else ""
+            if last_word in ABBREVIATIONS or len(sentence) < min_chars:
+                continue
+            yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def audio_cache_key(text: str, voice: str, model: str, output_format: str = DEFAULT_OUTPUT_FORMAT) -> str:
+    return ContentStore.make_key("tts", text, voice, model, output_format)
+
+
+class ElevenLabsSynthesizer:
+    """Callable turning one sentence into streamed ElevenLabs audio chunks.
+
+    The voice name is resolved to an ID once rather than on every request,
+    and the previous sentence is sent along so prosody carries across cuts.
+    Sentences already in `cache` are replayed from disk without an API call.
+    """
+
+    def __init__(self, client=None, voice: str = DEFAULT_VOICE, model: str = DEFAULT_MODEL,
+                 output_format: str = DEFAULT_OUTPUT_FORMAT, cache: Optional[ContentStore] = audio_cache):
+        self._client = client
+        self.voice = voice
+        self.model = model
+        self.output_format = output_format
+        self.cache = cache
+        self._voice_id = None
+        self.lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self.lock:
+            if self._client is None:
+                from elevenlabs.client import ElevenLabs
+                self._client = ElevenLabs(api_key=os.getenv('ELEVENLABS_API_KEY'))
+            return self._client
+
+    @property
+    def voice_id(self) -> str:
+        if self._voice_id is None:
+            from elevenlabs.client import is_voice_id
+            if is_voice_id(self.voice):
+                voice_id = self.voice
+            else:
+                voices = self.client.voices.get_all(show_legacy=True).voices
+                voice_id = next((v.voice_id for v in voices if v.name == self.voice), None)
+                if voice_id is None:
+                    raise ValueError(f"Voice {self.voice} not found")
+            self._voice_id = voice_id
+        return self._voice_id
+
+    def __call__(self, text: str, previous_text: Optional[str] = None) -> Iterator[bytes]:
+        start = time.monotonic()
+        key = audio_cache_key(text, self.voice, self.model, self.output_format)
+        if self.cache is not None:
+            audio = self.cache.get(key)
+            if audio is not None:
+                SYNTHESIS_CHARACTERS.inc(len(text), cache="hit")
+                SYNTHESIS_SECONDS.observe(time.monotonic() - start, cache="hit")
+                yield audio
+                return
+
+        kwargs = {"previous_text": previous_text} if previous_text else {}
+        chunks = []
+        for chunk in self.client.text_to_speech.convert_as_stream(
+            self.voice_id,
+            text=text,
+            model_id=self.model,
+            output_format=self.output_format,
+            **kwargs,
+        ):
+            if not chunks:
+                SYNTHESIS_FIRST_AUDIO.observe(time.monotonic() - start)
+            chunks.append(chunk)
+            yield chunk
+        SYNTHESIS_CHARACTERS.inc(len(text), cache="miss")
+        SYNTHESIS_SECONDS.observe(time.monotonic() - start, cache="miss")
+        if self.cache is not None:
+            self.cache.put(key, b"".join(chunks))
+
+
+def speak(tokens: Iterable[str], synthesize: Callable[..., Iterable[bytes]], max_workers: int = 2,
+          min_chars: int = 20) -> Iterator[bytes]:
+    """Turn a token stream into audio, synthesizing sentences while later tokens arrive.
+
+    A background thread reads `tokens` and hands each finished sentence to a
+    pool of up to `max_workers` TTS requests. Audio chunks are yielded in
+    sentence order, the first sentence's chunks as soon as they stream back,
+    so time-to-first-audio follows the first sentence rather than the whole
+    text. A synthesis error is raised from this generator.
+
+    Args:
+        tokens: Text stream, for example from analyze_artifact
+        synthesize: Called as synthesize(sentence, previous_text=...) and
+            returning audio chunks, such as an ElevenLabsSynthesizer
+        max_workers: Sentences synthesized concurrently
+        min_chars: Shortest sentence sent on its own
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    # One queue of audio chunks per sentence, in sentence order
+    sentences: "queue.Queue" = queue.Queue()
+
+    def synthesize_into(sentence: str, previous: Optional[str], chunks: "queue.Queue"):
+        try:
+            for chunk in synthesize(sentence, previous_text=previous):
+                chunks.put(chunk)
+            chunks.put(_END)
+        except Exception as e:
+            chunks.put(e)
+
+    def split():
+        previous = None
+        try:
+            for sentence in iter_sentences(tokens, min_chars):
+                chunks = queue.Queue()
+                sentences.put(chunks)
+                executor.submit(synthesize_into, sentence, previous, chunks)
+                previous = sentence
+            sentences.put(_END)
+        except Exception as e:
+            sentences.put(e)
+
+    start = time.monotonic()
+    first_audio = True
+    threading.Thread(target=split, daemon=True).start()
+    try:
+        while True:
+            chunks = sentences.get()
+            if chunks is _END:
+                return
+            if isinstance(chunks, Exception):
+                raise chunks
+            while True:
+                chunk = chunks.get()
+                if chunk is _END:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                if first_audio:
+                    PIPELINE_FIRST_AUDIO.observe(time.monotonic() - start)
+                    first_audio = False
+                yield chunk
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    from artifact_augmentation import ARTIFACTS_FILE, analyze_artifact, load_artifact
+
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python tts_pipeline.py <artifact_id> [output.mp3]")
+        sys.exit(1)
+
+    artifact_id = sys.argv[1]
+    output_filename = sys.argv[2] if len(sys.argv) == 3 else f"{artifact_id}.mp3"
+    artifacts = load_artifact(ARTIFACTS_FILE, artifact_id)
+    if artifacts.empty:
+        print(f"No artifact found with ID: {artifact_id}")
+        sys.exit(1)
+
+    start = time.monotonic()
+    first_audio = None
+    with open(output_filename, "wb") as f:
+        for chunk in speak(analyze_artifact(artifacts.iloc[0].to_dict()), ElevenLabsSynthesizer()):
+            if first_audio is None:
+                first_audio = time.monotonic() - start
+                print(f"First audio after {first_audio:.2f}s")
+            f.write(chunk)
+            f.flush()
+    print(f"Audio saved to {output_filename} in {time.monotonic() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
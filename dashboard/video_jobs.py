@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional
+from single_flight import SingleFlight
+import instrumentation
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Each stage is measured from the timestamps persisted in the job file
+STAGE_SECONDS = instrumentation.histogram(
+    "video_job_stage_seconds", "Time video jobs spend queued, generating and downloading")
+JOBS = instrumentation.counter("video_jobs_total", "Video jobs finished, by final state")
+
+# Job states, in the order a job moves through them
+PENDING = "pending"          # persisted, generation not yet requested
+GENERATING = "generating"    # Luma generation ID known, polling
+DOWNLOADING = "downloading"
+COMPLETED = "completed"
+FAILED = "failed"
+ACTIVE_STATES = (PENDING, GENERATING, DOWNLOADING)
+
+
+def download_video(url: str, output_path: str, session: requests.Session = None, chunk_size: int = 1024 * 1024) -> int:
+    """Stream a video to disk in chunks and move it into place atomically.
+
+    The body is written to a temp file next to `output_path` and only renamed
+    once complete, so readers never see a partial MP4.
+
+    Returns:
+        Number of bytes written
+    """
+    session = session or requests.Session()
+    tmp_path = f"{output_path}.part"
+    written = 0
+    with session.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with open(tmp_path, "wb") as file:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                file.write(chunk)
+                written += len(chunk)
+    os.replace(tmp_path, output_path)
+    return written
+
+
+def record_job_metrics(job: Dict[str, Any]):
+    """Observe the queue, generation and download time of a finished job."""
+    JOBS.inc(state=job["state"])
+    stages = (("queued", "queued_at", "started_at"),
+              ("generating", "started_at", "generated_at"),
+              ("downloading", "generated_at", "completed_at"))
+    for stage, begin, end in stages:
+        if job.get(begin) and job.get(end):
+            STAGE_SECONDS.observe(job[end] - job[begin], stage=stage)
+
+
+class VideoJobManager:
+    """Run many Luma generations at once with persisted, resumable job state.
+
+    Each job's state is stored as its own JSON file under `<videos_dir>/jobs`,
+    written atomically at every transition. A job is persisted before its
+    generation is requested and again as soon as the generation ID is known,
+    so after a restart `resume()` picks up polling of existing generations
+    instead of paying for new ones. Polling backs off from `poll_initial` to
+    `poll_max` seconds while a generation is still running.
+
+    Jobs for the same artifact are also serialized across processes with a
+    lock file, so a second process waits for the running job and then finds
+    the video already there rather than starting its own generation.
+    """
+
+    def __init__(self, videos_dir: str = "videos", max_workers: int = 8, client=None,
+                 poll_initial: float = 1.0, poll_max: float = 15.0, poll_factor: float = 1.5,
+                 aspect_ratio: str = "16:9", loop: bool = True):
+        self.videos_dir = videos_dir
+        self.jobs_dir = os.path.join(videos_dir, "jobs")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._client = client
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.poll_factor = poll_factor
+        self.aspect_ratio = aspect_ratio
+        self.loop = loop
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+        self.futures: Dict[str, Future] = {}
+        self.flights = SingleFlight(self.jobs_dir)
+
+    @property
+    def client(self):
+        if self._client is None:
+            from lumaai import LumaAI
+            self._client = LumaAI()
+        return self._client
+
+    def video_path(self, artifact_id: str) -> str:
+        return os.path.join(self.videos_dir, f"{artifact_id}.mp4")
+
+    def _job_path(self, artifact_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{artifact_id}.json")
+
+    def load_job(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._job_path(artifact_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_job(self, job: Dict[str, Any]):
+        path = self._job_path(job["artifact_id"])
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def _update(self, job: Dict[str, Any], **changes) -> Dict[str, Any]:
+        job.update(changes)
+        job["updated_at"] = time.time()
+        self._save_job(job)
+        return job
+
+    def submit(self, artifact_id: str, prompt: str) -> Future:
+        """Start generating a video for an artifact, or attach to the job already running.
+
+        Returns:
+            Future resolving to the final job state
+        """
+        with self.lock:
+            future = self.futures.get(artifact_id)
+            if future is not None and not future.done():
+                return future
+
+            job = self.load_job(artifact_id)
+            if os.path.exists(self.video_path(artifact_id)):
+                future = Future()
+                future.set_result(job or {"artifact_id": artifact_id, "state": COMPLETED})
+                return future
+            if job is None or job["state"] not in ACTIVE_STATES:
+                job = self._update({
+                    "artifact_id": artifact_id,
+                    "prompt": prompt,
+                    "state": PENDING,
+                    "generation_id": None,
+                    "queued_at": time.time(),
+                })
+            future = self.executor.submit(self._run, job)
+            self.futures[artifact_id] = future
+            return future
+
+    def resume(self) -> Dict[str, Future]:
+        """Restart every job left active by a previous process."""
+        resumed = {}
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith(".json"):
+                continue
+            job = self.load_job(name[:-len(".json")])
+            if job and job["state"] in ACTIVE_STATES:
+                logger.info(f"Resuming video job for artifact {job['artifact_id']} ({job['state']})")
+                resumed[job["artifact_id"]] = self.submit(job["artifact_id"], job["prompt"])
+        return resumed
+
+    def _run(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        with self.flights.hold(job["artifact_id"]):
+            # Another process may have advanced or finished this job while we waited
+            latest = self.load_job(job["artifact_id"])
+            if os.path.exists(self.video_path(job["artifact_id"])):
+                return latest or self._update(job, state=COMPLETED, completed_at=time.time())
+            if latest and latest["state"] in ACTIVE_STATES and latest.get("generation_id"):
+                job = latest
+            return self._run_locked(job)
+
+    def _run_locked(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        artifact_id = job["artifact_id"]
+        try:
+            if not job.get("generation_id"):
+                generation = self.client.generations.create(
+                    aspect_ratio=self.aspect_ratio,
+                    loop=self.loop,
+                    prompt=job["prompt"],
+                )
+                self._update(job, state=GENERATING, generation_id=generation.id, started_at=time.time())
+                logger.info(f"Generation {generation.id} started for artifact {artifact_id}")
+
+            generation = self._poll(job)
+            self._update(job, state=DOWNLOADING, generated_at=time.time())
+
+            size = download_video(generation.assets.video, self.video_path(artifact_id), self.session)
+            self._update(job, state=COMPLETED, completed_at=time.time(), bytes=size)
+            logger.info(f"Video for artifact {artifact_id} saved to {self.video_path(artifact_id)}")
+        except Exception as e:
+            logger.error(f"Video job for artifact {artifact_id} failed: {e}")
+            self._update(job, state=FAILED, error=str(e))
+        record_job_metrics(job)
+        return job
+
+    def _poll(self, job: Dict[str, Any]):
+        delay = self.poll_initial
+        while True:
+            generation = self.client.generations.get(id=job["generation_id"])
+            if generation.state == "completed":
+                return generation
+            if generation.state == "failed":
+                raise RuntimeError(f"Generation failed: {generation.failure_reason}")
+            time.sleep(delay)
+            delay = min(delay * self.poll_factor, self.poll_max)
+
+    def generate(self, artifact_id: str, prompt: str) -> Dict[str, Any]:
+        """Run one job to completion and return its final state."""
+        return self.submit(artifact_id, prompt).result()
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "--resume":
+        manager = VideoJobManager()
+        for future in manager.resume().values():
+            future.result()
+        manager.shutdown()
+    elif len(sys.argv) == 3:
+        job = VideoJobManager().generate(sys.argv[1], sys.argv[2])
+        sys.exit(0 if job["state"] == COMPLETED else 1)
+    else:
+        print("Usage: python video_jobs.py <artifact_id> <prompt> | --resume")
+        sys.exit(1)